@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Test setup: the Calendar plugin outside an enigma2 image.
+
+The enigma2 modules imported by the plugin (enigma, Components, Screens,
+Tools) are replaced by minimal stubs when they are not available, so the
+plugin imports as Plugins.Extensions.Calendar from the repository tree.
+Components.config provides an empty config: the config_manager getters
+return their defaults. Plugin data goes to a temporary directory.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import types
+
+PYTHON_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "usr", "lib", "enigma2", "python")
+DATA_DIR = tempfile.mkdtemp(prefix="calendar-tests-")
+atexit.register(shutil.rmtree, DATA_DIR, True)
+
+
+class _Stub(object):
+    """Any enigma2 class or object the tests do not use"""
+
+    TYPE_YESNO = 0
+    TYPE_INFO = 1
+    TYPE_WARNING = 2
+    TYPE_ERROR = 3
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+    def __getattr__(self, name):
+        return _Stub()
+
+
+class _ConfigElement(object):
+
+    def __init__(self, default=None, **kwargs):
+        self.value = self.default = default
+
+    def save(self):
+        pass
+
+
+class _ConfigSubsection(object):
+    pass
+
+
+class _Language(object):
+
+    def getLanguage(self):
+        return "en_GB"
+
+    def addCallback(self, callback):
+        pass
+
+
+class _Desktop(object):
+
+    def size(self):
+        return self
+
+    def width(self):
+        return 1920
+
+    def height(self):
+        return 1080
+
+
+def _stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attrs)
+    # Any other name is a stub class
+    module.__getattr__ = lambda attr: _Stub
+    sys.modules[name] = module
+    parent, _dot, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+
+def _install_stubs():
+    config = _ConfigSubsection()
+    config.plugins = _ConfigSubsection()
+    config.osd = _ConfigSubsection()
+    config.osd.language = _ConfigElement("en_GB")
+
+    _stub_module("enigma", getDesktop=lambda screen: _Desktop())
+    _stub_module("skin")
+    _stub_module("Components")
+    _stub_module("Components.config", config=config,
+                 ConfigSubsection=_ConfigSubsection,
+                 ConfigSelection=_ConfigElement,
+                 ConfigYesNo=_ConfigElement,
+                 ConfigText=_ConfigElement,
+                 ConfigInteger=_ConfigElement,
+                 configfile=_Stub())
+    _stub_module("Components.Language", language=_Language())
+    _stub_module("Tools")
+    _stub_module("Tools.Directories", SCOPE_PLUGINS=0, SCOPE_MEDIA=1,
+                 resolveFilename=lambda scope, path="": os.path.join(
+                     DATA_DIR, path))
+    _stub_module("Screens")
+    for name in ("ActionMap", "Button", "FileList", "Label", "MenuList",
+                 "Pixmap", "ProgressBar", "ScrollLabel", "Sources",
+                 "Sources.StaticText"):
+        _stub_module("Components." + name)
+    for name in ("ChoiceBox", "MessageBox", "Screen", "Setup",
+                 "VirtualKeyBoard"):
+        _stub_module("Screens." + name)
+
+
+try:
+    import enigma  # noqa: F401
+except ImportError:
+    _install_stubs()
+
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+Restore targets of backup archive members.
+"""
+import os
+
+from Plugins.Extensions.Calendar.backup import _safe_member_path
+
+DATA = "/etc/enigma2/Calendar"
+
+
+def test_members_stay_inside_the_data_directory():
+    assert _safe_member_path(DATA, "events.json") == os.path.join(
+        DATA, "events.json")
+    assert _safe_member_path(DATA, "ics/it/month/202501.txt") == os.path.join(
+        DATA, "ics/it/month/202501.txt")
+    assert _safe_member_path(DATA, "contacts/./a.vcf") == os.path.join(
+        DATA, "contacts/a.vcf")
+    assert _safe_member_path(DATA, "contacts/x/../a.vcf") == os.path.join(
+        DATA, "contacts/a.vcf")
+
+
+def test_absolute_and_parent_paths_are_rejected():
+    for name in ("/etc/passwd", "../settings", "..", "contacts/../../x",
+                 "a/../../../etc/shadow"):
+        assert _safe_member_path(DATA, name) is None
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Scores of the fuzzy contact duplicate finder.
+"""
+from Plugins.Extensions.Calendar.duplicate_checker import FuzzyDuplicateFinder
+
+
+def contact(name, tel='', email='', bday=''):
+    return {'FN': name, 'TEL': tel, 'EMAIL': email, 'BDAY': bday}
+
+
+def score(contact_a, contact_b):
+    return FuzzyDuplicateFinder(None).score(contact_a, contact_b)
+
+
+def test_similar_names_with_same_phone_are_boosted():
+    assert score(contact("Mario Rossi", tel="+39 06 1234567"),
+                 contact("Rossi", tel="0039061234567")) == (
+        0.9, "Similar name, same phone")
+    assert score(contact("M. Rossi", email="m@example.com"),
+                 contact("Mario Rossi", email="M@Example.com")) == (
+        1.0, "Similar name, same email")
+
+
+def test_family_sharing_a_landline_is_not_a_duplicate():
+    value, reason = score(contact("Mario Rossi", tel="06 1234567"),
+                          contact("Anna Rossi", tel="061234567"))
+    assert reason == "Same phone"
+    assert value == 0.5
+    assert value < FuzzyDuplicateFinder.MIN_SCORE
+
+    value, reason = score(contact("Luca Bianchi", email="home@example.com"),
+                          contact("Giulia Verdi", email="home@example.com"))
+    assert (value, reason) == (0.0, "Same email")
+
+
+def test_different_birthdays_are_never_duplicates():
+    assert score(contact("Mario Rossi", bday="1980-01-01"),
+                 contact("Mario Rossi", bday="1981-01-01")) == (
+        0.0, "Different birthdays")
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Accuracy of the ICS birthday/event classifier with the default rules.
+
+The enigma2 modules are stubbed by conftest.py outside an image.
+"""
+from Plugins.Extensions.Calendar.config_manager import CONFIG_MAP
+from Plugins.Extensions.Calendar.event_classifier import (
+    BIRTHDAY_KEYWORDS,
+    EventClassifier,
+    evaluate,
+)
+
+
+def default_value(name):
+    return CONFIG_MAP[name][2]["default"]
+
+
+def test_default_rules_classify_fixture():
+    classifier = EventClassifier(
+        keywords=BIRTHDAY_KEYWORDS,
+        yearly=default_value("birthday_rule_yearly"),
+        default_time=default_value("birthday_rule_default_time"))
+    correct, total, mistakes = evaluate(classifier)
+    assert mistakes == []
+    assert correct == total
+
+
+def test_yearly_events_are_not_birthdays_by_default():
+    classifier = EventClassifier(
+        keywords=BIRTHDAY_KEYWORDS,
+        yearly=default_value("birthday_rule_yearly"),
+        default_time=default_value("birthday_rule_default_time"))
+    for title in ("Christmas", "Wedding anniversary"):
+        correct, total, mistakes = evaluate(
+            classifier, [(title, "", "yearly", "", 'event')])
+        assert mistakes == []
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Result and error reporting of background export jobs.
+"""
+from Screens.MessageBox import MessageBox
+
+from Plugins.Extensions.Calendar.export_job import ExportJob
+
+
+class Session(object):
+    def __init__(self):
+        self.opened = []
+
+    def open(self, screen, *args):
+        self.opened.append(args)
+
+
+def fail(job):
+    raise IOError("disk full")
+
+
+def test_failed_job_reports_its_error(tmp_path):
+    job = ExportJob("Exporting", str(tmp_path / "out.ics"), fail)
+    job.run()
+    assert job.finished
+    assert job.result == 0
+    assert job.error == "disk full"
+
+    session = Session()
+    assert job.show_error(session)
+    message, box_type = session.opened[0]
+    assert "disk full" in message
+    assert box_type == MessageBox.TYPE_ERROR
+
+
+def test_successful_job_has_no_error(tmp_path):
+    job = ExportJob("Exporting", str(tmp_path / "out.ics"), lambda job: 5)
+    job.run()
+    session = Session()
+    assert job.result == 5
+    assert not job.show_error(session)
+    assert session.opened == []
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+New, changed, unchanged and deleted items of a differential export.
+"""
+from Plugins.Extensions.Calendar.export_manifest import ExportManifest
+
+
+class Writer(object):
+    def __init__(self):
+        self.components = []
+
+    def write_component(self, lines):
+        self.components.append(lines)
+
+
+def event(uid, summary):
+    return ["BEGIN:VEVENT", "UID:" + uid, "DTSTART;VALUE=DATE:20250101",
+            "SUMMARY:" + summary, "END:VEVENT"]
+
+
+def export(path, events, scoped=False):
+    manifest = ExportManifest('events', changes_only=True, path=path,
+                              scoped=scoped)
+    writer = Writer()
+    for lines in events:
+        manifest.write_component(writer, lines)
+    return manifest, writer
+
+
+def test_first_export_writes_everything(tmp_path):
+    manifest, writer = export(str(tmp_path / "m.json"),
+                              [event("a", "A"), event("b", "B")])
+    assert (manifest.new, manifest.changed, manifest.unchanged) == (2, 0, 0)
+    assert len(writer.components) == 2
+    assert manifest.deleted() == []
+
+
+def test_next_export_writes_changes_and_cancels_deletions(tmp_path):
+    path = str(tmp_path / "m.json")
+    first, _writer = export(path, [event("a", "A"), event("b", "B"),
+                                   event("c", "C")])
+    assert first.save()
+
+    manifest, writer = export(path, [event("a", "A"), event("b", "B2"),
+                                     event("d", "D")])
+    assert (manifest.new, manifest.changed, manifest.unchanged) == (1, 1, 1)
+    assert [lines[1] for lines in writer.components] == ["UID:b", "UID:d"]
+    assert manifest.deleted() == [("c", "DTSTART;VALUE=DATE:20250101")]
+
+    assert manifest.write_cancellations(writer) == 1
+    cancel = writer.components[-1]
+    assert "UID:c" in cancel and "STATUS:CANCELLED" in cancel
+    assert "DTSTART;VALUE=DATE:20250101" in cancel
+
+
+def test_unsaved_export_does_not_lose_changes(tmp_path):
+    path = str(tmp_path / "m.json")
+    export(path, [event("a", "A")])[0].save()
+    export(path, [event("a", "A2")])
+    manifest, writer = export(path, [event("a", "A2")])
+    assert manifest.changed == 1
+    assert len(writer.components) == 1
+
+
+def test_scoped_export_deletes_nothing_and_keeps_other_items(tmp_path):
+    path = str(tmp_path / "m.json")
+    export(path, [event("a", "A"), event("b", "B")])[0].save()
+
+    manifest, _writer = export(path, [event("a", "A1")], scoped=True)
+    assert manifest.deleted() == []
+    assert manifest.save()
+
+    manifest, writer = export(path, [event("a", "A1"), event("b", "B")])
+    assert manifest.unchanged == 2
+    assert writer.components == []
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Content addressed ICS archive and its catalog.
+"""
+import os
+
+import pytest
+
+from Plugins.Extensions.Calendar.ics_manager import ICSManager
+
+
+def calendar(name, uids):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "X-WR-CALNAME:" + name]
+    for uid in uids:
+        lines += ["BEGIN:VEVENT", "UID:%s" % uid, "SUMMARY:Event %s" % uid,
+                  "DTSTART;VALUE=DATE:202501%02d" % uid, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode('utf-8')
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ICSManager()
+    manager.base_path = str(tmp_path / "ics")
+    manager.manifest_path = os.path.join(manager.base_path, "archive.json")
+    manager.parsed_path = os.path.join(manager.base_path, "parsed")
+    return manager
+
+
+def test_archive_by_content(manager, tmp_path):
+    source = tmp_path / "basic.ics"
+    source.write_bytes(calendar("Work", [1, 2]))
+    name = manager.archive_file(str(source))
+    assert name.endswith(".ics.gz")
+    # Same content again: same archive, no leftover temporary files
+    assert manager.archive_file(str(source)) == name
+    assert sorted(os.listdir(manager.base_path)) == ["archive.json", name]
+
+    info = manager.get_catalog()[name]
+    assert (info['events'], info['calendar']) == (2, "Work")
+    assert info['original_name'] == "basic.ics"
+    assert oct(os.stat(os.path.join(manager.base_path, name)).st_mode & 0o777) == oct(0o644)
+
+
+def test_archive_temp_files_are_unique(manager, tmp_path, monkeypatch):
+    temp_paths = []
+    real_rename = os.rename
+
+    def rename(source, target):
+        temp_paths.append(source)
+        real_rename(source, target)
+
+    monkeypatch.setattr(os, 'rename', rename)
+    for index in range(3):
+        source = tmp_path / ("cal%d.ics" % index)
+        source.write_bytes(calendar("Cal %d" % index, [index + 1]))
+        manager.archive_file(str(source))
+    archive_temps = [path for path in temp_paths
+                     if os.path.basename(path).startswith("archive_")]
+    assert len(archive_temps) == 3
+    assert len(set(archive_temps)) == 3
+
+
+def test_scoped_iteration_keeps_other_caches(manager, tmp_path):
+    paths = []
+    for index in range(2):
+        source = tmp_path / ("cal%d.ics" % index)
+        source.write_bytes(calendar("Cal %d" % index, [index + 1]))
+        paths.append(os.path.join(manager.base_path,
+                                  manager.archive_file(str(source))))
+    events = list(manager.iter_archive_events(paths))
+    assert [title for title, _date, _lines in events] == ["Event 1", "Event 2"]
+    caches = set(os.listdir(manager.parsed_path))
+    assert len(caches) == 2
+
+    # Only one archive read: the cache of the other one stays
+    assert len(list(manager.iter_archive_events(paths[:1]))) == 1
+    assert set(os.listdir(manager.parsed_path)) == caches
+
+    # An archive that is gone loses its cache
+    os.remove(paths[1])
+    kept_cache = os.path.basename(manager.get_parsed_cache_path(paths[0]))
+    list(manager.iter_archive_events(paths[:1]))
+    assert os.listdir(manager.parsed_path) == [kept_cache]
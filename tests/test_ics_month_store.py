@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Month buckets of the ICS database and the migration of the day files.
+"""
+import os
+
+import pytest
+
+from Plugins.Extensions.Calendar import ics_month_store
+from Plugins.Extensions.Calendar.ics_month_store import ICSMonthStore
+
+RECORD = ["BEGIN:VCALENDAR", "SUMMARY:Dentist", "END:VCALENDAR"]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ics_month_store, 'ICS_BASE_PATH', str(tmp_path))
+    return ICSMonthStore("it")
+
+
+def write_day_file(store, name, lines):
+    day_dir = store.day_path
+    if not os.path.exists(day_dir):
+        os.makedirs(day_dir)
+    with open(os.path.join(day_dir, name), 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    return os.path.join(day_dir, name)
+
+
+def test_day_files_migrate_into_buckets(store):
+    first = write_day_file(store, "20250102.txt", RECORD)
+    second = write_day_file(store, "20250131.txt", ["Party|Friends|event"])
+    other = write_day_file(store, "20250301.txt", ["Trip|Rome|event"])
+    notes = write_day_file(store, "notes.txt", ["not a day file"])
+
+    assert store.get_days(2025, 1) == [2, 31]
+    assert store.get_day(2025, 1, 2) == RECORD
+    assert store.get_day(2025, 1, 31) == ["Party|Friends|event"]
+    assert store.get_day(2025, 3, 1) == ["Trip|Rome|event"]
+    for path in (first, second, other):
+        assert not os.path.exists(path)
+    assert os.path.exists(notes)
+
+
+def test_migration_keeps_existing_bucket_days(store):
+    store.migrated = True
+    store.write_month(2025, 1, {5: ["Gym|Weekly|event"]})
+    write_day_file(store, "20250105.txt", RECORD)
+
+    store.migrated = False
+    assert store.get_day(2025, 1, 5) == ["Gym|Weekly|event"] + RECORD
+
+
+def test_merge_replaces_entries_by_title_and_type(store):
+    store.set_day_record(2025, 6, 10, RECORD)
+    store.merge_entries({"20250610": ["Meeting|Old|event"]})
+    store.merge_entries({"20250610": ["meeting|New|event", "Lunch||event"]})
+
+    lines = store.get_day(2025, 6, 10)
+    assert lines[:3] == RECORD
+    assert sorted(lines[3:]) == ["Lunch||event", "meeting|New|event"]
+
+
+def test_index_offsets_point_at_each_day(store):
+    days = dict((day, ["Day %d|è|event" % day]) for day in (1, 9, 28))
+    store.write_month(2024, 2, days)
+    with open(store.get_month_file(2024, 2), 'rb') as f:
+        index, _body_start = store.read_index(f)
+    assert sorted(index) == [1, 9, 28]
+    for day, lines in days.items():
+        assert store.get_day(2024, 2, day) == lines
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Unfolding of ICS/vCard content lines, also when a fold splits a UTF-8
+character (folds are at 75 octets, not characters).
+"""
+import gzip
+
+from Plugins.Extensions.Calendar.ics_manager import ics_manager
+from Plugins.Extensions.Calendar.ics_parser import (
+    iter_ics_file,
+    iter_ics_text,
+    read_calendar_name,
+    unfold_bytes,
+    unfold_lines,
+)
+from Plugins.Extensions.Calendar.parallel_parser import iter_record_blocks
+from Plugins.Extensions.Calendar.vcf_importer import VCardFileImporter
+
+TEXT = u"a" * 60 + u"é" * 10
+
+
+def fold_octets(line):
+    """Fold at 75 octets without caring for UTF-8 boundaries"""
+    data = line.encode('utf-8')
+    parts = [data[:75]]
+    data = data[75:]
+    while data:
+        parts.append(b" " + data[:74])
+        data = data[74:]
+    return b"\r\n".join(parts) + b"\r\n"
+
+
+def calendar_bytes():
+    return (b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" +
+            fold_octets(u"X-WR-CALNAME:" + TEXT) +
+            b"BEGIN:VEVENT\r\nUID:1\r\nDTSTART;VALUE=DATE:20250101\r\n" +
+            fold_octets(u"SUMMARY:" + TEXT) +
+            b"END:VEVENT\r\nEND:VCALENDAR\r\n")
+
+
+def test_fold_splits_a_character():
+    # The fixture really cuts inside the 4th character
+    assert b"\xc3\r\n \xa9" in fold_octets(u"SUMMARY:" + TEXT)
+
+
+def test_unfold_text_lines():
+    lines = ["SUMMARY:Long", "  line", "\tcontinued", "UID:1"]
+    assert list(unfold_lines(lines)) == ["SUMMARY:Long linecontinued", "UID:1"]
+    assert unfold_bytes(b"A:x\r\n y\n\tz\r\nB:1") == b"A:xyz\r\nB:1"
+
+
+def test_text_with_escapes():
+    content = u"BEGIN:VEVENT\nSUMMARY:a\\, b\\; c\\nd\nEND:VEVENT\n"
+    component = next(iter_ics_text(content))
+    assert component.get('SUMMARY') == u"a, b; c\nd"
+
+
+def test_ics_file_keeps_split_characters(tmp_path):
+    path = tmp_path / "calendar.ics"
+    path.write_bytes(calendar_bytes())
+    components = list(iter_ics_file(str(path)))
+    assert len(components) == 1
+    component, bytes_read, size = components[0]
+    assert component.get('SUMMARY') == TEXT
+    assert bytes_read <= size == len(calendar_bytes())
+    assert read_calendar_name(str(path)) == TEXT
+
+
+def test_gzip_file_keeps_split_characters(tmp_path):
+    path = tmp_path / "calendar.ics.gz"
+    with gzip.open(str(path), 'wb') as f:
+        f.write(calendar_bytes())
+    component, _bytes_read, _size = next(iter_ics_file(str(path)))
+    assert component.get('SUMMARY') == TEXT
+
+
+def test_catalog_scan_keeps_split_characters(tmp_path):
+    path = tmp_path / "calendar.ics"
+    path.write_bytes(calendar_bytes())
+    info = ics_manager.scan_file(str(path))
+    assert info['events'] == 1
+    assert info['calendar'] == TEXT
+
+
+def test_record_blocks_keep_split_characters(tmp_path):
+    lines = calendar_bytes().splitlines(True)
+    blocks = list(iter_record_blocks(lines, 'vevent'))
+    assert len(blocks) == 1
+    component = next(iter_ics_text(u"BEGIN:VEVENT\n" + blocks[0][0]))
+    assert component.get('SUMMARY') == TEXT
+
+
+def test_vcard_keeps_split_characters(tmp_path):
+    path = tmp_path / "contacts.vcf"
+    path.write_bytes(b"BEGIN:VCARD\r\nVERSION:3.0\r\n" +
+                     fold_octets(u"FN:" + TEXT) +
+                     b"TEL:+39 06 1234567\r\nEND:VCARD\r\n")
+    cards = list(VCardFileImporter.iter_vcard_file(str(path)))
+    assert len(cards) == 1
+    assert cards[0][0]['FN'] == TEXT
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+UID based re-import: compute_sync_diff and the ICS import pipeline apply
+newer revisions and cancellations of stored events.
+"""
+from Plugins.Extensions.Calendar.ics_importer import ICSFileImporterThread
+from Plugins.Extensions.Calendar.ics_parser import iter_ics_file
+from Plugins.Extensions.Calendar.ics_sync import compute_sync_diff
+
+
+class Manager(object):
+    """The EventManager calls used by the sync and the importer"""
+
+    def __init__(self, events=()):
+        self.events = list(events)
+        self.saves = 0
+
+    def add_event(self, event, save=True):
+        self.events.append(event)
+
+    def save_events(self):
+        self.saves += 1
+
+    def invalidate_event_index(self):
+        pass
+
+
+def vevent(uid, summary, start="20250110", sequence=0, status=None,
+           modified="20250101T000000Z"):
+    lines = ["BEGIN:VEVENT", "UID:" + uid, "SUMMARY:" + summary,
+             "DTSTART;VALUE=DATE:" + start, "SEQUENCE:%d" % sequence,
+             "LAST-MODIFIED:" + modified]
+    if status:
+        lines.append("STATUS:" + status)
+    return lines + ["END:VEVENT"]
+
+
+def write_calendar(path, events, name="Work"):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "X-WR-CALNAME:" + name]
+    for event in events:
+        lines.extend(event)
+    lines.append("END:VCALENDAR")
+    path.write_text("\r\n".join(lines) + "\r\n")
+    return str(path)
+
+
+def load_events(filepath):
+    source = ICSFileImporterThread.get_source_name(filepath)
+    events = []
+    for component, _bytes_read, _size in iter_ics_file(filepath):
+        event = ICSFileImporterThread.event_from_component(component)
+        event.source = source
+        events.append(event)
+    return events
+
+
+def stored_calendar(tmp_path):
+    return load_events(write_calendar(tmp_path / "old.ics", [
+        vevent("same", "Standup"),
+        vevent("edited", "Review", sequence=1),
+        vevent("touched", "Lunch"),
+        vevent("dropped", "Retro"),
+        vevent("gone", "Planning"),
+    ]))
+
+
+def newer_calendar(tmp_path):
+    return write_calendar(tmp_path / "new.ics", [
+        vevent("same", "Standup"),
+        vevent("edited", "Code review", start="20250111", sequence=2),
+        vevent("touched", "Team lunch", modified="20250105T000000Z"),
+        vevent("dropped", "Retro", sequence=1, status="CANCELLED"),
+        vevent("added", "Demo"),
+        vevent("never", "Offsite", status="CANCELLED"),
+    ])
+
+
+def test_compute_sync_diff(tmp_path):
+    manager = Manager(stored_calendar(tmp_path))
+    diff = compute_sync_diff(manager, newer_calendar(tmp_path))
+
+    assert diff['source'] == "Work"
+    assert [event.uid for event in diff['added']] == ["added"]
+    assert dict((old.uid, new.title) for old, new in diff['changed']) == {
+        "edited": "Code review", "touched": "Team lunch"}
+    assert sorted(event.uid for event in diff['cancelled']) == [
+        "dropped", "gone"]
+    assert diff['unchanged'] == 1
+
+
+def test_older_revision_is_unchanged(tmp_path):
+    stored = load_events(write_calendar(tmp_path / "old.ics", [
+        vevent("a", "Current", sequence=3)]))
+    filepath = write_calendar(tmp_path / "new.ics", [
+        vevent("a", "Outdated", sequence=2)])
+    diff = compute_sync_diff(Manager(stored), filepath)
+    assert diff['changed'] == []
+    assert diff['unchanged'] == 1
+
+
+def test_other_calendars_are_not_cancelled(tmp_path):
+    stored = load_events(write_calendar(tmp_path / "home.ics", [
+        vevent("home", "Gym")], name="Home"))
+    filepath = write_calendar(tmp_path / "work.ics", [vevent("w", "Demo")])
+    diff = compute_sync_diff(Manager(stored), filepath)
+    assert diff['cancelled'] == []
+
+
+def test_import_updates_and_cancels_stored_events(tmp_path):
+    manager = Manager(stored_calendar(tmp_path))
+    importer = ICSFileImporterThread(
+        manager, newer_calendar(tmp_path), 6, lambda *args: None)
+    importer.parse_and_import_events()
+
+    by_uid = dict((event.uid, event) for event in manager.events)
+    # Not in the file is kept: an import is not a sync
+    assert sorted(by_uid) == ["added", "edited", "gone", "same", "touched"]
+    assert by_uid["edited"].title == "Code review"
+    assert by_uid["edited"].date == "2025-01-11"
+    assert by_uid["edited"].sequence == 2
+    assert by_uid["touched"].title == "Team lunch"
+    assert (importer.imported, importer.updated, importer.skipped) == (1, 3, 2)
+    assert manager.saves >= 1
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Line folding and atomic replace of the streaming ICS writer.
+"""
+import pytest
+
+from Plugins.Extensions.Calendar.ics_writer import FOLD_OCTETS, ICSWriter, fold_line
+
+
+def unfold(data):
+    return data.replace(b"\r\n ", b"").decode('utf-8')
+
+
+def test_short_lines_are_not_folded():
+    assert fold_line("SUMMARY:Test") == b"SUMMARY:Test\r\n"
+    line = "X" * FOLD_OCTETS
+    assert fold_line(line) == line.encode('utf-8') + b"\r\n"
+
+
+def test_long_lines_fold_at_75_octets():
+    line = "DESCRIPTION:" + "x" * 300
+    data = fold_line(line)
+    physical = data[:-2].split(b"\r\n")
+    assert all(len(part) <= FOLD_OCTETS for part in physical)
+    assert all(part.startswith(b" ") for part in physical[1:])
+    assert unfold(data[:-2]) == line
+
+
+def test_folding_does_not_split_utf8_sequences():
+    line = "SUMMARY:" + "a" * 60 + "é" * 40 + "€" * 20
+    data = fold_line(line)
+    for part in data[:-2].split(b"\r\n"):
+        assert len(part) <= FOLD_OCTETS
+        part.decode('utf-8')
+    assert unfold(data[:-2]) == line
+
+
+def test_writer_replaces_file_on_close(tmp_path):
+    path = tmp_path / "export.ics"
+    path.write_bytes(b"old")
+    with ICSWriter(str(path), "-//Test//EN") as writer:
+        writer.write_component(["UID:1", "SUMMARY:One"])
+        writer.write_property("DESCRIPTION", "a,b;c")
+    data = path.read_bytes()
+    assert data.startswith(b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    assert b"BEGIN:VEVENT\r\nUID:1\r\nSUMMARY:One\r\nEND:VEVENT\r\n" in data
+    assert b"DESCRIPTION:a\\,b\\;c\r\n" in data
+    assert data.endswith(b"END:VCALENDAR\r\n")
+    assert writer.components == 1
+    assert not (tmp_path / "export.ics.tmp").exists()
+
+
+def test_failed_export_keeps_previous_file(tmp_path):
+    path = tmp_path / "export.ics"
+    path.write_bytes(b"old")
+    with pytest.raises(ValueError):
+        with ICSWriter(str(path), "-//Test//EN") as writer:
+            writer.write_component(["UID:1"])
+            raise ValueError("export failed")
+    assert path.read_bytes() == b"old"
+    assert not (tmp_path / "export.ics.tmp").exists()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Record counts and byte offsets of the import pre-scan.
+"""
+import gzip
+
+from Plugins.Extensions.Calendar import prescan
+from Plugins.Extensions.Calendar.prescan import count_records, scan_records
+
+EVENT = (b"BEGIN:VEVENT\r\nUID:{0}\r\nSUMMARY:Event {0}\r\n"
+         b"DESCRIPTION:begin:vevent in the text\r\nEND:VEVENT\r\n")
+
+
+def write_calendar(path, count):
+    data = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+    data += b"".join(EVENT.replace(b"{0}", str(i).encode()) for i in range(count))
+    data += b"END:VCALENDAR\r\n"
+    path.write_bytes(data)
+    return data
+
+
+def test_counts_events_not_text_mentions(tmp_path):
+    path = tmp_path / "calendar.ics"
+    write_calendar(path, 25)
+    assert count_records(str(path), 'vevent') == 25
+    assert count_records(str(path), 'vcard') == 0
+
+
+def test_marker_on_first_line_and_any_case(tmp_path):
+    path = tmp_path / "contacts.vcf"
+    path.write_bytes(b"BEGIN:VCARD\nFN:A\nEND:VCARD\nbegin:vcard\nFN:B\n"
+                     b"end:vcard\nBEGIN:VCARDX\n")
+    scan = scan_records(str(path), 'vcard')
+    assert scan.count == 2
+    assert list(scan.offsets) == [0, 27]
+
+
+def test_offsets_split_into_chunk_ranges(tmp_path):
+    path = tmp_path / "calendar.ics"
+    data = write_calendar(path, 5)
+    scan = scan_records(str(path), 'vevent')
+    ranges = list(scan.chunk_ranges(2))
+    assert [records for _start, _end, records in ranges] == [2, 2, 1]
+    assert ranges[-1][1] == len(data)
+    for start, _end, _records in ranges:
+        assert data[start:start + 12] == b"BEGIN:VEVENT"
+    # Resume: records before the offset are skipped
+    assert list(scan.chunk_ranges(2, ranges[1][0])) == ranges[1:]
+
+
+def test_gzip_stream_matches_across_blocks(tmp_path, monkeypatch):
+    # Blocks smaller than an event: markers cross block boundaries
+    monkeypatch.setattr(prescan, 'SCAN_BLOCK', 7)
+    plain = tmp_path / "calendar.ics"
+    data = write_calendar(plain, 12)
+    packed = tmp_path / "calendar.ics.gz"
+    with gzip.open(str(packed), 'wb') as f:
+        f.write(data)
+    expected = list(scan_records(str(plain), 'vevent').offsets)
+    scan = scan_records(str(packed), 'vevent')
+    assert scan.count == 12
+    assert list(scan.offsets) == expected
@@ -0,0 +1,263 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Backup and restore of the whole Calendar database.
+
+The data directory (events, contacts, holidays, day files, ICS archive)
+and the plugin settings are streamed into a single .tar.gz:
+
+    manifest.json   - first member: version, date, files and categories
+    calendar.cfg    - plugin settings (same format as the plugin file)
+    <files>         - paths relative to the data directory
+
+One sequential compressed file copies much faster over FTP/Samba and
+writes far less to flash than thousands of small files. Restore reads the
+archive as a stream too and can be limited to some categories; each file
+is written as .tmp and renamed, with its original mtime so that the ICS
+archive catalog and the parsed cache stay valid. Derived data (the parsed
+ICS cache, leftover .tmp files) is not saved.
+"""
+from __future__ import print_function
+import io
+import json
+import os
+import tarfile
+import time
+from datetime import datetime
+from os.path import dirname, exists, join, normpath
+
+from . import _, __version__
+from .config_manager import (
+    get_all_config_values,
+    get_debug,
+    save_plugin_config,
+)
+from .formatters import DATA_PATH
+from .ics_manager import PARSED_DIR
+
+BACKUP_VERSION = 1
+BACKUP_SUFFIX = ".tar.gz"
+MANIFEST_MEMBER = "manifest.json"
+SETTINGS_MEMBER = "calendar.cfg"
+COPY_BUFFER = 65536
+
+# tmpfs on the receiver images
+VOLATILE_DIRS = ("/tmp", "/var/volatile")
+
+CATEGORIES = ("events", "contacts", "holidays", "dates", "ics", "settings",
+              "other")
+
+
+def member_category(name):
+    """Restore category of an archive member"""
+    if name == SETTINGS_MEMBER:
+        return "settings"
+    parts = name.split("/")
+    if parts[0] in ("events.json", "notified_events.json"):
+        return "events"
+    if parts[0] in ("contacts", "vcard"):
+        return "contacts"
+    if parts[0] == "ics":
+        return "ics"
+    if parts[0] == "holidays":
+        return "holidays"
+    if len(parts) > 1:
+        # Personal dates: <language>/YYYYMMDD.txt, <language>/day/YYYYMMDD.txt
+        return "dates"
+    return "other"
+
+
+def is_volatile_path(path):
+    """True for RAM-backed directories cleared at every reboot"""
+    path = normpath(path)
+    return any(path == root or path.startswith(root + "/")
+               for root in VOLATILE_DIRS)
+
+
+def collect_files(data_path=DATA_PATH):
+    """(relative path, full path, size) of the files to back up"""
+    files = []
+    for root, dirs, filenames in os.walk(data_path):
+        rel_root = os.path.relpath(root, data_path)
+        if rel_root == ".":
+            rel_root = ""
+        # Derived data, rebuilt on demand
+        if rel_root == "ics":
+            dirs[:] = [d for d in dirs if d != PARSED_DIR]
+        dirs.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".tmp"):
+                continue
+            full_path = join(root, filename)
+            rel_path = join(rel_root, filename) if rel_root else filename
+            files.append((rel_path.replace(os.sep, "/"), full_path,
+                          os.path.getsize(full_path)))
+    return files
+
+
+def _add_bytes(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def create_backup(output_path, data_path=DATA_PATH, job=None):
+    """Stream the database into output_path - returns the files saved"""
+    temp_path = output_path + ".tmp"
+    files = collect_files(data_path)
+    categories = {}
+    for rel_path, _full_path, _size in files:
+        category = member_category(rel_path)
+        categories[category] = categories.get(category, 0) + 1
+    categories["settings"] = 1
+
+    manifest = {
+        'version': BACKUP_VERSION,
+        'plugin_version': __version__,
+        'created': datetime.now().isoformat(),
+        'files': [[rel_path, size] for rel_path, _full_path, size in files],
+        'categories': categories,
+    }
+
+    if job is not None:
+        job.set_phase(_("Backup"), len(files))
+
+    tar = tarfile.open(temp_path, "w|gz")
+    try:
+        _add_bytes(tar, MANIFEST_MEMBER, json.dumps(manifest).encode('utf-8'))
+        _add_bytes(tar, SETTINGS_MEMBER, json.dumps(
+            get_all_config_values(), indent=4, sort_keys=True,
+            default=str).encode('utf-8'))
+
+        count = 0
+        for rel_path, full_path, _size in files:
+            if job is not None:
+                job.step()
+            try:
+                tar.add(full_path, arcname=rel_path, recursive=False)
+                count += 1
+            except (IOError, OSError) as e:
+                # Removed or unreadable while the backup runs
+                print("[Backup] Skipping {0}: {1}".format(rel_path, e))
+        tar.close()
+    except BaseException:
+        tar.close()
+        if exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    os.rename(temp_path, output_path)
+    if get_debug():
+        print("[Backup] {0}: {1} files, {2} bytes".format(
+            output_path, count, os.path.getsize(output_path)))
+    return count
+
+
+def read_backup_manifest(backup_path):
+    """Manifest of a backup (first member), or None"""
+    try:
+        tar = tarfile.open(backup_path, "r|gz")
+        try:
+            for member in tar:
+                if member.name == MANIFEST_MEMBER:
+                    return json.loads(tar.extractfile(member).read().decode('utf-8'))
+                break
+        finally:
+            tar.close()
+    except Exception as e:
+        print("[Backup] Error reading {0}: {1}".format(backup_path, e))
+    return None
+
+
+def _safe_member_path(data_path, name):
+    """Target of a member inside data_path, None for unsafe names"""
+    name = normpath(name)
+    if name.startswith(("/", "..")) or os.path.isabs(name):
+        return None
+    return join(data_path, name)
+
+
+def _extract_member(tar, member, target):
+    directory = dirname(target)
+    if not exists(directory):
+        os.makedirs(directory)
+    temp_path = target + ".tmp"
+    source = tar.extractfile(member)
+    with open(temp_path, 'wb') as f:
+        while True:
+            data = source.read(COPY_BUFFER)
+            if not data:
+                break
+            f.write(data)
+    os.rename(temp_path, target)
+    os.utime(target, (member.mtime, member.mtime))
+
+
+def restore_backup(backup_path, categories=None, data_path=DATA_PATH, job=None):
+    """Stream-extract a backup into data_path
+
+    categories limits the restore (see CATEGORIES), None restores all.
+    Returns (files restored, set of restored categories). Settings are
+    written to the plugin config file; the caller applies them with
+    restore_from_plugin_file() and reloads the managers. A cancelled
+    restore keeps the files restored so far.
+    """
+    restored = set()
+    count = 0
+    tar = tarfile.open(backup_path, "r|gz")
+    try:
+        for member in tar:
+            if member.name == MANIFEST_MEMBER:
+                manifest = json.loads(
+                    tar.extractfile(member).read().decode('utf-8'))
+                if manifest.get('version') != BACKUP_VERSION:
+                    raise ValueError(_("Unsupported backup version"))
+                if job is not None:
+                    job.set_phase(_("Restore"), len(manifest.get('files', ())))
+                continue
+
+            category = member_category(member.name)
+            wanted = categories is None or category in categories
+
+            if member.name == SETTINGS_MEMBER:
+                if wanted:
+                    settings = json.loads(
+                        tar.extractfile(member).read().decode('utf-8'))
+                    # Applied by the caller on the main loop
+                    if save_plugin_config(settings):
+                        restored.add(category)
+                continue
+
+            if not member.isfile():
+                continue
+            if job is not None:
+                job.step()
+            if not wanted:
+                continue
+
+            target = _safe_member_path(data_path, member.name)
+            if target is None:
+                print("[Backup] Skipping unsafe member: {0}".format(member.name))
+                continue
+            _extract_member(tar, member, target)
+            restored.add(category)
+            count += 1
+    finally:
+        tar.close()
+
+    if get_debug():
+        print("[Backup] Restored {0} files from {1} ({2})".format(
+            count, backup_path, ", ".join(sorted(restored))))
+    return count, restored
@@ -20,6 +20,38 @@ from os.path import exists, join
 
 from .formatters import CONTACTS_PATH
 from .config_manager import get_debug
+from .duplicate_checker import ContactIndex
+from .export_filter import ContactQueryIndex
+
+
+def contact_name_key(contact):
+    """Sort key of the contact list (name order)"""
+    return contact.get('FN', '').lower()
+
+
+def merge_by_name(contacts, new_contacts):
+    """New list: contacts (sorted by name) with new_contacts in place
+
+    Positions come from a binary search, so only the new contacts compute
+    their sort key; the stored part is copied slice by slice.
+    """
+    merged = []
+    start = 0
+    for contact in sorted(new_contacts, key=contact_name_key):
+        key = contact_name_key(contact)
+        lo = start
+        hi = len(contacts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if contact_name_key(contacts[mid]) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        merged.extend(contacts[start:lo])
+        merged.append(contact)
+        start = lo
+    merged.extend(contacts[start:])
+    return merged
 
 
 class BirthdayManager:
@@ -28,6 +60,12 @@ class BirthdayManager:
     def __init__(self):
         self.contacts_path = CONTACTS_PATH
         self.contacts = []
+        self.contact_ids = set()        # ids in self.contacts
+        self.sorted_by_name = False
+        self.last_contact_id = 0
+        self.contact_index = ContactIndex()
+        self.query_index = None
+        self._query_contacts = None
         self._ensure_directories()
         self.load_all_contacts()
 
@@ -38,7 +76,8 @@ class BirthdayManager:
 
     def sort_contacts_by_name(self):
         """Sort contacts alphabetically by FN (Formatted Name)"""
-        self.contacts.sort(key=lambda x: x.get('FN', '').lower())
+        self.contacts.sort(key=contact_name_key)
+        self.sorted_by_name = True
 
     def sort_contacts_by_birthday(self):
         """Sort contacts by birthday (month/day)"""
@@ -64,10 +103,12 @@ class BirthdayManager:
                         'FN', '').lower())  # No birthday at end
 
         self.contacts.sort(key=get_birthday_sort_key)
+        self.sorted_by_name = False
 
     def sort_contacts_by_category(self):
         """Sort contacts by category"""
         self.contacts.sort(key=lambda x: x.get('CATEGORIES', '').lower())
+        self.sorted_by_name = False
 
     def search_and_sort(self, search_term, sort_by='name'):
         """
@@ -118,6 +159,21 @@ class BirthdayManager:
 
         return results
 
+    def get_query_index(self):
+        """Birthday/category index for scoped exports
+
+        The contact list is replaced on every change, so the index is
+        rebuilt when the list is no longer the indexed one.
+        """
+        if self._query_contacts is not self.contacts:
+            self.query_index = ContactQueryIndex(self.contacts)
+            self._query_contacts = self.contacts
+        return self.query_index
+
+    def query_contacts(self, export_filter, need_birthday=False):
+        """Contacts matching an ExportFilter"""
+        return self.get_query_index().query(export_filter, need_birthday)
+
     def get_contacts_by_birthday_month(self, month):
         """Get contacts with birthdays in specific month"""
         results = []
@@ -166,6 +222,7 @@ class BirthdayManager:
     def load_all_contacts(self):
         """Load all contacts from directory - SORTED by name"""
         self.contacts = []
+        self.contact_index.clear()
 
         if not exists(self.contacts_path):
             return
@@ -179,6 +236,8 @@ class BirthdayManager:
 
         # SORT contacts alphabetically when loading
         self.sort_contacts_by_name()
+        self.contact_ids = set(c['id'] for c in self.contacts)
+        self.contact_index.rebuild(self.contacts)
         if get_debug():
             print("[BirthdayManager] Loaded {0} contacts (sorted)".format(
                 len(self.contacts)))
@@ -253,54 +312,117 @@ class BirthdayManager:
 
     def save_contact(self, contact_data):
         """Save contact to file"""
+        try:
+            contact_id = self._write_contact_file(contact_data)
+
+            # Refresh only this contact in memory and in the index
+            self._store_contacts([contact_id])
+            return contact_id
+
+        except Exception as e:
+            print("[BirthdayManager] Error saving contact: {0}".format(str(e)))
+            return None
+
+    def save_contacts(self, contacts):
+        """Save several contacts at once - single refresh at the end"""
+        saved_ids = []
+        for contact_data in contacts:
+            try:
+                saved_ids.append(self._write_contact_file(contact_data))
+            except Exception as e:
+                print(
+                    "[BirthdayManager] Error saving contact {0}: {1}".format(
+                        contact_data.get('FN', ''), str(e)))
+
+        if saved_ids:
+            self._store_contacts(saved_ids)
+
+        if get_debug():
+            print("[BirthdayManager] Batch saved {0}/{1} contacts".format(
+                len(saved_ids), len(contacts)))
+        return saved_ids
+
+    def new_contact_id(self):
+        """Unused contact ID (unique even for several per millisecond)
+
+        Importers take the ID before the batched save; IDs given out in
+        the same millisecond continue after the last one.
+        """
+        number = max(int(time.time() * 1000), self.last_contact_id + 1)
+        while (str(number) in self.contact_index or
+               exists(join(self.contacts_path, str(number) + ".txt"))):
+            number += 1
+        self.last_contact_id = number
+        return str(number)
+
+    def _write_contact_file(self, contact_data):
+        """Write contact to its file and return the contact ID"""
         if 'id' in contact_data:
             contact_id = contact_data['id']
         else:
-            # Generate new ID
-            contact_id = str(int(time.time() * 1000))
+            contact_id = self.new_contact_id()
             contact_data['id'] = contact_id
 
         filepath = join(self.contacts_path, contact_id + ".txt")
 
-        try:
-            if get_debug():
-                print("[DEBUG BirthdayManager] Saving contact data:")
-                for key, value in contact_data.items():
-                    print("  {0}: {1}".format(key, value))
+        if get_debug():
+            print("[DEBUG BirthdayManager] Saving contact data:")
+            for key, value in contact_data.items():
+                print("  {0}: {1}".format(key, value))
 
-            content = "[contact]\n"
+        content = "[contact]\n"
 
-            # List of ALL possible fields to save
-            all_fields = ['FN', 'BDAY', 'TEL', 'EMAIL', 'ADR',
-                          'ORG', 'TITLE', 'CATEGORIES', 'NOTE', 'URL']
+        # List of ALL possible fields to save
+        all_fields = ['FN', 'BDAY', 'TEL', 'EMAIL', 'ADR',
+                      'ORG', 'TITLE', 'CATEGORIES', 'NOTE', 'URL']
 
-            for field in all_fields:
-                value = contact_data.get(field, '')
-                if value:
-                    content += "{0}: {1}\n".format(field, value)
+        for field in all_fields:
+            value = contact_data.get(field, '')
+            if value:
+                content += "{0}: {1}\n".format(field, value)
 
-            # Add creation date if new contact
-            if 'created' not in contact_data or not contact_data['created']:
-                contact_data['created'] = datetime.now().strftime(
-                    "%Y-%m-%d %H:%M:%S")
+        # Add creation date if new contact
+        if 'created' not in contact_data or not contact_data['created']:
+            contact_data['created'] = datetime.now().strftime(
+                "%Y-%m-%d %H:%M:%S")
 
-            content += "CREATED: {0}\n".format(contact_data.get('created', ''))
+        content += "CREATED: {0}\n".format(contact_data.get('created', ''))
 
-            if get_debug():
-                print(
-                    "[DEBUG BirthdayManager] File content:\n{0}".format(content))
+        if get_debug():
+            print(
+                "[DEBUG BirthdayManager] File content:\n{0}".format(content))
 
-            # Save to file
-            with open(filepath, 'w') as f:
-                f.write(content)
+        # Save to file
+        with open(filepath, 'w') as f:
+            f.write(content)
 
-            # Reload contacts
-            self.load_all_contacts()
-            return contact_id
+        return contact_id
 
-        except Exception as e:
-            print("[BirthdayManager] Error saving contact: {0}".format(str(e)))
-            return None
+    def _store_contacts(self, contact_ids):
+        """Reload saved contacts into the list and the index
+
+        New contacts are merged into the name order; the list is only
+        filtered when the batch replaces stored contacts.
+        """
+        reloaded = {}
+        for contact_id in contact_ids:
+            contact = self.load_contact(contact_id)
+            if contact:
+                reloaded[contact_id] = contact
+        if not reloaded:
+            return
+        # Build a new list so callers iterating the old one are not affected
+        contacts = self.contacts
+        if not self.contact_ids.isdisjoint(reloaded):
+            contacts = [c for c in contacts if c.get('id') not in reloaded]
+        if self.sorted_by_name:
+            self.contacts = merge_by_name(contacts, reloaded.values())
+        else:
+            self.contacts = contacts + list(reloaded.values())
+            self.sort_contacts_by_name()
+        self.contact_ids.update(reloaded)
+        for contact in reloaded.values():
+            self.contact_index.add(contact)
 
     def delete_contact(self, contact_id):
         """Delete contact"""
@@ -309,7 +431,10 @@ class BirthdayManager:
         if exists(filepath):
             try:
                 remove(filepath)
-                self.load_all_contacts()
+                self.contacts = [
+                    c for c in self.contacts if c.get('id') != contact_id]
+                self.contact_ids.discard(contact_id)
+                self.contact_index.remove(contact_id)
                 return True
             except Exception as e:
                 print(
@@ -52,6 +52,14 @@ CONFIG_MAP = {
     "check_interval": (ConfigInteger, [], {"default": 60, "limits": (10, 300)}),
     "auto_clean_notifications": (ConfigYesNo, [], {"default": False}),
     "notification_cache_days": (ConfigInteger, [], {"default": 7, "limits": (1, 30)}),
+    "import_time_budget": (ConfigInteger, [], {"default": 30, "limits": (5, 500)}),
+    "import_parse_thread": (ConfigYesNo, [], {"default": False}),
+    "parse_workers": (ConfigInteger, [], {"default": 1, "limits": (0, 8)}),
+
+    # ICS IMPORT
+    "birthday_rule_yearly": (ConfigYesNo, [], {"default": False}),
+    "birthday_rule_default_time": (ConfigYesNo, [], {"default": False}),
+    "birthday_keywords": (ConfigText, [], {"default": "", "fixed_size": False}),
 
     # EVENTS
     "events_enabled": (ConfigYesNo, [], {"default": False}),
@@ -108,6 +116,36 @@ CONFIG_MAP = {
         ],
         "default": "vcard"
     }),
+    "export_changes_only": (ConfigYesNo, [], {"default": False}),
+    "export_deletions": (ConfigYesNo, [], {"default": True}),
+    "export_date_from": (ConfigText, [], {"default": "", "fixed_size": False}),
+    "export_date_to": (ConfigText, [], {"default": "", "fixed_size": False}),
+    "export_labels": (ConfigText, [], {"default": "", "fixed_size": False}),
+    "export_manual": (ConfigYesNo, [], {"default": True}),
+    "export_ics": (ConfigYesNo, [], {"default": True}),
+    "export_birthdays": (ConfigYesNo, [], {"default": True}),
+    "export_holidays": (ConfigYesNo, [], {"default": False}),
+    "export_enabled_only": (ConfigYesNo, [], {"default": True}),
+    "csv_layout": (ConfigSelection, [], {
+        "choices": [
+            ("calendar", _("Calendar Planner")),
+            ("google", _("Google")),
+            ("outlook", _("Outlook"))
+        ],
+        "default": "calendar"
+    }),
+    "csv_column_map": (ConfigText, [], {"default": "", "fixed_size": False}),
+
+    # BACKUP (not in /tmp: RAM, cleared at reboot)
+    "backup_location": (ConfigSelection, [], {
+        "choices": [
+            ("/home/root/", _("Root Home (/home/root)")),
+            ("/media/hdd/", _("Hard Disk (/media/hdd)")),
+            ("/media/usb/", _("USB Drive (/media/usb)")),
+            ("/tmp/", _("Temporary Storage (/tmp, lost at reboot)"))
+        ],
+        "default": "/home/root/"
+    }),
 
     # COLORS (special cases with choices)
     "events_color": (ConfigSelection, [], {
@@ -493,6 +531,92 @@ def get_export_format():
     return "vcard"
 
 
+def get_export_changes_only():
+    """Check if exports only write items changed since the last export"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'export_changes_only')):
+            return config.plugins.calendar.export_changes_only.value
+    except BaseException:
+        pass
+    return False
+
+
+def get_export_deletions():
+    """Check if differential ICS exports cancel deleted events"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'export_deletions')):
+            return config.plugins.calendar.export_deletions.value
+    except BaseException:
+        pass
+    return True
+
+
+def get_export_filter_values():
+    """Export scope settings as ExportFilter arguments"""
+    values = {
+        'date_from': "",
+        'date_to': "",
+        'labels': "",
+        'sources': ("manual", "ics", "birthdays"),
+        'enabled_only': True,
+    }
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'export_date_from')):
+            cfg = config.plugins.calendar
+            values['date_from'] = cfg.export_date_from.value
+            values['date_to'] = cfg.export_date_to.value
+            values['labels'] = cfg.export_labels.value
+            values['sources'] = tuple(
+                source for source in ("manual", "ics", "birthdays", "holidays")
+                if getattr(cfg, 'export_' + source).value)
+            values['enabled_only'] = cfg.export_enabled_only.value
+    except BaseException:
+        pass
+    return values
+
+
+def get_csv_layout():
+    """Get the column layout of CSV exports"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'csv_layout')):
+            return config.plugins.calendar.csv_layout.value
+    except BaseException:
+        pass
+    return "calendar"
+
+
+def get_csv_column_map():
+    """Get the extra CSV column mapping ("Header=FIELD; ...")"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'csv_column_map')):
+            return config.plugins.calendar.csv_column_map.value
+    except BaseException:
+        pass
+    return ""
+
+
+def get_backup_location():
+    """Get the directory of database backups"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'backup_location')):
+            return config.plugins.calendar.backup_location.value
+    except BaseException:
+        pass
+    return "/home/root/"
+
+
 def get_check_interval():
     """Get check interval in seconds"""
     try:
@@ -505,6 +629,78 @@ def get_check_interval():
     return 60
 
 
+def get_import_time_budget():
+    """Get milliseconds of import work per timer tick"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'import_time_budget')):
+            return config.plugins.calendar.import_time_budget.value
+    except BaseException:
+        pass
+    return 30
+
+
+def get_import_parse_thread():
+    """Check if imports parse files in a worker thread"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'import_parse_thread')):
+            return config.plugins.calendar.import_parse_thread.value
+    except BaseException:
+        pass
+    return False
+
+
+def get_parse_workers():
+    """Get parser processes for large imports (0 = one per CPU)"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'parse_workers')):
+            return config.plugins.calendar.parse_workers.value
+    except BaseException:
+        pass
+    return 1
+
+
+def get_birthday_rule_yearly():
+    """Check if yearly ICS events are imported as birthdays"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'birthday_rule_yearly')):
+            return config.plugins.calendar.birthday_rule_yearly.value
+    except BaseException:
+        pass
+    return False
+
+
+def get_birthday_rule_default_time():
+    """Check if ICS events at the default time are imported as birthdays"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'birthday_rule_default_time')):
+            return config.plugins.calendar.birthday_rule_default_time.value
+    except BaseException:
+        pass
+    return False
+
+
+def get_birthday_keywords():
+    """Get extra birthday keywords (comma separated)"""
+    try:
+        if (hasattr(config, 'plugins') and
+                hasattr(config.plugins, 'calendar') and
+                hasattr(config.plugins.calendar, 'birthday_keywords')):
+            return config.plugins.calendar.birthday_keywords.value
+    except BaseException:
+        pass
+    return ""
+
+
 def get_all_config_values():
     """Debug function to get all config values"""
     values = {}
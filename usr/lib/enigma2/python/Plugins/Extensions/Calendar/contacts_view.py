@@ -29,6 +29,7 @@ from . import _
 from .birthday_dialog import BirthdayDialog
 from .formatters import format_field_display, MenuDialog
 from .config_manager import get_debug
+from .duplicate_checker import FuzzyDuplicateFinder
 
 
 class ContactsView(Screen):
@@ -107,9 +108,12 @@ class ContactsView(Screen):
                 "pageDown": self.next_page,
                 "prevBouquet": self.previous_contact,
                 "nextBouquet": self.next_contact,
+                "menu": self.show_menu,
             }, -1
         )
+        self.duplicate_finder = None
         self.onShown.append(self.update_list)
+        self.onClose.append(self.cancel_duplicate_search)
 
     def open_search(self):
         """Open search dialog"""
@@ -690,6 +694,103 @@ class ContactsView(Screen):
             _("Confirm delete '{0}'?\n\nThis cannot be undone!").format(contact_name),
             MessageBox.TYPE_YESNO)
 
+    def show_menu(self):
+        """Show contacts tools menu"""
+        menu_items = [
+            (_("Find similar contacts"), "similar"),
+            (_("Cancel"), "cancel")
+        ]
+
+        def menu_callback(selected_item):
+            if selected_item and selected_item[1] == "similar":
+                self.find_similar_contacts()
+
+        self.session.openWithCallback(
+            menu_callback,
+            MenuDialog,
+            menu_items
+        )
+
+    def find_similar_contacts(self):
+        """Search near-identical contacts in time slices"""
+        if self.duplicate_finder:
+            return
+        self.duplicate_finder = FuzzyDuplicateFinder(self.birthday_manager)
+
+        def on_progress(progress):
+            self["title_label"].setText(
+                _("Searching similar contacts... {0}%").format(
+                    int(progress * 100)))
+
+        self.duplicate_finder.start(self.similar_contacts_found, on_progress)
+
+    def cancel_duplicate_search(self):
+        """Stop a running similar contacts search"""
+        if self.duplicate_finder:
+            self.duplicate_finder.cancel()
+            self.duplicate_finder = None
+
+    def similar_contacts_found(self, proposals):
+        """Show merge proposals for review"""
+        self.duplicate_finder = None
+        self.update_list()
+
+        if not proposals:
+            self.session.open(
+                MessageBox,
+                _("No similar contacts found"),
+                MessageBox.TYPE_INFO,
+                timeout=3
+            )
+            return
+
+        menu_items = [
+            ("{0} <- {1} ({2}%, {3})".format(
+                p['keep_name'][:25], p['merge_name'][:25],
+                int(p['score'] * 100), _(p['reason'])), p)
+            for p in proposals
+        ]
+        menu_items.append((_("Cancel"), None))
+
+        def proposal_callback(selected_item):
+            if selected_item and selected_item[1]:
+                self.confirm_merge(selected_item[1], proposals)
+
+        self.session.openWithCallback(
+            proposal_callback,
+            MenuDialog,
+            menu_items
+        )
+
+    def confirm_merge(self, proposal, proposals):
+        """Ask before merging a proposed pair"""
+        def merge_callback(result):
+            if not result:
+                return
+            FuzzyDuplicateFinder.apply_proposal(
+                self.birthday_manager, proposal)
+            self.is_searching = False
+            self.search_term = ''
+            self.update_list()
+
+            # Offer the proposals still valid after this merge
+            merged_ids = (proposal['keep_id'], proposal['merge_id'])
+            remaining = [
+                p for p in proposals
+                if p['merge_id'] not in merged_ids and
+                p['keep_id'] != proposal['merge_id']]
+            if remaining:
+                self.similar_contacts_found(remaining)
+
+        self.session.openWithCallback(
+            merge_callback,
+            MessageBox,
+            _("Merge '{0}' into '{1}'?\n\n{2}").format(
+                proposal['merge_name'], proposal['keep_name'],
+                _(proposal['reason'])),
+            MessageBox.TYPE_YESNO
+        )
+
     def close(self, changes_made=False):
         """Close the screen and indicate if changes were made"""
         if get_debug():
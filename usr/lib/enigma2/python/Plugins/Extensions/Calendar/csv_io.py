@@ -0,0 +1,609 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+CSV import and export of contacts and events.
+
+The header row selects the columns: the Calendar Planner layout (written
+by the CSV exports), Google and Outlook contact exports and the
+Subject/Start Date layout of Google Calendar and Outlook are recognised,
+the csv_column_map setting adds others ("Nome=FN; Oggetto=title").
+Files with a date column and a title/subject are events, the others
+contacts. The delimiter (, ; or tab) is taken from the header.
+
+Rows are streamed: CSVSource reads one line at a time and feeds the same
+import pipeline as the vCard and ICS files, so dedup, batch commit and
+checkpoints are shared and memory does not grow with the file. Exports
+write one row per item to <output>.tmp and rename it when complete.
+"""
+from __future__ import print_function
+import csv
+import os
+import time
+from datetime import datetime
+from os.path import exists, getsize
+from re import sub
+
+from . import _
+from .config_manager import (
+    get_csv_column_map,
+    get_csv_layout,
+    get_debug,
+    get_default_event_time,
+)
+from .event_manager import Event
+from .export_job import ExportCancelled
+from .export_filter import ExportFilter
+from .export_manifest import ExportManifest
+from .formatters import parse_vcard_email, parse_vcard_phone
+from .import_pipeline import ImportRecord, PipelineStage, _timed
+
+CSV_SUFFIX = ".csv"
+CONTACT_FIELDS = ('FN', 'BDAY', 'TEL', 'EMAIL', 'ADR', 'ORG', 'TITLE',
+                  'CATEGORIES', 'NOTE', 'URL')
+NAME_PARTS = ('GIVEN', 'MIDDLE', 'FAMILY')
+EVENT_FIELDS = ('title', 'date', 'time', 'repeat', 'description',
+                'location', 'enabled', 'labels', 'uid')
+REPEAT_VALUES = ('none', 'daily', 'weekly', 'monthly', 'yearly')
+FALSE_VALUES = ('0', 'false', 'no', 'off', 'n', 'disabled')
+MULTI_SEPARATOR = " ::: "   # several values in one Google cell
+
+# Normalized header (lower case, numbers as #) -> contact field
+CONTACT_COLUMNS = {
+    'name': 'FN', 'fn': 'FN', 'full name': 'FN', 'display name': 'FN',
+    'given name': 'GIVEN', 'first name': 'GIVEN',
+    'additional name': 'MIDDLE', 'middle name': 'MIDDLE',
+    'family name': 'FAMILY', 'last name': 'FAMILY',
+    'birthday': 'BDAY', 'bday': 'BDAY',
+    'phone': 'TEL', 'tel': 'TEL', 'phone # - value': 'TEL',
+    'mobile phone': 'TEL', 'home phone': 'TEL', 'home phone #': 'TEL',
+    'business phone': 'TEL', 'business phone #': 'TEL',
+    'other phone': 'TEL', 'primary phone': 'TEL',
+    'email': 'EMAIL', 'e-mail': 'EMAIL', 'e-mail # - value': 'EMAIL',
+    'e-mail address': 'EMAIL', 'e-mail # address': 'EMAIL',
+    'address': 'ADR', 'adr': 'ADR', 'address # - formatted': 'ADR',
+    'home address': 'ADR', 'business address': 'ADR',
+    'organization': 'ORG', 'org': 'ORG', 'company': 'ORG',
+    'organization # - name': 'ORG',
+    'title': 'TITLE', 'job title': 'TITLE', 'organization # - title': 'TITLE',
+    'categories': 'CATEGORIES', 'group membership': 'CATEGORIES',
+    'labels': 'CATEGORIES',
+    'notes': 'NOTE', 'note': 'NOTE',
+    'website': 'URL', 'url': 'URL', 'web page': 'URL',
+    'website # - value': 'URL',
+}
+
+# Normalized header -> event field
+EVENT_COLUMNS = {
+    'title': 'title', 'subject': 'title', 'summary': 'title',
+    'date': 'date', 'start date': 'date',
+    'time': 'time', 'start time': 'time',
+    'repeat': 'repeat',
+    'description': 'description', 'notes': 'description',
+    'location': 'location',
+    'enabled': 'enabled',
+    'labels': 'labels', 'categories': 'labels',
+    'uid': 'uid',
+}
+
+# Export layouts: (header, field) per column
+CONTACT_LAYOUTS = {
+    'calendar': [
+        ("Name", 'FN'), ("Birthday", 'BDAY'), ("Phone", 'TEL'),
+        ("Email", 'EMAIL'), ("Address", 'ADR'), ("Organization", 'ORG'),
+        ("Title", 'TITLE'), ("Categories", 'CATEGORIES'), ("Notes", 'NOTE'),
+        ("Website", 'URL'),
+    ],
+    'google': [
+        ("Name", 'FN'), ("Given Name", 'GIVEN'), ("Family Name", 'FAMILY'),
+        ("Birthday", 'BDAY'), ("Phone 1 - Value", 'TEL'),
+        ("E-mail 1 - Value", 'EMAIL'), ("Address 1 - Formatted", 'ADR'),
+        ("Organization 1 - Name", 'ORG'), ("Organization 1 - Title", 'TITLE'),
+        ("Group Membership", 'CATEGORIES'), ("Notes", 'NOTE'),
+        ("Website 1 - Value", 'URL'),
+    ],
+    'outlook': [
+        ("First Name", 'GIVEN'), ("Last Name", 'FAMILY'),
+        ("Birthday", 'BDAY'), ("Mobile Phone", 'TEL:0'),
+        ("Home Phone", 'TEL:1'), ("Business Phone", 'TEL:2'),
+        ("E-mail Address", 'EMAIL:0'), ("E-mail 2 Address", 'EMAIL:1'),
+        ("E-mail 3 Address", 'EMAIL:2'), ("Home Address", 'ADR'),
+        ("Company", 'ORG'), ("Job Title", 'TITLE'),
+        ("Categories", 'CATEGORIES'), ("Notes", 'NOTE'), ("Web Page", 'URL'),
+    ],
+}
+
+EVENT_LAYOUTS = {
+    'calendar': [
+        ("Title", 'title'), ("Date", 'date'), ("Time", 'time'),
+        ("Repeat", 'repeat'), ("Description", 'description'),
+        ("Enabled", 'enabled'), ("Labels", 'labels'), ("UID", 'uid'),
+    ],
+    # Google Calendar and Outlook share the Subject/Start Date layout
+    'google': [
+        ("Subject", 'title'), ("Start Date", 'date'), ("Start Time", 'time'),
+        ("Description", 'description'), ("Categories", 'labels'),
+    ],
+}
+EVENT_LAYOUTS['outlook'] = EVENT_LAYOUTS['google']
+
+# Headers of layouts writing dates month first (M/D/YYYY)
+MONTH_FIRST_HEADERS = ('start date', 'e-mail address', 'mobile phone')
+
+
+def is_csv_file(filepath):
+    return filepath.lower().endswith(CSV_SUFFIX)
+
+
+def normalize_header(name):
+    """'E-mail 2 Address' -> 'e-mail # address'"""
+    return sub(r'\d+', '#', " ".join(name.strip().lower().split()))
+
+
+def parse_column_map(value):
+    """'Header=FIELD; ...' -> {normalized header: field}
+
+    An empty field ignores the column.
+    """
+    mapping = {}
+    for item in (value or "").split(";"):
+        if "=" not in item:
+            continue
+        header, field = item.split("=", 1)
+        header = normalize_header(header)
+        if header:
+            mapping[header] = field.strip()
+    return mapping
+
+
+def parse_csv_date(value, month_first=False):
+    """Date cell -> YYYY-MM-DD, '' when empty or invalid"""
+    value = value.strip().split('T')[0].split(' ')[0]
+    if not value:
+        return ''
+    # ISO dates (Calendar and Google layouts) without strptime
+    if (len(value) == 10 and value[4] == '-' and value[7] == '-' and
+            value[:4].isdigit() and '01' <= value[5:7] <= '12' and
+            '01' <= value[8:10] <= '31'):
+        return value
+    formats = ['%Y-%m-%d', '%Y%m%d', '%Y/%m/%d']
+    if month_first:
+        formats.extend(['%m/%d/%Y', '%d/%m/%Y'])
+    else:
+        formats.extend(['%d/%m/%Y', '%m/%d/%Y'])
+    formats.extend(['%d.%m.%Y', '%d-%m-%Y'])
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return ''
+
+
+def parse_csv_time(value):
+    """'9:30', '09:30:00', '2:30 PM' -> HH:MM, '' when invalid"""
+    value = value.strip().upper()
+    for fmt in ('%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M:%S %p', '%I %p'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%H:%M')
+        except ValueError:
+            continue
+    return ''
+
+
+def split_multi(value):
+    """Values of a multi-value cell (Google ' ::: ' or new lines)"""
+    return [v.strip() for v in value.replace(MULTI_SEPARATOR, "\n").split("\n")
+            if v.strip()]
+
+
+def one_line(value):
+    """Contacts are stored one field per line"""
+    return value.replace('\r\n', '\n').replace('\n', '\\n')
+
+
+def sniff_delimiter(header_line):
+    """Delimiter of a CSV file from its header line"""
+    counts = [(header_line.count(d), d) for d in (',', ';', '\t')]
+    count, delimiter = max(counts)
+    return delimiter if count else ','
+
+
+def decode_line(raw_line):
+    """UTF-8, falling back to the Windows code page of Outlook exports"""
+    try:
+        return raw_line.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw_line.decode('cp1252', 'replace')
+
+
+class CSVLayout:
+    """Column positions of a CSV header for contacts and events"""
+
+    def __init__(self, header, column_map=None):
+        if column_map is None:
+            column_map = get_csv_column_map()
+        extra = parse_column_map(column_map)
+        names = [normalize_header(name) for name in header]
+        self.header = header
+        self.contact_columns = self.map_columns(
+            names, CONTACT_COLUMNS, extra, CONTACT_FIELDS + NAME_PARTS, True)
+        self.event_columns = self.map_columns(
+            names, EVENT_COLUMNS, extra, EVENT_FIELDS, False)
+        self.month_first = any(name in MONTH_FIRST_HEADERS for name in names)
+
+        contact_fields = set(field for _position, field in self.contact_columns)
+        event_fields = set(field for _position, field in self.event_columns)
+        if 'title' in event_fields and 'date' in event_fields:
+            self.kind = 'events'
+        elif contact_fields.intersection(('FN',) + NAME_PARTS):
+            self.kind = 'contacts'
+        else:
+            self.kind = None
+
+    @staticmethod
+    def map_columns(names, aliases, extra, fields, upper):
+        """[(position, field)] of the known columns"""
+        columns = []
+        for position, name in enumerate(names):
+            if name in extra:
+                field = extra[name]
+                field = field.upper() if upper else field.lower()
+                if field not in fields:
+                    continue
+            else:
+                field = aliases.get(name)
+                if field is None:
+                    continue
+            columns.append((position, field))
+        return columns
+
+    @staticmethod
+    def cells(row, columns):
+        """(field, value) of the non-empty mapped cells"""
+        for position, field in columns:
+            if position < len(row):
+                value = row[position].strip()
+                if value:
+                    yield field, value
+
+    def row_to_contact(self, row):
+        """Contact dict like the vCard parser, None without a name"""
+        contact = dict.fromkeys(CONTACT_FIELDS, '')
+        phones = []
+        emails = []
+        categories = []
+        name_parts = {}
+
+        for field, value in self.cells(row, self.contact_columns):
+            if field == 'TEL':
+                for phone in split_multi(value):
+                    phone = parse_vcard_phone(phone)
+                    if phone:
+                        phones.append(phone)
+            elif field == 'EMAIL':
+                for email in split_multi(value):
+                    if '@' in email:
+                        emails.append(parse_vcard_email(email))
+            elif field == 'CATEGORIES':
+                for category in split_multi(value.replace(',', '\n')):
+                    # Google system groups: "* myContacts", "* starred"
+                    if not category.startswith('*'):
+                        categories.append(category)
+            elif field == 'BDAY':
+                contact['BDAY'] = parse_csv_date(value, self.month_first)
+            elif field in NAME_PARTS:
+                name_parts[field] = value
+            elif not contact[field]:
+                contact[field] = one_line(value)
+
+        if not contact['FN']:
+            contact['FN'] = " ".join(
+                name_parts[part] for part in NAME_PARTS if part in name_parts)
+        contact['FN'] = " ".join(contact['FN'].split())
+        if not contact['FN']:
+            return None
+        if phones:
+            contact['TEL'] = '|'.join(phones)
+        if emails:
+            contact['EMAIL'] = '|'.join(emails)
+        if categories:
+            contact['CATEGORIES'] = ', '.join(categories)
+        return contact
+
+    def row_to_event(self, row):
+        """Event object, None without title or valid date"""
+        values = dict(self.cells(row, self.event_columns))
+        title = values.get('title', '')
+        date_str = parse_csv_date(values.get('date', ''), self.month_first)
+        if not title or not date_str:
+            return None
+
+        description = values.get('description', '')
+        location = values.get('location', '')
+        if location and location not in description:
+            if description:
+                description += '\n\nLocation: ' + location
+            else:
+                description = 'Location: ' + location
+
+        repeat = values.get('repeat', 'none').lower()
+        if repeat not in REPEAT_VALUES:
+            repeat = 'none'
+
+        event = Event(
+            title=title,
+            description=description,
+            date=date_str,
+            event_time=(parse_csv_time(values.get('time', '')) or
+                        get_default_event_time()),
+            repeat=repeat,
+            notify_before=0,
+            enabled=values.get('enabled', '').lower() not in FALSE_VALUES
+        )
+        for label in values.get('labels', '').split(','):
+            label = label.strip().lower()
+            if label and label not in event.labels:
+                event.labels.append(label)
+        event.uid = values.get('uid', '')
+        # Read by the ICS dedup stage
+        event.ics_status = ''
+        return event
+
+
+class CSVReader:
+    """Stream the rows of a CSV file with the bytes read so far
+
+    Quoted cells may span lines: the csv module pulls the next line from
+    the generator, bytes_read then points after the whole row. A resumed
+    import reads the header and continues at start_offset (a row end).
+    """
+
+    def __init__(self, filepath, start_offset=0, column_map=None):
+        self.filepath = filepath
+        self.start_offset = start_offset
+        self.column_map = column_map
+        self.file_size = 0
+        self.bytes_read = 0
+        self.layout = None
+
+    def read_header(self, f):
+        """Parse the header line, returns the delimiter"""
+        raw_line = f.readline()
+        self.bytes_read = len(raw_line)
+        line = decode_line(raw_line)
+        if line.startswith(u'\ufeff'):
+            line = line[1:]
+        delimiter = sniff_delimiter(line)
+        header = next(csv.reader([line], delimiter=delimiter), [])
+        self.layout = CSVLayout(header, self.column_map)
+        return delimiter
+
+    def iter_lines(self, f):
+        for raw_line in f:
+            self.bytes_read += len(raw_line)
+            yield decode_line(raw_line)
+
+    def __iter__(self):
+        self.file_size = getsize(self.filepath)
+        with open(self.filepath, 'rb') as f:
+            delimiter = self.read_header(f)
+            if self.start_offset > self.bytes_read:
+                f.seek(self.start_offset)
+                self.bytes_read = self.start_offset
+            for row in csv.reader(self.iter_lines(f), delimiter=delimiter):
+                if any(cell.strip() for cell in row):
+                    yield row, self.bytes_read
+
+
+def detect_csv_kind(filepath, column_map=None):
+    """'contacts', 'events' or None for an unknown CSV header"""
+    try:
+        reader = CSVReader(filepath, column_map=column_map)
+        with open(filepath, 'rb') as f:
+            reader.read_header(f)
+        return reader.layout.kind
+    except Exception as e:
+        print("[CSV] Error reading header of {0}: {1}".format(filepath, e))
+        return None
+
+
+def count_csv_rows(filepath):
+    """Number of data lines (quoted new lines are counted too)"""
+    count = 0
+    try:
+        with open(filepath, 'rb') as f:
+            for count, _raw_line in enumerate(f):
+                pass
+    except Exception as e:
+        print("[CSV] Error counting rows: {0}".format(e))
+    return count
+
+
+class CSVSource:
+    """Reader and parser stages of a CSV file for the import pipeline
+
+    Yields ImportRecord(contact dict or Event, bytes_read, file_size);
+    rows without the required columns give records without data, which
+    the normalize stages count as errors.
+    """
+
+    def __init__(self, filepath, kind, start_offset=0, column_map=None):
+        self.filepath = filepath
+        self.kind = kind
+        self.start_offset = start_offset
+        self.column_map = column_map
+        self.stages = [PipelineStage('read'), PipelineStage('parse')]
+
+    def __iter__(self):
+        read_stage, parse_stage = self.stages
+        reader = CSVReader(self.filepath, self.start_offset, self.column_map)
+        for row, bytes_read in _timed(reader, read_stage, lambda item: 1):
+            layout = reader.layout
+            if layout.kind != self.kind:
+                print("[CSV] {0}: no {1} columns found".format(
+                    self.filepath, self.kind))
+                return
+            start = time.time()
+            try:
+                if self.kind == 'contacts':
+                    data = layout.row_to_contact(row)
+                else:
+                    data = layout.row_to_event(row)
+            except Exception as e:
+                print("[CSV] Error parsing row: {0}".format(e))
+                data = None
+            parse_stage.record_timing(time.time() - start)
+            yield ImportRecord(data, bytes_read, reader.file_size)
+
+
+def iter_csv_contacts(filepath, start_offset=0):
+    """(contact_data, bytes_read, file_size) like iter_vcard_file"""
+    for record in CSVSource(filepath, 'contacts', start_offset):
+        yield record.data, record.bytes_read, record.file_size
+
+
+def format_csv_date(date_str, month_first=False):
+    """YYYY-MM-DD -> M/D/YYYY for the Outlook style layouts"""
+    if not date_str or not month_first:
+        return date_str
+    try:
+        date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+    except ValueError:
+        return date_str
+    return "{0}/{1}/{2}".format(date.month, date.day, date.year)
+
+
+def contact_to_row(contact, columns, layout):
+    """Cells of a contact for the (header, field) columns"""
+    name = contact.get('FN', '').strip()
+    name_parts = name.split(' ', 1)
+    values = {
+        'GIVEN': name_parts[0],
+        'FAMILY': name_parts[1] if len(name_parts) == 2 else '',
+        # Google Contacts keeps ISO birthdays
+        'BDAY': format_csv_date(contact.get('BDAY', '').strip(),
+                                layout == 'outlook'),
+    }
+    row = []
+    for _header, field in columns:
+        if ':' in field:
+            # One of several values in its own column (Outlook)
+            field, index = field.split(':')
+            parts = [v for v in contact.get(field, '').split('|') if v]
+            index = int(index)
+            row.append(parts[index] if index < len(parts) else '')
+            continue
+        value = values.get(field)
+        if value is None:
+            value = contact.get(field, '').strip()
+            if field in ('TEL', 'EMAIL'):
+                separator = MULTI_SEPARATOR if layout == 'google' else '|'
+                value = separator.join(v for v in value.split('|') if v)
+            elif field == 'CATEGORIES' and layout == 'google':
+                value = MULTI_SEPARATOR.join(split_multi(value.replace(',', '\n')))
+            elif field == 'NOTE':
+                value = value.replace('\\n', '\n')
+        row.append(value)
+    return row
+
+
+def event_to_row(event, columns, layout):
+    """Cells of an event for the (header, field) columns"""
+    row = []
+    for _header, field in columns:
+        if field == 'date':
+            row.append(format_csv_date(event.date, layout != 'calendar'))
+        elif field == 'time':
+            value = event.time or ''
+            if layout != 'calendar' and value:
+                try:
+                    value = datetime.strptime(value, '%H:%M').strftime(
+                        '%I:%M %p').lstrip('0')
+                except ValueError:
+                    pass
+            row.append(value)
+        elif field == 'enabled':
+            row.append("1" if event.enabled else "0")
+        elif field == 'labels':
+            row.append(",".join(getattr(event, 'labels', None) or ()))
+        else:
+            row.append(getattr(event, field, '') or '')
+    return row
+
+
+def write_csv(output_path, kind, columns, items, to_row, layout, job=None,
+              changes_only=None, scoped=False, item_uid=None):
+    """Stream rows to output_path.tmp and rename - returns rows written"""
+    temp_path = output_path + ".tmp"
+    manifest = ExportManifest(kind, changes_only, scoped=scoped)
+    count = 0
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow([header for header, _field in columns])
+            for item in items:
+                if job is not None:
+                    job.step()
+                row = to_row(item, columns, layout)
+                # Differential export: skip rows unchanged since the last one
+                if manifest.wants(item_uid(item), row):
+                    writer.writerow(row)
+                    count += 1
+        os.rename(temp_path, output_path)
+    except BaseException:
+        if exists(temp_path):
+            os.remove(temp_path)
+        raise
+    manifest.save()
+    return count
+
+
+def export_events_to_csv(event_manager, output_path, job=None,
+                         changes_only=None, export_filter=None, layout=None):
+    """Export events to CSV, sorted by date and time
+
+    export_filter (default: the export settings) scopes the export like
+    the ICS export; changes_only writes only events changed since the last
+    CSV export. The Google/Outlook layout has no repeat rule: repeating
+    events are written with their first date.
+    """
+    try:
+        if layout is None:
+            layout = get_csv_layout()
+        if export_filter is None:
+            export_filter = ExportFilter.from_config()
+        events = sorted(event_manager.query_events(export_filter),
+                        key=lambda e: (e.date or '', e.time or ''))
+        if not events:
+            if get_debug():
+                print("[CSVExport] No events found")
+            return 0
+
+        if job is not None:
+            job.set_phase(_("Events"), len(events))
+        count = write_csv(
+            output_path, "csv_events", EVENT_LAYOUTS[layout], events,
+            event_to_row, layout, job, changes_only,
+            export_filter.is_scoped(),
+            lambda event: event.uid or str(event.id))
+        if get_debug():
+            print("[CSVExport] Exported {0} events to {1}".format(
+                count, output_path))
+        return count
+
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        print("[CSVExport] Error: {0}".format(str(e)))
+        return 0
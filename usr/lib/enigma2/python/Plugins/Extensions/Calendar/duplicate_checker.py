@@ -13,9 +13,11 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 ###########################################################
 """
 from __future__ import print_function
-from re import sub
+import time
+from re import compile as re_compile, sub
+from unicodedata import category, normalize
 
-from .config_manager import get_default_event_time
+from .config_manager import get_debug, get_default_event_time
 
 
 class DuplicateChecker:
@@ -83,124 +85,593 @@ class DuplicateChecker:
 
     @staticmethod
     def contact_exists(birthday_manager, contact_data, use_cache=True):
-        """Check if contact already exists - optimized version with multiple phones"""
+        """Check if contact already exists - uses the manager contact index"""
         new_norm = DuplicateChecker.normalize_contact_data(contact_data)
 
         if not new_norm['FN']:
             return False, "Missing name"
 
-        # Use cache if requested
-        if use_cache and not hasattr(
-                birthday_manager,
-                '_normalized_contacts_cache'):
-            DuplicateChecker._build_contacts_cache(birthday_manager)
+        index = getattr(birthday_manager, 'contact_index', None)
+        if use_cache and index is not None:
+            # Fast path: exact (name, birthday) key
+            if new_norm['BDAY'] and index.ids_by_name_bday(
+                    new_norm['FN'], new_norm['BDAY']):
+                return True, "Same name and birthday"
+
+            # Only contacts sharing a name, phone or email can match
+            for contact_id in index.candidates(new_norm):
+                reason = DuplicateChecker._match_reason(
+                    new_norm, index.get_normalized(contact_id))
+                if reason:
+                    return True, reason
+            return False, ""
 
-        contacts_to_check = (
-            birthday_manager._normalized_contacts_cache if use_cache and hasattr(
-                birthday_manager,
-                '_normalized_contacts_cache') else birthday_manager.contacts)
+        # No index available: linear scan
+        for existing in birthday_manager.contacts:
+            reason = DuplicateChecker._match_reason(
+                new_norm, DuplicateChecker.normalize_contact_data(existing))
+            if reason:
+                return True, reason
 
-        for existing in contacts_to_check:
-            if use_cache:
-                existing_norm = existing
-            else:
-                existing_norm = DuplicateChecker.normalize_contact_data(
-                    existing)
-
-            # 1. Identical names (CASE INSENSITIVE)
-            if new_norm['FN'] == existing_norm['FN']:
-                # 2. Same birthday
-                if new_norm['BDAY'] and existing_norm['BDAY']:
-                    if new_norm['BDAY'] == existing_norm['BDAY']:
-                        return True, "Same name and birthday"
-
-                # 3. Phone check (NEW: check each number)
-                new_phones = new_norm['TEL']
-                existing_phones = existing_norm['TEL']
-
-                for new_phone in new_phones:
-                    for existing_phone in existing_phones:
-                        if new_phone == existing_phone:
-                            return True, "Same phone: {0}".format(new_phone)
-
-                # 4. Email check (NEW: check each email)
-                new_emails = new_norm['EMAIL']
-                existing_emails = existing_norm['EMAIL']
-
-                for new_email in new_emails:
-                    for existing_email in existing_emails:
-                        if new_email == existing_email:
-                            return True, "Same email: {0}".format(new_email)
-
-                # 5. Name only (no other data)
-                if (not new_norm['BDAY'] and not new_phones and not new_emails and
-                        not existing_norm['BDAY'] and not existing_phones and not existing_emails):
-                    return True, "Possible duplicate (name only)"
-
-            # 6. Phone-only check (even with different names)
-            new_phones = new_norm['TEL']
-            existing_phones = existing_norm['TEL']
+        return False, ""
 
+    @staticmethod
+    def _match_reason(new_norm, existing_norm):
+        """Compare two normalized contacts - return reason string or empty"""
+        new_phones = new_norm['TEL']
+        existing_phones = existing_norm['TEL']
+        new_emails = new_norm['EMAIL']
+        existing_emails = existing_norm['EMAIL']
+
+        # 1. Identical names (CASE INSENSITIVE)
+        if new_norm['FN'] == existing_norm['FN']:
+            # 2. Same birthday
+            if new_norm['BDAY'] and existing_norm['BDAY']:
+                if new_norm['BDAY'] == existing_norm['BDAY']:
+                    return "Same name and birthday"
+
+            # 3. Phone check (each number)
             for new_phone in new_phones:
-                for existing_phone in existing_phones:
-                    if new_phone and existing_phone and new_phone == existing_phone:
-                        return True, "Same phone but different names: {0} vs {1}".format(
-                            new_norm['FN'], existing_norm['FN'])
-
-            # 7. Email-only check (even with different names)
-            new_emails = new_norm['EMAIL']
-            existing_emails = existing_norm['EMAIL']
+                if new_phone in existing_phones:
+                    return "Same phone: {0}".format(new_phone)
 
+            # 4. Email check (each email)
             for new_email in new_emails:
-                for existing_email in existing_emails:
-                    if new_email and existing_email and new_email == existing_email:
-                        return True, "Same email but different names: {0} vs {1}".format(
-                            new_norm['FN'], existing_norm['FN'])
+                if new_email in existing_emails:
+                    return "Same email: {0}".format(new_email)
 
-        return False, ""
+            # 5. Name only (no other data)
+            if (not new_norm['BDAY'] and not new_phones and not new_emails and
+                    not existing_norm['BDAY'] and not existing_phones and not existing_emails):
+                return "Possible duplicate (name only)"
 
-    @staticmethod
-    def _build_contacts_cache(birthday_manager):
-        """Build normalized cache"""
-        birthday_manager._normalized_contacts_cache = []
-        for contact in birthday_manager.contacts:
-            birthday_manager._normalized_contacts_cache.append(
-                DuplicateChecker.normalize_contact_data(contact)
-            )
+        # 6. Phone-only check (even with different names)
+        for new_phone in new_phones:
+            if new_phone and new_phone in existing_phones:
+                return "Same phone but different names: {0} vs {1}".format(
+                    new_norm['FN'], existing_norm['FN'])
+
+        # 7. Email-only check (even with different names)
+        for new_email in new_emails:
+            if new_email and new_email in existing_emails:
+                return "Same email but different names: {0} vs {1}".format(
+                    new_norm['FN'], existing_norm['FN'])
+
+        return ""
 
     @staticmethod
     def clear_cache(birthday_manager):
-        """Clear the cache"""
-        if hasattr(birthday_manager, '_normalized_contacts_cache'):
-            del birthday_manager._normalized_contacts_cache
+        """Rebuild the contact index from the in-memory contacts"""
+        index = getattr(birthday_manager, 'contact_index', None)
+        if index is not None:
+            index.rebuild(birthday_manager.contacts)
 
     @staticmethod
     def check_event_duplicate(event_manager, event_data):
-        """Check if event already exists"""
+        """Check if event already exists - O(1) through the event index"""
         if not event_manager:
             return False, ""
 
-        all_events = event_manager.get_all_events()
-
-        new_title = (event_data.get('title') or '').strip().lower()
-        new_date = event_data.get('date', '')
-        new_time = event_data.get('time', get_default_event_time())
+        index = event_manager.get_event_index()
+        title = event_data.get('title') or ''
+        date = event_data.get('date', '')
+        event_time = event_data.get('time') or get_default_event_time()
 
-        for event in all_events:
-            # Same title, same date, same time
-            if (event.title.strip().lower() == new_title and
-                event.date == new_date and
-                    event.time == new_time):
-                return True, "Identical event"
+        # Same title, same date, same time
+        if index.has_event_key(title, date, event_time):
+            return True, "Identical event"
 
-            # Same title and date (even if time is different)
-            if (event.title.strip().lower() == new_title and
-                    event.date == new_date):
-                return True, "Similar event (same day)"
+        # Same title and date (even if time is different)
+        if index.has_day(title, date):
+            return True, "Similar event (same day)"
 
         return False, ""
 
 
+class ContactIndex:
+    """Persistent hash index of normalized contact keys to contact ids
+
+    Maps normalized name, each normalized phone, each normalized email
+    and (name, birthday) to the ids of the contacts carrying them, so
+    duplicate checks only look at real candidates instead of every contact.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop all entries"""
+        self.by_name = {}
+        self.by_phone = {}
+        self.by_email = {}
+        self.by_name_bday = {}
+        self.normalized = {}
+        self.contacts = {}
+        self._order = {}
+        self._next_order = 0
+
+    def rebuild(self, contacts):
+        """Rebuild the whole index from a list of contacts"""
+        self.clear()
+        for contact in contacts:
+            self.add(contact)
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def __contains__(self, contact_id):
+        return contact_id in self.normalized
+
+    @staticmethod
+    def _link(table, key, contact_id):
+        ids = table.get(key)
+        if ids is None:
+            table[key] = set([contact_id])
+        else:
+            ids.add(contact_id)
+
+    @staticmethod
+    def _unlink(table, key, contact_id):
+        ids = table.get(key)
+        if ids is not None:
+            ids.discard(contact_id)
+            if not ids:
+                del table[key]
+
+    def add(self, contact):
+        """Index a contact (re-indexes it if already present)"""
+        contact_id = contact.get('id')
+        if not contact_id:
+            return
+
+        if contact_id in self.normalized:
+            self._remove_keys(contact_id)
+        else:
+            self._order[contact_id] = self._next_order
+            self._next_order += 1
+
+        norm = DuplicateChecker.normalize_contact_data(contact)
+        self.normalized[contact_id] = norm
+        self.contacts[contact_id] = contact
+
+        if norm['FN']:
+            self._link(self.by_name, norm['FN'], contact_id)
+            if norm['BDAY']:
+                self._link(
+                    self.by_name_bday, (norm['FN'], norm['BDAY']), contact_id)
+        for phone in norm['TEL']:
+            self._link(self.by_phone, phone, contact_id)
+        for email in norm['EMAIL']:
+            self._link(self.by_email, email, contact_id)
+
+    def remove(self, contact_id):
+        """Remove a contact from the index"""
+        if contact_id not in self.normalized:
+            return
+        self._remove_keys(contact_id)
+        del self.normalized[contact_id]
+        del self.contacts[contact_id]
+        del self._order[contact_id]
+
+    def _remove_keys(self, contact_id):
+        norm = self.normalized[contact_id]
+        if norm['FN']:
+            self._unlink(self.by_name, norm['FN'], contact_id)
+            if norm['BDAY']:
+                self._unlink(
+                    self.by_name_bday, (norm['FN'], norm['BDAY']), contact_id)
+        for phone in norm['TEL']:
+            self._unlink(self.by_phone, phone, contact_id)
+        for email in norm['EMAIL']:
+            self._unlink(self.by_email, email, contact_id)
+
+    def get(self, contact_id):
+        """Return the indexed contact dict"""
+        return self.contacts.get(contact_id)
+
+    def get_normalized(self, contact_id):
+        """Return normalized data of an indexed contact"""
+        return self.normalized.get(contact_id)
+
+    def ids_by_name(self, name):
+        return self.by_name.get(name, set())
+
+    def ids_by_name_bday(self, name, bday):
+        return self.by_name_bday.get((name, bday), set())
+
+    def ids_by_phone(self, phone):
+        return self.by_phone.get(phone, set())
+
+    def ids_by_email(self, email):
+        return self.by_email.get(email, set())
+
+    def candidates(self, norm):
+        """Ids sharing name, a phone or an email with normalized data"""
+        found = set(self.ids_by_name(norm['FN']))
+        for phone in norm['TEL']:
+            found.update(self.ids_by_phone(phone))
+        for email in norm['EMAIL']:
+            found.update(self.ids_by_email(email))
+        return sorted(found, key=self._order.get)
+
+
+EVENT_TITLE_SUFFIXES = (
+    ' - birthday', ' - compleanno', "'s birthday",
+    ' - geburtstag', ' - anniversaire', ' - cumpleaños',
+    ' birthday', ' compleanno'
+)
+
+
+def normalize_event_title(title):
+    """Event title for comparison: lowercase, single spaces, no suffix"""
+    if not title:
+        return ""
+    normalized = " ".join(title.lower().split())
+    for suffix in EVENT_TITLE_SUFFIXES:
+        if normalized.endswith(suffix):
+            normalized = normalized[:-len(suffix)].strip()
+    return normalized
+
+
+def normalize_event_date(date):
+    """YYYY-MM-DD, YYYYMMDD or an ICS date-time -> YYYYMMDD"""
+    return (date or "").replace('-', '')[:8]
+
+
+class DedupIndex:
+    """Normalized keys of the events already stored
+
+    EventManager keeps one for its events (duplicate checks and cleanup),
+    the ICS importer and the ICS export build on the same keys. Events are
+    keyed by title|date|time, title|date and UID; lookups are O(1).
+    Contacts are checked through ContactIndex.
+    """
+
+    def __init__(self):
+        self.keys = set()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+
+    def update(self, other):
+        """Add all keys of another index"""
+        self.keys.update(other.keys)
+
+    @staticmethod
+    def event_key(title, date, event_time=None):
+        return "event:{0}|{1}|{2}".format(
+            normalize_event_title(title), normalize_event_date(date),
+            event_time or get_default_event_time())
+
+    @staticmethod
+    def day_key(title, date):
+        return "day:{0}|{1}".format(
+            normalize_event_title(title), normalize_event_date(date))
+
+    def add_event(self, event):
+        self.keys.add(self.event_key(event.title, event.date, event.time))
+        self.keys.add(self.day_key(event.title, event.date))
+        if getattr(event, 'uid', ''):
+            self.keys.add("uid:" + event.uid)
+
+    def has_event(self, event):
+        return self.event_key(event.title, event.date, event.time) in self.keys
+
+    def has_event_key(self, title, date, event_time=None):
+        return self.event_key(title, date, event_time) in self.keys
+
+    def add_day(self, title, date):
+        self.keys.add(self.day_key(title, date))
+
+    def has_day(self, title, date):
+        """Same title on the same day, whatever the time"""
+        return self.day_key(title, date) in self.keys
+
+    def has_uid(self, uid):
+        return bool(uid) and "uid:" + uid in self.keys
+
+
+_NAME_TOKEN_SPLIT = re_compile(r"[^0-9a-z]+")
+
+# Fields copied into an existing contact when they are still empty
+MERGE_TEXT_FIELDS = ('BDAY', 'ADR', 'ORG', 'TITLE', 'CATEGORIES', 'NOTE', 'URL')
+
+
+def fold_accents(text):
+    """Lowercase text and strip accents ("Mário" -> "mario")"""
+    if not text:
+        return ''
+    decomposed = normalize('NFKD', u"{0}".format(text))
+    return ''.join(c for c in decomposed if category(c) != 'Mn').lower()
+
+
+def name_tokens(name):
+    """Accent-folded name tokens ("Rossi, Mário" -> ['rossi', 'mario'])"""
+    return [t for t in _NAME_TOKEN_SPLIT.split(fold_accents(name)) if t]
+
+
+def merge_contact_fields(target, source):
+    """Merge source data into target in memory - returns True if changed
+
+    Empty text fields are filled, phone numbers and emails are unioned
+    (order preserved, no duplicates). Existing data is never overwritten.
+    """
+    changed = False
+
+    for field, normalizer in (
+            ('TEL', DuplicateChecker._normalize_single_phone),
+            ('EMAIL', lambda value: value.lower())):
+        new_value = (source.get(field) or '').strip()
+        if not new_value:
+            continue
+        values = [v.strip() for v in (target.get(field) or '').split('|')
+                  if v.strip()]
+        seen = set(normalizer(v) for v in values)
+        added = False
+        for value in new_value.split('|'):
+            value = value.strip()
+            if value and normalizer(value) not in seen:
+                seen.add(normalizer(value))
+                values.append(value)
+                added = True
+        if added:
+            target[field] = '|'.join(values)
+            changed = True
+
+    for field in MERGE_TEXT_FIELDS:
+        existing = (target.get(field) or '').strip()
+        new_value = (source.get(field) or '').strip()
+        if not existing and new_value:
+            target[field] = new_value
+            changed = True
+
+    return changed
+
+
+class FuzzyDuplicateFinder:
+    """Blocked fuzzy duplicate detection for near-identical contacts
+
+    Contacts are grouped by blocking keys (sorted name tokens, accent-folded
+    token + initials, phone suffixes) so only contacts sharing a block are
+    compared. Pairs are scored with a token similarity and returned as a
+    reviewable list of merge proposals. Work is done in time slices so the
+    search can run on the enigma2 main loop without freezing the UI.
+    """
+
+    MIN_SCORE = 0.8
+    # Shared phone/email only counts for similar names: family members
+    # share a landline ("Mario Rossi" / "Anna Rossi" is 0.5)
+    MIN_NAME_SIMILARITY = 0.6
+    MAX_BLOCK_SIZE = 50     # larger blocks are too generic to be useful
+    PHONE_SUFFIX_LEN = 7
+
+    def __init__(self, birthday_manager, min_score=None):
+        self.birthday_manager = birthday_manager
+        self.min_score = min_score or self.MIN_SCORE
+        self.proposals = []
+        self.total = 0
+        self.processed = 0
+        self.finished = False
+        self.cancelled = False
+        self._work = None
+        self._timer = None
+
+    @staticmethod
+    def blocking_keys(contact):
+        """Return the blocking keys of a contact"""
+        keys = set()
+        tokens = name_tokens(contact.get('FN', ''))
+        if tokens:
+            keys.add("tok:" + " ".join(sorted(tokens)))
+            initials = [t[0] for t in tokens]
+            for i, token in enumerate(tokens):
+                if len(token) >= 3:
+                    others = initials[:i] + initials[i + 1:]
+                    keys.add("ini:{0}:{1}".format(
+                        token, "".join(sorted(others))))
+        for phone in DuplicateChecker._normalize_phone_field(
+                contact.get('TEL', '')):
+            digits = phone.lstrip('+')
+            if len(digits) >= FuzzyDuplicateFinder.PHONE_SUFFIX_LEN:
+                keys.add("tel:" + digits[-FuzzyDuplicateFinder.PHONE_SUFFIX_LEN:])
+        return keys
+
+    @staticmethod
+    def token_similarity(tokens_a, tokens_b):
+        """Dice similarity of name tokens - an initial matches its token"""
+        if not tokens_a or not tokens_b:
+            return 0.0
+        remaining = list(tokens_b)
+        matches = 0
+        # Full tokens first, then initials ("m" vs "mario")
+        for token in sorted(tokens_a, key=len, reverse=True):
+            for i, other in enumerate(remaining):
+                if token == other or (
+                        (len(token) == 1 or len(other) == 1) and
+                        token[0] == other[0]):
+                    matches += 1
+                    del remaining[i]
+                    break
+        return 2.0 * matches / (len(tokens_a) + len(tokens_b))
+
+    def score(self, contact_a, contact_b):
+        """Score a candidate pair - returns (score, reason)"""
+        bday_a = (contact_a.get('BDAY') or '').strip()
+        bday_b = (contact_b.get('BDAY') or '').strip()
+        if bday_a and bday_b and bday_a != bday_b:
+            return 0.0, "Different birthdays"
+
+        similarity = self.token_similarity(
+            name_tokens(contact_a.get('FN', '')),
+            name_tokens(contact_b.get('FN', '')))
+
+        norm_a = DuplicateChecker.normalize_contact_data(contact_a)
+        norm_b = DuplicateChecker.normalize_contact_data(contact_b)
+        similar = similarity >= self.MIN_NAME_SIMILARITY
+        if set(norm_a['TEL']) & set(norm_b['TEL']):
+            if similar:
+                return max(similarity, 0.9), "Similar name, same phone"
+            return similarity, "Same phone"
+        if set(norm_a['EMAIL']) & set(norm_b['EMAIL']):
+            if similar:
+                return max(similarity, 0.9), "Similar name, same email"
+            return similarity, "Same email"
+        if bday_a and bday_a == bday_b:
+            return similarity, "Similar name, same birthday"
+        return similarity, "Similar name"
+
+    @staticmethod
+    def _filled_fields(contact):
+        return sum(1 for value in contact.values() if value)
+
+    def _iter_work(self):
+        """Generator doing one unit of work per step"""
+        contacts = [c for c in self.birthday_manager.contacts if c.get('id')]
+        self.total = len(contacts) * 2
+        by_id = {}
+        blocks = {}
+
+        # Phase 1: build blocks
+        for contact in contacts:
+            by_id[contact['id']] = contact
+            for key in self.blocking_keys(contact):
+                blocks.setdefault(key, []).append(contact['id'])
+            self.processed += 1
+            yield
+
+        # Phase 2: score pairs that share at least one block
+        seen_pairs = set()
+        for contact in contacts:
+            contact_id = contact['id']
+            candidates = set()
+            for key in self.blocking_keys(contact):
+                block = blocks.get(key, ())
+                if len(block) <= self.MAX_BLOCK_SIZE:
+                    candidates.update(block)
+            for other_id in candidates:
+                if other_id == contact_id:
+                    continue
+                pair = (min(contact_id, other_id), max(contact_id, other_id))
+                if pair in seen_pairs:
+                    continue
+                seen_pairs.add(pair)
+                other = by_id[other_id]
+                pair_score, reason = self.score(contact, other)
+                if pair_score >= self.min_score:
+                    keep, merge = contact, other
+                    if self._filled_fields(other) > self._filled_fields(contact):
+                        keep, merge = other, contact
+                    self.proposals.append({
+                        'keep_id': keep['id'],
+                        'merge_id': merge['id'],
+                        'keep_name': keep.get('FN', ''),
+                        'merge_name': merge.get('FN', ''),
+                        'score': round(pair_score, 2),
+                        'reason': reason,
+                    })
+            self.processed += 1
+            yield
+
+        self.proposals.sort(key=lambda p: p['score'], reverse=True)
+
+    def run_slice(self, budget_ms=30):
+        """Work for at most budget_ms - returns True when finished"""
+        if self.finished:
+            return True
+        if self._work is None:
+            self._work = self._iter_work()
+        deadline = time.time() + budget_ms / 1000.0
+        try:
+            while time.time() < deadline:
+                next(self._work)
+        except StopIteration:
+            self.finished = True
+        return self.finished
+
+    def run(self):
+        """Run to completion (blocking) and return the proposals"""
+        while not self.run_slice(1000):
+            pass
+        return self.proposals
+
+    def get_progress(self):
+        """Progress between 0.0 and 1.0"""
+        if self.finished:
+            return 1.0
+        return float(self.processed) / self.total if self.total else 0.0
+
+    def start(self, on_done, on_progress=None, budget_ms=30, interval_ms=10):
+        """Run time-sliced on the enigma2 main loop
+
+        on_done(proposals) is called when finished, on_progress(progress)
+        after every slice.
+        """
+        from enigma import eTimer
+
+        def tick():
+            if self.cancelled:
+                return
+            done = self.run_slice(budget_ms)
+            if on_progress:
+                on_progress(self.get_progress())
+            if done:
+                on_done(self.proposals)
+            else:
+                self._timer.start(interval_ms, True)
+
+        self._timer = eTimer()
+        try:
+            self._timer_conn = self._timer.timeout.connect(tick)
+        except AttributeError:
+            self._timer.callback.append(tick)
+        self._timer.start(interval_ms, True)
+
+    def cancel(self):
+        """Stop a time-sliced run"""
+        self.cancelled = True
+        if self._timer:
+            self._timer.stop()
+
+    @staticmethod
+    def apply_proposal(birthday_manager, proposal):
+        """Merge proposal['merge_id'] into proposal['keep_id']"""
+        index = birthday_manager.contact_index
+        keep = index.get(proposal['keep_id'])
+        merge = index.get(proposal['merge_id'])
+        if not keep or not merge:
+            return False
+        if merge_contact_fields(keep, merge):
+            birthday_manager.save_contact(keep)
+        birthday_manager.delete_contact(proposal['merge_id'])
+        if get_debug():
+            print("[FuzzyDuplicateFinder] Merged '{0}' into '{1}'".format(
+                proposal['merge_name'], proposal['keep_name']))
+        return True
+
+
 def cleanup_duplicate_phones(birthday_manager):
     """Cleans duplicate phone numbers in existing contacts"""
     cleaned_count = 0
@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Birthday / event classifier for ICS imports.
+
+The birthday keywords of all supported languages are compiled into one
+regular expression, so an event costs a single search over its title and
+description instead of a substring loop per keyword. Rules:
+
+    keyword       - a birthday word in title or description (always on)
+    label         - the parser already labelled the event 'birthday'
+    yearly        - yearly repeating events (config birthday_rule_yearly,
+                    off by default: holidays and anniversaries repeat
+                    yearly too)
+    default_time  - events at the default event time
+                    (config birthday_rule_default_time, off by default:
+                    every untimed meeting would become a birthday)
+
+LABELED_EVENTS is a small fixture of real-world titles with the class
+expected from the default rules; evaluate() reports the accuracy on it
+and benchmark() the speed.
+"""
+from __future__ import print_function
+import re
+import time
+
+from .config_manager import (
+    get_birthday_keywords,
+    get_birthday_rule_default_time,
+    get_birthday_rule_yearly,
+    get_debug,
+    get_default_event_time,
+)
+
+BIRTHDAY_KEYWORDS = (
+    'birthday', 'bday', 'compleanno', 'geburtstag', 'anniversaire',
+    'cumpleaños', 'verjaardag', 'aniversário', 'urodziny', 'narozeniny',
+    'doğum günü', 'день рождения', 'γενέθλια', 'födelsedag', 'fødselsdag',
+)
+
+# Words left around the name in titles like "Compleanno di Mario" or
+# "John's birthday"
+NAME_FILLERS = ('di', 'de', 'von', 'del', 'della', 'happy', 'buon', 'auguri')
+
+
+def compile_keywords(keywords):
+    """One case-insensitive pattern matching any keyword as a word"""
+    words = sorted(set(k.strip().lower() for k in keywords if k.strip()),
+                   key=len, reverse=True)
+    return re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(w) for w in words) + r")(?!\w)",
+        re.IGNORECASE | re.UNICODE)
+
+
+class EventClassifier:
+    """Classify imported events as 'birthday' or 'event'"""
+
+    def __init__(self, keywords=None, yearly=None, default_time=None):
+        if keywords is None:
+            keywords = BIRTHDAY_KEYWORDS + tuple(
+                k for k in get_birthday_keywords().split(',') if k.strip())
+        if yearly is None:
+            yearly = get_birthday_rule_yearly()
+        if default_time is None:
+            default_time = get_birthday_rule_default_time()
+
+        self.keyword_match = compile_keywords(keywords)
+        self.name_cleanup = re.compile(
+            r"(?:" + self.keyword_match.pattern + r")|'s(?!\w)|(?<!\w)(?:" +
+            "|".join(NAME_FILLERS) + r")(?!\w)|[-:!]+",
+            re.IGNORECASE | re.UNICODE)
+        self.yearly = yearly
+        self.default_time = get_default_event_time() if default_time else None
+        self.hits = {}
+
+    def match_rule(self, event):
+        """Name of the first rule that makes the event a birthday, or None"""
+        title = getattr(event, 'title', '') or ''
+        description = getattr(event, 'description', '') or ''
+        if self.keyword_match.search(title) or self.keyword_match.search(description):
+            return 'keyword'
+        if 'birthday' in (getattr(event, 'labels', None) or ()):
+            return 'label'
+        if self.yearly and getattr(event, 'repeat', '') == 'yearly':
+            return 'yearly'
+        if self.default_time is not None:
+            event_time = getattr(event, 'time', '')
+            if not event_time or event_time == self.default_time:
+                return 'default_time'
+        return None
+
+    def classify(self, event):
+        """'birthday' or 'event' - evaluated once per event"""
+        rule = self.match_rule(event)
+        self.hits[rule] = self.hits.get(rule, 0) + 1
+        return 'event' if rule is None else 'birthday'
+
+    def is_birthday(self, event):
+        return self.match_rule(event) is not None
+
+    def contact_name(self, title):
+        """Person name from a birthday title ("Compleanno di Mario" -> Mario)"""
+        name = " ".join(self.name_cleanup.sub(" ", title).split())
+        if not name:
+            return title.strip()
+        if name != title.strip():
+            name = name.title()
+        return name
+
+    def to_contact(self, event):
+        """Contact data of a birthday event"""
+        contact_data = {}
+        if getattr(event, 'title', ''):
+            contact_data['FN'] = self.contact_name(event.title)
+        if getattr(event, 'date', ''):
+            contact_data['BDAY'] = event.date
+        if getattr(event, 'description', ''):
+            contact_data['NOTE'] = event.description
+        if getattr(event, 'labels', None):
+            contact_data['CATEGORIES'] = ', '.join(event.labels)
+        return contact_data
+
+
+class _Sample:
+    """Event-like fixture record"""
+
+    def __init__(self, title, description='', repeat='none', event_time='10:00',
+                 labels=()):
+        self.title = title
+        self.description = description
+        self.repeat = repeat
+        self.time = event_time
+        self.labels = list(labels)
+        self.date = '2026-01-01'
+
+
+# (title, description, repeat, time, expected class)
+LABELED_EVENTS = [
+    ("Mario's Birthday", "", "none", "", 'birthday'),
+    ("Compleanno di Giulia", "", "none", "", 'birthday'),
+    ("Geburtstag Hans", "", "yearly", "", 'birthday'),
+    ("Anniversaire de Marie", "", "yearly", "", 'birthday'),
+    ("Cumpleaños de Ana", "", "none", "00:00", 'birthday'),
+    ("Verjaardag Piet", "", "yearly", "", 'birthday'),
+    ("Urodziny Kasi", "", "none", "", 'birthday'),
+    ("Anna", "Happy birthday!", "none", "", 'birthday'),
+    # Bare name: only the optional yearly rule makes it a birthday
+    ("Claudia", "", "yearly", "", 'event'),
+    ("Wedding anniversary", "", "yearly", "", 'event'),
+    ("Team meeting", "", "weekly", "14:00", 'event'),
+    ("Dentist", "", "none", "14:00", 'event'),
+    ("Dentist", "", "none", "", 'event'),
+    ("Birthdayparty planning", "Book the room", "none", "18:00", 'event'),
+    ("Claudia dinner", "", "none", "20:30", 'event'),
+    ("Champions League final", "", "none", "21:00", 'event'),
+    ("Pay rent", "", "monthly", "09:00", 'event'),
+    ("Compleanno", "", "none", "", 'birthday'),
+    ("Christmas", "", "yearly", "", 'event'),
+    ("Flight to Rome", "Gate B12", "none", "07:45", 'event'),
+]
+
+
+def evaluate(classifier=None, samples=LABELED_EVENTS):
+    """Accuracy of the classifier on the labeled fixture
+
+    Returns (correct, total, mistakes); mistakes lists (title, expected, got).
+    """
+    classifier = classifier or EventClassifier()
+    mistakes = []
+    for title, description, repeat, event_time, expected in samples:
+        got = classifier.classify(
+            _Sample(title, description, repeat, event_time))
+        if got != expected:
+            mistakes.append((title, expected, got))
+    correct = len(samples) - len(mistakes)
+    if get_debug():
+        print("[EventClassifier] Accuracy {0}/{1}".format(correct, len(samples)))
+        for title, expected, got in mistakes:
+            print("[EventClassifier]   {0}: expected {1}, got {2}".format(
+                title, expected, got))
+    return correct, len(samples), mistakes
+
+
+def benchmark(classifier=None, rounds=1000):
+    """Time the classifier on the fixture - returns events per second"""
+    classifier = classifier or EventClassifier()
+    samples = [_Sample(t, d, r, h) for t, d, r, h, _expected in LABELED_EVENTS]
+    start = time.time()
+    for _round in range(rounds):
+        for sample in samples:
+            classifier.classify(sample)
+    elapsed = time.time() - start
+    rate = int(rounds * len(samples) / elapsed) if elapsed > 0 else 0
+    print("[EventClassifier] {0} events in {1:.3f}s ({2}/s)".format(
+        rounds * len(samples), elapsed, rate))
+    return rate
@@ -31,6 +31,8 @@ from .config_manager import (
     get_last_used_default_time,
     update_last_used_default_time
 )
+from .duplicate_checker import DedupIndex
+from .export_filter import EventQueryIndex
 from .formatters import (
     DATA_PATH,
     get_EVENTS_JSON,
@@ -71,6 +73,11 @@ class Event:
         self.created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.id = int(time.time() * 1000)  # Unique ID
         self.labels = self._extract_labels()
+        # iCalendar identity, kept for incremental re-import/sync
+        self.uid = ''
+        self.sequence = 0
+        self.last_modified = ''
+        self.source = ''
 
     def _extract_labels(self):
         """Extract labels automatically from title and description"""
@@ -142,7 +149,11 @@ class Event:
             'notify_before': self.notify_before,
             'enabled': self.enabled,
             'created': self.created,
-            'labels': self.labels  # Save labels
+            'labels': self.labels,  # Save labels
+            'uid': self.uid,
+            'sequence': self.sequence,
+            'last_modified': self.last_modified,
+            'source': self.source
         }
 
     @classmethod
@@ -335,6 +346,15 @@ class EventManager:
         self.sound_dir = SOUNDS_DIR
         self.events = []
 
+        # Normalized event keys, rebuilt lazily when self.events changes
+        self.event_index = DedupIndex()
+        self._indexed_events = None
+        self._indexed_count = 0
+        self.query_index = None
+        self._query_events = None
+        self._query_count = 0
+        self.last_cleanup_report = []
+
         self.notified_events = set()
         self.notified_events_file = join(DATA_PATH, "notified_events.json")
         self.load_notified_events()
@@ -598,6 +618,10 @@ class EventManager:
                 event.created = item.get(
                     'created', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                 event.labels = item.get('labels', [])
+                event.uid = item.get('uid', '')
+                event.sequence = item.get('sequence', 0)
+                event.last_modified = item.get('last_modified', '')
+                event.source = item.get('source', '')
 
                 self.events.append(event)
 
@@ -633,6 +657,8 @@ class EventManager:
     def save_events(self):
         """Save events to JSON file"""
         try:
+            # Events may have been edited in place
+            self.invalidate_event_index()
             current_default = get_default_event_time()
 
             if get_debug():
@@ -654,7 +680,11 @@ class EventManager:
                     'notify_before': event.notify_before,
                     'enabled': event.enabled,
                     'created': event.created,
-                    'labels': event.labels
+                    'labels': event.labels,
+                    'uid': event.uid,
+                    'sequence': event.sequence,
+                    'last_modified': event.last_modified,
+                    'source': event.source
                 })
 
                 if get_debug():
@@ -898,10 +928,53 @@ class EventManager:
                 datetime.now().strftime('%H:%M:%S'))
         self.check_events()
 
-    def add_event(self, event):
-        """Add a new event"""
+    def get_event_index(self):
+        """Key index of the current events (O(1) duplicate checks)
+
+        Rebuilt when the list was replaced or changed size outside
+        add_event, or after update_event / save_events.
+        """
+        if (self._indexed_events is not self.events or
+                self._indexed_count != len(self.events)):
+            self.event_index.clear()
+            for event in self.events:
+                self.event_index.add_event(event)
+            self._indexed_events = self.events
+            self._indexed_count = len(self.events)
+        return self.event_index
+
+    def invalidate_event_index(self):
+        self._indexed_events = None
+        self._query_events = None
+
+    def get_query_index(self):
+        """Date/label/source index for scoped exports, rebuilt like
+        get_event_index()"""
+        if (self._query_events is not self.events or
+                self._query_count != len(self.events)):
+            self.query_index = EventQueryIndex(self.events)
+            self._query_events = self.events
+            self._query_count = len(self.events)
+        return self.query_index
+
+    def query_events(self, export_filter):
+        """Events matching an ExportFilter"""
+        return self.get_query_index().query(export_filter)
+
+    def add_event(self, event, save=True):
+        """Add a new event
+
+        Batch callers (importers) pass save=False and call save_events()
+        once per batch.
+        """
+        index_valid = (self._indexed_events is self.events and
+                       self._indexed_count == len(self.events))
         self.events.append(event)
-        self.save_events()
+        if index_valid:
+            self.event_index.add_event(event)
+            self._indexed_count += 1
+        if save:
+            self.save_events()
         if get_debug():
             print("[EventManager] Event added: {0}".format(event.title))
         return event.id
@@ -918,6 +991,7 @@ class EventManager:
 
                 # Update labels after modification
                 event.update_labels()
+                self.invalidate_event_index()
 
                 self.save_events()
                 if get_debug():
@@ -1206,6 +1280,11 @@ class EventManager:
                 cleaned = self.cleanup_duplicate_events()
                 message = _("Cleaned {0} duplicate events").format(
                     cleaned) if cleaned > 0 else _("No duplicates found")
+                # Report what was merged (first entries)
+                for title, date, event_time in self.last_cleanup_report[:10]:
+                    message += "\n{0} - {1} {2}".format(title, date, event_time)
+                if cleaned > 10:
+                    message += "\n..."
                 session.open(MessageBox, message, MessageBox.TYPE_INFO)
                 if callback:
                     callback()
@@ -1231,37 +1310,32 @@ class EventManager:
             # DEBUG: Print all events
             if get_debug():
                 print("\n[EventManager] DEBUG - All events:")
-            for i, event in enumerate(self.events):
-                print(
-                    "[%d] '%s' - %s %s" %
-                    (i, event.title, event.date, event.time))
+                for i, event in enumerate(self.events):
+                    print(
+                        "[%d] '%s' - %s %s" %
+                        (i, event.title, event.date, event.time))
 
-            # Keep track of unique events
+            # Keep track of unique events (same keys as the event index)
             unique_events = []
-            seen_keys = set()
+            seen = DedupIndex()
             removed_count = 0
+            self.last_cleanup_report = []
 
             for event in self.events:
-                # Create unique key for this event
-                key = self._get_event_key(event)
-                if get_debug():
-                    print("\n[EventManager] Checking: '%s'" % event.title)
-                    print("[EventManager] Key: '%s'" % key)
-
-                if key in seen_keys:
+                if seen.has_event(event):
                     # Duplicate found - remove it
                     if get_debug():
                         print(
                             "[EventManager] DUPLICATE FOUND! Removing: %s" %
                             event.title)
+                    self.last_cleanup_report.append(
+                        (event.title, event.date, event.time))
                     removed_count += 1
                     continue
 
                 # Not a duplicate - keep it
-                seen_keys.add(key)
+                seen.add_event(event)
                 unique_events.append(event)
-                if get_debug():
-                    print("[EventManager] Added to unique list")
 
             # Update events if duplicates were found
             if removed_count > 0:
@@ -1287,47 +1361,6 @@ class EventManager:
             traceback.print_exc()
             return 0
 
-    def _get_event_key(self, event):
-        """Create unique key for event deduplication"""
-        # Normalize the title
-        if hasattr(self, '_normalize_event_title'):
-            norm_title = self._normalize_event_title(event.title)
-        else:
-            # Fallback simple normalization
-            norm_title = event.title.lower().strip() if event.title else ""
-
-        key_parts = [
-            norm_title,
-            event.date if event.date else "",
-            event.time if event.time else get_default_event_time()
-        ]
-
-        return "|".join(key_parts)
-
-    def _normalize_event_title(self, title):
-        """Normalize event title for comparison"""
-        if not title:
-            return ""
-
-        # Lowercase
-        normalized = title.lower()
-
-        # Remove extra spaces
-        normalized = " ".join(normalized.split())
-
-        # Remove common suffixes
-        suffixes = [
-            ' - birthday', ' - compleanno', "'s birthday",
-            ' - geburtstag', ' - anniversaire', ' - cumpleaños',
-            ' birthday', ' compleanno'
-        ]
-
-        for suffix in suffixes:
-            if normalized.endswith(suffix):
-                normalized = normalized[:-len(suffix)].strip()
-
-        return normalized
-
     def show_notification(self, event):
         try:
             print("[EventManager] === SHOW_NOTIFICATION START ===")
@@ -0,0 +1,307 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Scoped exports: date range, labels/categories, source and enabled state.
+
+ExportFilter holds the criteria (from the export settings by default).
+The managers answer it through query indexes built once per change of
+their data:
+
+    EventQueryIndex    - events sorted by date (bisect on the range),
+                         label and source tables
+    ContactQueryIndex  - birthdays sorted by month-day, category table
+
+A query starts from the smallest candidate set of the indexed criteria
+and checks the remaining ones only on those candidates, so a small
+export of a large database costs about its own size. Repeating events
+are kept when they start before the end of the range; birthdays match
+on month and day.
+"""
+from __future__ import print_function
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from .config_manager import get_debug, get_export_filter_values
+
+SOURCES = ("manual", "ics", "birthdays", "holidays")
+DEFAULT_SOURCES = ("manual", "ics", "birthdays")
+
+
+def parse_export_date(value):
+    """YYYY-MM-DD (also YYYYMMDD) -> YYYY-MM-DD, '' when empty or invalid"""
+    value = (value or "").strip()
+    if not value:
+        return ""
+    for fmt in ("%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    print("[ExportFilter] Invalid date ignored: {0}".format(value))
+    return ""
+
+
+def split_labels(value):
+    """Comma separated labels/categories -> set of lower case names"""
+    if not value:
+        return set()
+    if not isinstance(value, str):
+        value = ",".join(value)
+    return set(v.strip().lower() for v in value.split(",") if v.strip())
+
+
+def event_source(event):
+    """'ics' for imported events, 'manual' otherwise"""
+    return "ics" if getattr(event, 'source', '') else "manual"
+
+
+class ExportFilter:
+    """Criteria of a scoped export - the defaults give the full export
+    (manual and imported events, birthdays, enabled events only)"""
+
+    def __init__(self, date_from="", date_to="", labels=(), sources=None,
+                 enabled_only=True):
+        self.date_from = parse_export_date(date_from)
+        self.date_to = parse_export_date(date_to)
+        self.labels = split_labels(labels)
+        self.sources = set(DEFAULT_SOURCES if sources is None else sources)
+        self.enabled_only = enabled_only
+
+    @classmethod
+    def from_config(cls):
+        return cls(**get_export_filter_values())
+
+    def is_scoped(self):
+        """True when the filter leaves out part of the default export
+        (disabled events are not part of it)"""
+        return bool(self.date_from or self.date_to or self.labels or
+                    not self.sources.issuperset(DEFAULT_SOURCES))
+
+    def wants_source(self, source):
+        return source in self.sources
+
+    def match_date(self, date_str, recurring=False):
+        """Event start date (YYYY-MM-DD) in range; repeating events only
+        need to start before its end"""
+        if self.date_to and date_str > self.date_to:
+            return False
+        if self.date_from and date_str < self.date_from and not recurring:
+            return False
+        return True
+
+    def match_birthday(self, bday):
+        """Birthday (YYYY-MM-DD) recurring inside the range"""
+        span = self.month_day_span()
+        if span is None:
+            return True
+        month_day = bday[5:10]
+        md_from, md_to = span
+        if md_from <= md_to:
+            return md_from <= month_day <= md_to
+        return month_day >= md_from or month_day <= md_to
+
+    def month_day_span(self):
+        """(MM-DD from, MM-DD to) of a range shorter than a year, or None"""
+        if not (self.date_from and self.date_to):
+            return None
+        start = datetime.strptime(self.date_from, "%Y-%m-%d")
+        end = datetime.strptime(self.date_to, "%Y-%m-%d")
+        if (end - start).days >= 365:
+            return None
+        return self.date_from[5:], self.date_to[5:]
+
+    def match_event(self, event):
+        if not self.wants_source(event_source(event)):
+            return False
+        if self.enabled_only and not getattr(event, 'enabled', True):
+            return False
+        recurring = getattr(event, 'repeat', 'none') not in ('', 'none')
+        if not self.match_date(event.date, recurring):
+            return False
+        if self.labels and not self.labels.intersection(
+                getattr(event, 'labels', None) or ()):
+            return False
+        return True
+
+    def match_contact(self, contact, need_birthday=False):
+        bday = contact.get('BDAY', '')
+        if bday and len(bday) >= 10:
+            if not self.match_birthday(bday):
+                return False
+        elif need_birthday or self.month_day_span() is not None:
+            return False
+        if self.labels and not self.labels.intersection(
+                split_labels(contact.get('CATEGORIES', ''))):
+            return False
+        return True
+
+    def match_component(self, date_str, lines):
+        """Archived VEVENT: date as YYYYMMDD, labels from CATEGORIES"""
+        if len(date_str) == 8:
+            date_str = "{0}-{1}-{2}".format(
+                date_str[:4], date_str[4:6], date_str[6:])
+        recurring = any(line.startswith("RRULE") for line in lines)
+        if not self.match_date(date_str, recurring):
+            return False
+        if self.labels:
+            categories = set()
+            for line in lines:
+                if line.startswith("CATEGORIES"):
+                    categories.update(split_labels(line.split(":", 1)[-1]))
+            if not self.labels.intersection(categories):
+                return False
+        return True
+
+    def describe(self):
+        parts = []
+        if self.date_from or self.date_to:
+            parts.append("{0}..{1}".format(self.date_from, self.date_to))
+        if self.labels:
+            parts.append(",".join(sorted(self.labels)))
+        parts.append("+".join(s for s in SOURCES if s in self.sources))
+        if not self.enabled_only:
+            parts.append("disabled")
+        return " ".join(parts)
+
+
+def _smallest(candidates):
+    """Smallest of several candidate position lists/sets (None = all)"""
+    candidates = [c for c in candidates if c is not None]
+    if not candidates:
+        return None
+    return min(candidates, key=len)
+
+
+class EventQueryIndex:
+    """Date, label and source index over a list of events"""
+
+    def __init__(self, events):
+        # Own copy: positions stay valid if the list is sorted in place
+        self.events = list(events)
+        events = self.events
+        dated = []
+        self.recurring = []
+        self.by_label = {}
+        self.by_source = {"manual": set(), "ics": set()}
+        for position, event in enumerate(events):
+            if getattr(event, 'repeat', 'none') not in ('', 'none'):
+                self.recurring.append(position)
+            else:
+                dated.append((event.date or "", position))
+            for label in getattr(event, 'labels', None) or ():
+                self.by_label.setdefault(label, set()).add(position)
+            self.by_source[event_source(event)].add(position)
+        dated.sort()
+        self.dates = [date for date, _position in dated]
+        self.positions = [position for _date, position in dated]
+
+    def date_candidates(self, export_filter):
+        if not (export_filter.date_from or export_filter.date_to):
+            return None
+        lo = 0
+        hi = len(self.dates)
+        if export_filter.date_from:
+            lo = bisect_left(self.dates, export_filter.date_from)
+        if export_filter.date_to:
+            hi = bisect_right(self.dates, export_filter.date_to)
+        return self.positions[lo:hi] + self.recurring
+
+    def label_candidates(self, export_filter):
+        if not export_filter.labels:
+            return None
+        positions = set()
+        for label in export_filter.labels:
+            positions.update(self.by_label.get(label, ()))
+        return positions
+
+    def source_candidates(self, export_filter):
+        wanted = [s for s in ("manual", "ics") if export_filter.wants_source(s)]
+        if len(wanted) == 2:
+            return None
+        if not wanted:
+            return []
+        return self.by_source[wanted[0]]
+
+    def query(self, export_filter):
+        """Events matching the filter, in list order"""
+        candidates = _smallest([
+            self.date_candidates(export_filter),
+            self.label_candidates(export_filter),
+            self.source_candidates(export_filter),
+        ])
+        if candidates is None:
+            candidates = range(len(self.events))
+        events = self.events
+        result = [events[p] for p in sorted(candidates)
+                  if export_filter.match_event(events[p])]
+        if get_debug():
+            print("[ExportFilter] {0} of {1} events ({2} candidates)".format(
+                len(result), len(events), len(candidates)))
+        return result
+
+
+class ContactQueryIndex:
+    """Birthday (month-day) and category index over a list of contacts"""
+
+    def __init__(self, contacts):
+        self.contacts = list(contacts)
+        contacts = self.contacts
+        dated = []
+        self.by_category = {}
+        for position, contact in enumerate(contacts):
+            bday = contact.get('BDAY', '')
+            if bday and len(bday) >= 10:
+                dated.append((bday[5:10], position))
+            for category in split_labels(contact.get('CATEGORIES', '')):
+                self.by_category.setdefault(category, set()).add(position)
+        dated.sort()
+        self.month_days = [month_day for month_day, _position in dated]
+        self.positions = [position for _month_day, position in dated]
+
+    def birthday_candidates(self, export_filter):
+        span = export_filter.month_day_span()
+        if span is None:
+            return None
+        md_from, md_to = span
+        lo = bisect_left(self.month_days, md_from)
+        hi = bisect_right(self.month_days, md_to)
+        if md_from <= md_to:
+            return self.positions[lo:hi]
+        # Range over the new year
+        return self.positions[lo:] + self.positions[:hi]
+
+    def category_candidates(self, export_filter):
+        if not export_filter.labels:
+            return None
+        positions = set()
+        for label in export_filter.labels:
+            positions.update(self.by_category.get(label, ()))
+        return positions
+
+    def query(self, export_filter, need_birthday=False):
+        """Contacts matching the filter, in list order"""
+        candidates = _smallest([
+            self.birthday_candidates(export_filter),
+            self.category_candidates(export_filter),
+            self.positions if need_birthday else None,
+        ])
+        if candidates is None:
+            candidates = range(len(self.contacts))
+        contacts = self.contacts
+        result = [contacts[p] for p in sorted(candidates)
+                  if export_filter.match_contact(contacts[p], need_birthday)]
+        if get_debug():
+            print("[ExportFilter] {0} of {1} contacts ({2} candidates)".format(
+                len(result), len(contacts), len(candidates)))
+        return result
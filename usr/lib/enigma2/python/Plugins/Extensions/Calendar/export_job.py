@@ -0,0 +1,306 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Background export jobs.
+
+The export function runs in a worker thread and reports through the job:
+job.set_phase() when it starts a new part, job.step() per item written.
+step() raises ExportCancelled once the user cancelled; exporters write to
+<output>.tmp and rename at the end, so a cancelled or failed job leaves no
+partial file (the job removes a leftover .tmp as well).
+
+Progress reaches the ExportProgressScreen through a ProgressChannel on the
+main loop. Exit hides the screen and the export keeps running; the result
+is then announced with a notification. A failed job still closes the
+screen with its item count: callers check job.error (show_error()).
+"""
+from __future__ import print_function
+import os
+import threading
+import time
+from os.path import basename, exists
+
+from enigma import eTimer, getDesktop
+from Screens.MessageBox import MessageBox
+from Screens.Screen import Screen
+from Components.ActionMap import ActionMap
+from Components.Label import Label
+from Components.ProgressBar import ProgressBar
+
+from . import _
+from .config_manager import get_debug
+from .progress_channel import ProgressChannel
+
+try:
+    from .notification_system import quick_notify
+except ImportError:
+    quick_notify = None
+
+# Jobs running without a screen, kept alive until their result is delivered
+_active_jobs = []
+
+
+class ExportCancelled(Exception):
+    """Raised by ExportJob.step() after a cancel request"""
+    pass
+
+
+class ExportJob(threading.Thread):
+    """Run work(job) in a worker thread - work returns the item count
+
+    done_callback(job), if given, runs on the main loop when the job has
+    finished, also when the screen was hidden. label names the job in the
+    notifications.
+    """
+
+    def __init__(self, title, output_path, work, done_callback=None,
+                 label=None):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.title = title
+        self.output_path = output_path
+        self.work = work
+        self.done_callback = done_callback
+        self.label = label or _("Export")
+        self.cancelled = False
+        self.finished = False
+        self.phase = ""
+        self.phase_index = 0
+        self.done = 0
+        self.total = 0
+        self.result = 0
+        self.error = None
+        self.start_time = 0
+        self.phase_start = 0
+        self.listener = None    # main loop callback(job, finished)
+        self.channel = ProgressChannel(self.deliver)
+
+    def begin(self):
+        """Main loop: start the worker and the progress channel"""
+        _active_jobs.append(self)
+        self.start_time = self.phase_start = time.time()
+        self.channel.start()
+        self.start()
+
+    def run(self):
+        try:
+            self.result = self.work(self) or 0
+            if self.cancelled:
+                self.result = 0
+        except ExportCancelled:
+            self.result = 0
+        except Exception as e:
+            print("[ExportJob] Error exporting {0}: {1}".format(
+                self.output_path, e))
+            self.error = str(e)
+            self.result = 0
+        if self.cancelled or self.error:
+            self.cleanup()
+        self.finished = True
+        self.channel.report(True)
+
+    def set_phase(self, phase, total=0):
+        """Worker: start a new part of the export"""
+        self.phase = phase
+        self.phase_index += 1
+        self.total = total
+        self.done = 0
+        self.phase_start = time.time()
+        self.channel.report(False)
+
+    def step(self, count=1):
+        """Worker: count written items, stop here after a cancel"""
+        if self.cancelled:
+            raise ExportCancelled()
+        self.done += count
+        self.channel.report(False)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def cleanup(self):
+        """Remove what a cancelled or failed export left behind"""
+        temp_path = self.output_path + ".tmp"
+        if exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError as e:
+                print("[ExportJob] Error removing {0}: {1}".format(temp_path, e))
+
+    def get_rate(self):
+        """Items per second in the current phase"""
+        elapsed = time.time() - self.phase_start
+        return int(self.done / elapsed) if elapsed > 0 else 0
+
+    def deliver(self, finished):
+        """Main loop: pass progress to the screen, announce the result"""
+        if self.listener is not None:
+            self.listener(self, finished)
+        if finished:
+            if self in _active_jobs:
+                _active_jobs.remove(self)
+            if self.done_callback is not None:
+                try:
+                    self.done_callback(self)
+                except Exception as e:
+                    print("[ExportJob] Done callback error: {0}".format(e))
+            if self.listener is None:
+                self.notify()
+            if get_debug():
+                print("[ExportJob] {0}: {1} items, {2:.1f}s".format(
+                    basename(self.output_path), self.result,
+                    time.time() - self.start_time))
+
+    def show_error(self, session):
+        """Main loop: report a failed job in a MessageBox - True if failed"""
+        if not self.error:
+            return False
+        session.open(
+            MessageBox,
+            _("{0} error: {1}").format(self.label, self.error),
+            MessageBox.TYPE_ERROR)
+        return True
+
+    def notify(self):
+        if quick_notify is None:
+            return
+        if self.cancelled:
+            message = _("{0} cancelled").format(self.label)
+        elif self.error:
+            message = _("{0} error: {1}").format(self.label, self.error)
+        else:
+            message = _("{0} completed: {1} items\n{2}").format(
+                self.label, self.result, self.output_path)
+        try:
+            quick_notify(message, 10)
+        except Exception as e:
+            print("[ExportJob] Notification error: {0}".format(e))
+
+
+class ExportProgressScreen(Screen):
+    if (getDesktop(0).size().width() >= 1920):
+        skin = """
+        <screen name="ExportProgressScreen" position="50,20" size="1000,135" title="Exporting" flags="wfNoBorder">
+            <widget name="title" position="10,5" size="981,36" font="Regular;32" halign="left" valign="center" />
+            <widget name="filename" position="10,45" size="585,50" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <widget name="progress" position="10,100" size="585,50" />
+            <widget name="status" position="600,100" size="395,50" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <widget name="details" position="600,45" size="395,55" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/Calendar/buttons/key_red.png" position="721,30" size="150,10" alphatest="blend" />
+            <widget name="key_red" position="721,5" size="150,25" font="Regular;20" halign="center" valign="center" />
+        </screen>
+        """
+    else:
+        skin = """
+        <screen name="ExportProgressScreen" position="50,20" size="800,300" title="Exporting" flags="wfNoBorder">
+            <widget name="title" position="10,10" size="780,40" font="Regular;32" halign="center" valign="center" />
+            <widget name="filename" position="10,60" size="780,30" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <widget name="progress" position="10,95" size="780,20" />
+            <widget name="status" position="10,120" size="780,30" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <widget name="details" position="10,155" size="780,72" font="Regular;24" halign="center" valign="center" foregroundColor="#00ffcc33" backgroundColor="#20101010" />
+            <ePixmap pixmap="/usr/lib/enigma2/python/Plugins/Extensions/Calendar/buttons/key_red.png" position="35,261" size="150,10" alphatest="blend" />
+            <widget name="key_red" position="35,235" size="150,25" font="Regular;20" halign="center" valign="center" />
+        </screen>
+        """
+
+    def __init__(self, session, job):
+        Screen.__init__(self, session)
+        self.job = job
+        self["title"] = Label(job.title)
+        self["filename"] = Label(basename(job.output_path))
+        self["progress"] = ProgressBar()
+        self["status"] = Label(_("Initializing..."))
+        self["details"] = Label("")
+        self["key_red"] = Label(_("Cancel"))
+
+        self["actions"] = ActionMap(
+            ["CalendarActions"],
+            {
+                "red": self.cancel_export,
+                "cancel": self.on_exit_pressed,
+                "ok": self.on_exit_pressed
+            }, -1
+        )
+
+        self.onShown.append(self.start_export)
+
+    def start_export(self):
+        """Start the job once, attach to its progress"""
+        self.job.listener = self.update_progress
+        if not self.job.is_alive() and not self.job.finished:
+            self.job.begin()
+
+    def update_progress(self, job, finished):
+        """Main loop: show phase, items and throughput"""
+        try:
+            if job.total > 0:
+                self["progress"].setValue(min(100, job.done * 100 // job.total))
+            if finished:
+                self["progress"].setValue(100)
+                if job.cancelled:
+                    self["status"].setText(_("Cancelled"))
+                elif job.error:
+                    self["status"].setText(_("Error"))
+                else:
+                    self["status"].setText(_("Completed"))
+                self["details"].setText(_("Exported: {0}").format(job.result))
+                self["key_red"].setText(_("Close"))
+                self.close_timer = eTimer()
+                try:
+                    self.close_timer_conn = self.close_timer.timeout.connect(
+                        self.close_finished)
+                except AttributeError:
+                    self.close_timer.callback.append(self.close_finished)
+                self.close_timer.start(500, True)
+                return
+
+            self["status"].setText("{0} ({1})".format(job.phase, job.phase_index))
+            if job.total > 0:
+                items = "{0}/{1}".format(job.done, job.total)
+            else:
+                items = str(job.done)
+            self["details"].setText(_("Items: {0}\n{1}/s").format(
+                items, job.get_rate()))
+        except Exception as e:
+            print("[ExportProgress] GUI update error: {0}".format(e))
+
+    def close_finished(self):
+        """Close with the item count, None after a cancel
+
+        A failed job closes with its count too (0): see job.show_error().
+        """
+        self.job.listener = None
+        if self.job.cancelled:
+            Screen.close(self, None)
+        else:
+            Screen.close(self, self.job.result)
+
+    def cancel_export(self):
+        """Cancel export - becomes Close when finished"""
+        if self.job.finished:
+            self.close_finished()
+            return
+        self.job.cancel()
+        self["status"].setText(_("Cancelling..."))
+
+    def on_exit_pressed(self):
+        """Hide the screen, a running export continues in background
+
+        The screen closes with None, the job announces its result.
+        """
+        if self.job.finished:
+            self.close_finished()
+            return
+        self.job.listener = None
+        Screen.close(self, None)
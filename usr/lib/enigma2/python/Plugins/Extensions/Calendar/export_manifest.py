@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Manifest of exported items for differential exports.
+
+Every export records the UID and a content hash of each item it covers
+(export_manifest_<kind>.json in the data directory). With "Export changes
+only" enabled the next export writes just the items that are new or whose
+content changed; ICS exports can add STATUS:CANCELLED stubs for the UIDs
+that disappeared. The manifest is replaced only after the export file was
+written completely, so a failed or cancelled export does not lose changes.
+"""
+from __future__ import print_function
+import hashlib
+import json
+import os
+from datetime import datetime
+from os.path import exists, join
+
+from .config_manager import get_debug, get_export_changes_only
+from .formatters import DATA_PATH
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(lines):
+    """Hash of the lines of one exported item"""
+    return hashlib.sha1("\n".join(lines).encode('utf-8')).hexdigest()
+
+
+def component_line(lines, name):
+    """First line of property name (with its parameters), or ''"""
+    for line in lines:
+        if line.startswith(name + ":") or line.startswith(name + ";"):
+            return line
+    return ""
+
+
+def component_uid(lines):
+    line = component_line(lines, "UID")
+    return line.split(":", 1)[1].strip() if line else ""
+
+
+class ExportManifest:
+    """UIDs and content hashes of the last completed export
+
+    Entries are uid -> [hash, DTSTART line]; the start is kept so that a
+    deleted event can still be cancelled. A scoped export (ExportFilter)
+    only covers part of the items: the others are kept in the manifest
+    and nothing is considered deleted.
+    """
+
+    def __init__(self, kind, changes_only=None, path=None, scoped=False):
+        self.kind = kind
+        self.scoped = scoped
+        if changes_only is None:
+            changes_only = get_export_changes_only()
+        self.changes_only = changes_only
+        self.path = path or join(
+            DATA_PATH, "export_manifest_{0}.json".format(kind))
+        self.previous = {}
+        self.current = {}
+        self.new = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.load()
+
+    def load(self):
+        if not exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.previous = data.get('items', {})
+        except Exception as e:
+            print("[ExportManifest] Error loading {0}: {1}".format(self.path, e))
+
+    def wants(self, uid, lines, start=""):
+        """Record an item - True when the export has to write it"""
+        digest = content_hash(lines)
+        self.current[uid] = [digest, start]
+        entry = self.previous.get(uid)
+        if entry is None:
+            self.new += 1
+        elif entry[0] != digest:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+            return not self.changes_only
+        return True
+
+    def write_component(self, writer, lines, uid=None):
+        """Write an ICS component unless it is unchanged - True if written"""
+        uid = component_uid(lines) or uid
+        if uid and not self.wants(uid, lines, component_line(lines, "DTSTART")):
+            return False
+        writer.write_component(lines)
+        return True
+
+    def deleted(self):
+        """(uid, DTSTART line) of the items gone since the last export"""
+        if self.scoped:
+            return []
+        return [(uid, entry[1]) for uid, entry in self.previous.items()
+                if uid not in self.current]
+
+    def write_cancellations(self, writer):
+        """Cancel the deleted events in a differential ICS export"""
+        if not self.changes_only:
+            return 0
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        count = 0
+        for uid, start in self.deleted():
+            lines = ["BEGIN:VEVENT", "UID:" + uid, "DTSTAMP:" + stamp]
+            if start:
+                lines.append(start)
+            lines.append("STATUS:CANCELLED")
+            lines.append("END:VEVENT")
+            writer.write_component(lines)
+            count += 1
+        return count
+
+    def save(self):
+        """Replace the manifest - call after the export was written"""
+        temp_path = self.path + ".tmp"
+        items = self.current
+        if self.scoped:
+            items = dict(self.previous)
+            items.update(self.current)
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'version': MANIFEST_VERSION,
+                    'kind': self.kind,
+                    'updated': datetime.now().isoformat(),
+                    'items': items
+                }, f)
+            os.rename(temp_path, self.path)
+        except Exception as e:
+            print("[ExportManifest] Error saving {0}: {1}".format(self.path, e))
+            return False
+        if get_debug():
+            print("[ExportManifest] {0}: {1} new, {2} changed, {3} unchanged, "
+                  "{4} deleted".format(self.kind, self.new, self.changed,
+                                       self.unchanged, len(self.deleted())))
+        return True
@@ -270,15 +270,16 @@ def create_export_directory(base_path, subdir="Calendar_Export"):
     return export_path
 
 
-def generate_export_filename(base_name="calendar_export", add_timestamp=True):
+def generate_export_filename(base_name="calendar_export", add_timestamp=True,
+                             extension=".ics"):
     """Generate export filename with optional timestamp"""
     from datetime import datetime
 
     if add_timestamp:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return "{0}_{1}.ics".format(base_name, timestamp)
+        return "{0}_{1}{2}".format(base_name, timestamp, extension)
     else:
-        return "{0}.ics".format(base_name)
+        return "{0}{1}".format(base_name, extension)
 
 
 # ============================================================================
@@ -14,6 +14,7 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 """
 from __future__ import print_function
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
 from json import loads
 from os import makedirs, listdir
@@ -229,6 +230,36 @@ class HolidaysManager:
                     len(holidays_list)))
         return holidays_list
 
+    def get_holidays_in_range(self, date_from="", date_to=""):
+        """(YYYY-MM-DD, holiday) of the day files in a date range
+
+        Day files are named YYYYMMDD.txt, so the sorted directory listing
+        is bisected and only the files inside the range are read.
+        """
+        if not exists(self.holidays_dir):
+            return []
+        names = sorted(name for name in listdir(self.holidays_dir)
+                       if len(name) == 12 and name.endswith(".txt"))
+        lo = bisect_left(names, date_from.replace('-', '') + ".txt") if date_from else 0
+        hi = bisect_right(names, date_to.replace('-', '') + ".txt") if date_to else len(names)
+
+        holidays_list = []
+        for name in names[lo:hi]:
+            try:
+                with open(join(self.holidays_dir, name), 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith('holiday:'):
+                            holiday_text = line.split(':', 1)[1].strip()
+                            if holiday_text and holiday_text.lower() != "none":
+                                holidays_list.append((
+                                    "{0}-{1}-{2}".format(name[:4], name[4:6], name[6:8]),
+                                    holiday_text))
+                            break
+            except Exception as e:
+                print("[Holidays] Error reading file: " + str(e))
+        return holidays_list
+
     def import_from_holidata(self, country, language, year=None):
         """Import holidays from Holidata.net - CLEAN BEFORE IMPORT"""
         if year is None:
@@ -14,9 +14,6 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 """
 from __future__ import print_function
 
-import glob
-from os.path import join, exists, getsize, getmtime, basename
-from datetime import datetime
 from enigma import getDesktop
 
 from Components.ActionMap import ActionMap
@@ -30,7 +27,7 @@ from . import _
 from .event_manager import EventManager
 from .ics_manager import ICSManager
 from .ics_importer import ICSImporter
-from .duplicate_checker import DuplicateChecker
+from .ics_sync import compute_sync_diff, apply_sync_diff
 from .formatters import MenuDialog, ICS_BASE_PATH
 from .config_manager import get_debug
 
@@ -101,43 +98,25 @@ class ICSBrowser(Screen):
             print("[ICSBrowser] DEBUG: update_list called")
             print("[ICSBrowser] DEBUG: Looking in:", ICS_BASE_PATH)
 
-        pattern = join(ICS_BASE_PATH, "*.ics")
-        files = glob.glob(pattern)
-
-        self.ics_files = []
+        self.ics_files = self.ics_manager.get_imported_ics_files()
         items = []
 
-        for filepath in files:
-            try:
-                if exists(filepath):
-                    filename = basename(filepath)
-                    size = getsize(filepath)
-                    modified = datetime.fromtimestamp(getmtime(filepath))
-
-                    self.ics_files.append({
-                        'filename': filename,
-                        'path': filepath,
-                        'size': size,
-                        'modified': modified
-                    })
-
-                    size_kb = size / 1024.0
-                    date_str = modified.strftime("%Y-%m-%d %H:%M")
-
-                    if size_kb > 1024:
-                        display_size = "{:.1f} MB".format(size_kb / 1024)
-                    else:
-                        display_size = "{:.1f} KB".format(size_kb)
-
-                    items.append("{} ({} - {})".format(
-                        filename, display_size, date_str
-                    ))
-                    if get_debug():
-                        print(
-                            "[ICSBrowser] DEBUG: Found archive file:", filename)
-            except Exception as e:
-                print("[ICSBrowser] ERROR:", e)
-                continue
+        for file_info in self.ics_files:
+            size_kb = file_info['size'] / 1024.0
+            date_str = file_info['modified'].strftime("%Y-%m-%d %H:%M")
+
+            if size_kb > 1024:
+                display_size = "{:.1f} MB".format(size_kb / 1024)
+            else:
+                display_size = "{:.1f} KB".format(size_kb)
+
+            items.append("{} ({} - {})".format(
+                file_info['name'], display_size, date_str
+            ))
+            if get_debug():
+                print(
+                    "[ICSBrowser] DEBUG: Found archive file:",
+                    file_info['filename'])
 
         self["list"].setList(items)
 
@@ -189,20 +168,30 @@ class ICSBrowser(Screen):
 
     def _show_file_preview(self, file_info):
         """Show preview of ICS file content"""
-        content = self.ics_manager.get_ics_content(file_info['filename'])
-        if content:
-            # Get first 50 lines for preview
-            lines = content.split('\n')[:50]
+        lines = []
+        truncated = False
+        try:
+            # Get first 50 lines for preview, archives are read as a stream
+            with self.ics_manager.open_ics(file_info['filename']) as f:
+                for line in f:
+                    if len(lines) == 50:
+                        truncated = True
+                        break
+                    lines.append(line.rstrip('\r\n'))
+        except Exception as e:
+            print("[ICSBrowser] Error reading preview: {0}".format(e))
+
+        if lines:
             preview = '\n'.join(lines)
 
-            if len(content.split('\n')) > 50:
+            if truncated:
                 preview += "\n\n..." + _("(truncated)")
 
             # Show in a scrollable message
             self.session.open(
                 MessageBox,
                 _("Preview of {0}:\n\n{1}").format(
-                    file_info['filename'],
+                    file_info['name'],
                     preview),
                 MessageBox.TYPE_INFO)
 
@@ -239,54 +228,25 @@ class ICSBrowser(Screen):
 
     def _show_ics_statistics(self, file_info):
         """Show statistics about events in ICS file"""
-        content = self.ics_manager.get_ics_content(file_info['filename'])
-        if not content:
-            self.session.open(
-                MessageBox,
-                _("Could not read file"),
-                MessageBox.TYPE_ERROR
-            )
-            return
-
-        # Count events
-        event_count = content.count('BEGIN:VEVENT')
-
-        # Count birthdays
-        birthday_count = 0
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if 'SUMMARY' in line and (
-                    'birthday' in line.lower() or 'compleanno' in line.lower()):
-                birthday_count += 1
-
-        # Find date range
-        dates = []
-        for line in lines:
-            if 'DTSTART' in line and ':' in line:
-                try:
-                    dt_value = line.split(':', 1)[1].strip()
-                    if len(dt_value) >= 8:
-                        year = int(dt_value[0:4])
-                        month = int(dt_value[4:6])
-                        day = int(dt_value[6:8])
-                        dates.append(datetime(year, month, day))
-                except BaseException:
-                    pass
+        # Counts come from the archive catalog, the file is not read
+        event_count = file_info['events']
+        birthday_count = file_info['birthdays']
+        min_date = file_info['date_min']
+        max_date = file_info['date_max']
 
         # Create statistics message
         stats = [
-            _("File: {0}").format(file_info['filename']),
+            _("File: {0}").format(file_info['name']),
+            _("Calendar: {0}").format(file_info['calendar'] or "-"),
             _("Size: {0:.1f} KB").format(file_info['size'] / 1024.0),
             _("Total events: {0}").format(event_count),
             _("Birthdays: {0}").format(birthday_count)
         ]
 
-        if dates:
-            min_date = min(dates)
-            max_date = max(dates)
+        if min_date:
             stats.append(_("Date range: {0} to {1}").format(
-                min_date.strftime("%Y-%m-%d"),
-                max_date.strftime("%Y-%m-%d")
+                "{0}-{1}-{2}".format(min_date[:4], min_date[4:6], min_date[6:]),
+                "{0}-{1}-{2}".format(max_date[:4], max_date[4:6], max_date[6:])
             ))
 
         self.session.open(
@@ -300,7 +260,7 @@ class ICSBrowser(Screen):
         self.session.openWithCallback(
             lambda result: self._delete_confirmed(result, file_info),
             MessageBox,
-            _("Delete {0}?").format(file_info['filename']),
+            _("Delete {0}?").format(file_info['name']),
             MessageBox.TYPE_YESNO
         )
 
@@ -322,30 +282,77 @@ class ICSBrowser(Screen):
         self.view_file()
 
     def reimport_file(self):
-        """Re-import selected ICS file"""
+        """Re-import selected ICS file - only the changes are applied"""
         selection = self["list"].getCurrent()
-        if selection and self.ics_files:
-            idx = self["list"].getSelectionIndex()
-            file_info = self.ics_files[idx]
+        if not (selection and self.ics_files):
+            return
 
-            self._import_ics_events(file_info)
+        if not config.plugins.calendar.events_enabled.value:
+            self.session.open(
+                MessageBox,
+                _("Event system is disabled. Enable it in settings first."),
+                MessageBox.TYPE_INFO
+            )
+            return
 
-    def reimport_callback(self, result):
-        if result:
-            self.update_list()
-            # Check for duplicates
-            duplicate_checker = DuplicateChecker()
-            duplicates = duplicate_checker.find_all_duplicates()
+        idx = self["list"].getSelectionIndex()
+        file_info = self.ics_files[idx]
 
-            if duplicates:
-                self.session.open(
-                    MessageBox,
-                    _("File re-imported. Found {0} potential duplicates.").format(len(duplicates)),
-                    MessageBox.TYPE_INFO
-                )
-            else:
-                self.session.open(
-                    MessageBox,
-                    _("File re-imported successfully"),
-                    MessageBox.TYPE_INFO
-                )
+        try:
+            event_manager = EventManager(self.session)
+            diff = compute_sync_diff(event_manager, file_info['path'])
+        except Exception as e:
+            print("[ICSBrowser] Error comparing {0}: {1}".format(
+                file_info['filename'], e))
+            self.session.open(
+                MessageBox,
+                _("Error reading file:\n{0}").format(str(e)),
+                MessageBox.TYPE_ERROR
+            )
+            return
+
+        if not (diff['added'] or diff['changed'] or diff['cancelled']):
+            self.session.open(
+                MessageBox,
+                _("Calendar is up to date ({0} events unchanged)").format(
+                    diff['unchanged']),
+                MessageBox.TYPE_INFO
+            )
+            return
+
+        summary = [
+            _("Re-import {0}?").format(file_info['name']),
+            "",
+            _("New events: {0}").format(len(diff['added'])),
+            _("Changed events: {0}").format(len(diff['changed'])),
+            _("Cancelled events: {0}").format(len(diff['cancelled'])),
+            _("Unchanged: {0}").format(diff['unchanged'])
+        ]
+        self.session.openWithCallback(
+            lambda result: self.reimport_callback(result, event_manager, diff),
+            MessageBox,
+            "\n".join(summary),
+            MessageBox.TYPE_YESNO
+        )
+
+    def reimport_callback(self, result, event_manager, diff):
+        """Apply the re-import diff after confirmation"""
+        if not result:
+            return
+        try:
+            touched = apply_sync_diff(event_manager, diff)
+        except Exception as e:
+            print("[ICSBrowser] Error applying re-import: {0}".format(e))
+            self.session.open(
+                MessageBox,
+                _("Error: {0}").format(str(e)),
+                MessageBox.TYPE_ERROR
+            )
+            return
+
+        self.update_list()
+        self.session.open(
+            MessageBox,
+            _("File re-imported: {0} events updated").format(touched),
+            MessageBox.TYPE_INFO
+        )
@@ -14,8 +14,7 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 """
 from __future__ import print_function
 import time
-from datetime import datetime
-from re import split, IGNORECASE
+from re import sub
 from enigma import eTimer, getDesktop
 from os import makedirs
 from os.path import basename, exists, join, getsize, getmtime, splitext
@@ -25,14 +24,61 @@ from Components.Label import Label
 from Components.FileList import FileList
 from Components.ActionMap import ActionMap
 from Components.ProgressBar import ProgressBar
-import shutil
 import threading
 
 from . import _
-from .duplicate_checker import DuplicateChecker, run_complete_cleanup
+from .duplicate_checker import DedupIndex, DuplicateChecker, run_complete_cleanup
+from .event_classifier import EventClassifier
 from .event_manager import Event
 from .formatters import ICS_BASE_PATH
+from .ics_manager import ics_manager
+from .ics_month_store import ICSMonthStore
+from .ics_parser import iter_components, iter_ics_file, iter_ics_text, read_calendar_name
+from .import_checkpoint import ImportCheckpoint
+from .import_pipeline import CommitStage, FileSource, ImportPipeline, PipelineStage
+from .prescan import count_records
+from .progress_channel import ProgressChannel
 from .config_manager import get_debug, get_default_event_time
+from .csv_io import CSVSource, count_csv_rows, detect_csv_kind, is_csv_file
+
+# Event fields refreshed from the newer version of an event
+SYNC_FIELDS = ('title', 'description', 'date', 'time', 'repeat',
+               'sequence', 'last_modified')
+
+
+def is_newer_revision(incoming, existing):
+    """True if incoming is a newer revision of existing"""
+    if incoming.sequence != existing.sequence:
+        return incoming.sequence > existing.sequence
+    if incoming.last_modified and existing.last_modified:
+        # iCalendar UTC stamps (YYYYMMDDTHHMMSSZ) compare as strings
+        return incoming.last_modified > existing.last_modified
+    return False
+
+
+def has_sync_changes(incoming, existing):
+    for field in SYNC_FIELDS:
+        if getattr(incoming, field) != getattr(existing, field):
+            return True
+    return False
+
+
+def needs_update(incoming, existing):
+    """Newer revision, or same revision with different content"""
+    return is_newer_revision(incoming, existing) or (
+        incoming.sequence == existing.sequence and
+        has_sync_changes(incoming, existing))
+
+
+def update_event_from(existing, incoming):
+    """Copy the synced fields of a newer revision into the stored event"""
+    for field in SYNC_FIELDS:
+        setattr(existing, field, getattr(incoming, field))
+    existing.source = incoming.source
+    existing.update_labels()
+    for label in incoming.labels:
+        if label not in existing.labels:
+            existing.labels.append(label)
 
 
 class ICSImporter(Screen):
@@ -79,10 +125,10 @@ class ICSImporter(Screen):
         if get_debug():
             print("[ICSImporter] Start path: {0}".format(start_path))
         self.duplicate_checker = DuplicateChecker()
-        matching_pattern = r".*\.(ics|ical|icalendar)$"
+        matching_pattern = r".*\.(ics|ical|icalendar|csv)$"
         self["filelist"] = FileList(
             start_path, matchingPattern=matching_pattern)
-        self["status"] = Label(_("Select .ics file to import"))
+        self["status"] = Label(_("Select .ics or .csv file to import"))
         self["key_red"] = Label(_("Cancel"))
         self["key_green"] = Label(_("Import"))
         self["key_yellow"] = Label(_("View"))
@@ -126,20 +172,10 @@ class ICSImporter(Screen):
         self["status"].setText(_("Refreshed"))
 
     def count_events_in_file(self, filepath):
-        """Count events in .ics file"""
-        event_count = 0
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(1000000)  # Read first 1MB
-                event_count = content.count('BEGIN:VEVENT')
-            if get_debug():
-                print(
-                    "[ICSImporter] Counted {0} events in {1}".format(
-                        event_count, filepath))
-            return event_count
-        except Exception as e:
-            print("[ICSImporter] Error counting events: {0}".format(e))
-            return 0
+        """Count events in .ics file (pre-scan of the raw bytes)"""
+        if is_csv_file(filepath):
+            return count_csv_rows(filepath)
+        return count_records(filepath, 'vevent')
 
     def view_file_info(self):
         """Show file information"""
@@ -190,12 +226,8 @@ class ICSImporter(Screen):
     def import_ics_file(self, filepath):
         """Import ICS file and convert to daily files"""
         try:
-            timestamp = datetime.now().time.strftime("%Y%m%d_%H%M%S")
-            filename = basename(filepath)
-            base_name = splitext(filename)[0]
-            new_filename = "{}_{}.ics".format(base_name, timestamp)
-            new_filepath = join(self.raw_ics_path, new_filename)
-            shutil.copy2(filepath, new_filepath)
+            archive_name = ics_manager.archive_file(filepath)
+            new_filepath = join(self.raw_ics_path, archive_name) if archive_name else None
             converter = ICSConverter(language=self.language)
             imported_count = converter.convert_ics_to_daily_files(filepath)
             return imported_count, new_filepath
@@ -233,8 +265,16 @@ class ICSImporter(Screen):
 
         # Quick check if file is valid .ics
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                first_chunk = f.read(1024)
+            if is_csv_file(filepath):
+                if detect_csv_kind(filepath) != 'events':
+                    self.session.open(
+                        MessageBox,
+                        _("No event columns found in CSV file\n{0}").format(filename),
+                        MessageBox.TYPE_WARNING)
+                    return
+            else:
+                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                    first_chunk = f.read(1024)
                 if 'BEGIN:VCALENDAR' not in first_chunk.upper():
                     self.session.open(
                         MessageBox,
@@ -250,6 +290,32 @@ class ICSImporter(Screen):
             )
             return
 
+        # Offer to continue an interrupted import of the same file
+        state = ImportCheckpoint('ics', filepath).load()
+        if state:
+            self.session.openWithCallback(
+                lambda result: self.resume_callback(result, filepath),
+                MessageBox,
+                _("A previous import of {0} stopped after {1} events.\nResume it?").format(
+                    filename, state['counters'].get('current', 0)),
+                MessageBox.TYPE_YESNO)
+            return
+
+        self.confirm_import(filepath)
+
+    def resume_callback(self, result, filepath):
+        """Resume the interrupted import, or discard it and start over"""
+        if result:
+            self.start_import_process(
+                True, filepath, self.count_events_in_file(filepath), True)
+        else:
+            ImportCheckpoint('ics', filepath).clear()
+            self.confirm_import(filepath)
+
+    def confirm_import(self, filepath):
+        """Count events and ask for confirmation"""
+        filename = basename(filepath)
+
         # Count events first
         event_count = self.count_events_in_file(filepath)
         if event_count == 0:
@@ -272,7 +338,8 @@ class ICSImporter(Screen):
                 filename),
             MessageBox.TYPE_YESNO)
 
-    def start_import_process(self, result, filepath, event_count):
+    def start_import_process(self, result, filepath, event_count,
+                             resume=False):
         """Start the actual import process"""
         if not result:
             return
@@ -284,7 +351,8 @@ class ICSImporter(Screen):
             ICSImportProgressScreen,
             self.event_manager,
             filepath,
-            event_count
+            event_count,
+            resume
         )
 
     def import_completed(self, result):
@@ -298,7 +366,8 @@ class ICSImporter(Screen):
 
 
 class ICSFileImporterThread(threading.Thread):
-    def __init__(self, event_manager, filepath, total_events, callback):
+    def __init__(self, event_manager, filepath, total_events, callback,
+                 resume=False):
         threading.Thread.__init__(self)
         self.event_manager = event_manager
         self.filepath = filepath
@@ -306,11 +375,34 @@ class ICSFileImporterThread(threading.Thread):
         self.callback = callback
         self.cancelled = False
         self.imported = 0
+        self.updated = 0           # newer revisions and cancellations
         self.skipped = 0
         self.errors = 0
         self.current = 0
-        self.existing_events_cache = set()  # Cache for existing events
-        self.existing_contacts_cache = set()  # Cache for existing contacts
+        self.dedup = DedupIndex()  # Keys of existing events
+        self.by_uid = {}           # Stored events by UID
+        self.seen_uids = set()     # UIDs met by this run
+        self.cancelled_ids = set()  # id() of events cancelled upstream
+        self.contact_index = None  # Contact index of the birthday manager
+        self.birthdays = set()     # (name, birthday) imported by this run
+        self.classifier = EventClassifier()
+        self.pipeline = None
+        self.source = ICSFileImporterThread.get_source_name(filepath)
+
+        # Checkpoint: resume after the last committed event
+        self.checkpoint = ImportCheckpoint('ics', filepath)
+        self.start_offset = 0
+        self.bytes_read = 0
+        state = self.checkpoint.load() if resume else None
+        if state:
+            self.start_offset = self.bytes_read = state['offset']
+            for name, value in state['counters'].items():
+                setattr(self, name, value)
+            if get_debug():
+                print("[ICSFileImporterThread] Resuming at byte {0}".format(
+                    self.start_offset))
+        else:
+            self.checkpoint.clear()
 
         self._preload_caches()
 
@@ -319,121 +411,82 @@ class ICSFileImporterThread(threading.Thread):
         if get_debug():
             print("[DEBUG] Preloading caches...")
 
-        # Event cache (key: title + date + time)
-        for event in self.event_manager.events:
-            key = "{}|{}|{}".format(event.title, event.date, event.time)
-            self.existing_events_cache.add(key.lower())
+        # Event keys (title + date + time) and UIDs - shared with EventManager
+        if hasattr(self.event_manager, 'get_event_index'):
+            self.dedup.update(self.event_manager.get_event_index())
+        else:
+            for event in self.event_manager.events:
+                self.dedup.add_event(event)
+        self.by_uid = dict(
+            (event.uid, event) for event in self.event_manager.events
+            if event.uid)
 
-        try:
-            if hasattr(self.event_manager, 'birthday_manager'):
-                bm = self.event_manager.birthday_manager
-                for contact in bm.contacts:
-                    name = contact.get('FN', '').lower()
-                    bday = contact.get('BDAY', '')
-                    key = "{}|{}".format(name, bday)
-                    self.existing_contacts_cache.add(key)
-        except Exception:
-            pass
+        # Contacts: the birthday manager keeps its own index
+        bm = getattr(self.event_manager, 'birthday_manager', None)
+        self.contact_index = getattr(bm, 'contact_index', None)
 
         if get_debug():
-            print("[DEBUG] Events cache: {} items".format(
-                len(self.existing_events_cache)
-            ))
-            print("[DEBUG] Contacts cache: {} items".format(
-                len(self.existing_contacts_cache)
-            ))
-
-    def _is_event_duplicate(self, event_obj):
-        """Checks for duplicate event using cache - O(1) complexity"""
-        key = "{}|{}|{}".format(
-            event_obj.title,
-            event_obj.date,
-            event_obj.time)
-        return key.lower() in self.existing_events_cache
-
-    def _is_contact_duplicate(self, contact_data):
-        """Checks for duplicate contact using cache - O(1) complexity"""
-        name = contact_data.get('FN', '').lower()
-        bday = contact_data.get('BDAY', '')
-        key = "{}|{}".format(name, bday)
-        return key in self.existing_contacts_cache
-
-    def _is_birthday_event(self, event_obj):
-        """Determine if an ICS event is a birthday"""
-        title = event_obj.title.lower() if hasattr(event_obj, 'title') else ""
-        description = event_obj.description.lower() if hasattr(
-            event_obj, 'description') else ""
-
-        birthday_keywords = [
-            'birthday',
-            'compleanno',
-            'geburtstag',
-            'anniversaire',
-            'cumpleaños']
-
-        for keyword in birthday_keywords:
-            if keyword in title or keyword in description:
-                return True
-
-        if hasattr(event_obj, 'repeat') and event_obj.repeat == 'yearly':
-            return True
+            print("[DEBUG] Dedup index: {} keys".format(len(self.dedup)))
 
-        if hasattr(
-                event_obj, 'time') and (
-                not event_obj.time or event_obj.time == get_default_event_time()):
+    def has_birthday(self, contact):
+        """Same name and birthday stored or imported by this run"""
+        norm = DuplicateChecker.normalize_contact_data(contact)
+        if not (norm['FN'] and norm['BDAY']):
+            return False
+        if (norm['FN'], norm['BDAY']) in self.birthdays:
             return True
+        return self.contact_index is not None and bool(
+            self.contact_index.ids_by_name_bday(norm['FN'], norm['BDAY']))
 
-        return False
-
-    def _convert_event_to_contact(self, event_obj):
-        """Convert an ICS event to a contact/birthday"""
-        contact_data = {}
-
-        if hasattr(event_obj, 'title') and event_obj.title:
-            name = event_obj.title
-            for keyword in ['birthday', 'compleanno', "'s", "di"]:
-                if keyword.lower() in name.lower():
-                    name = name.lower().replace(keyword.lower(), '').strip().title()
-            contact_data['FN'] = name.strip()
-
-        if hasattr(event_obj, 'date') and event_obj.date:
-            contact_data['BDAY'] = event_obj.date
-
-        if hasattr(event_obj, 'description') and event_obj.description:
-            contact_data['NOTE'] = event_obj.description
+    def add_birthday(self, contact):
+        norm = DuplicateChecker.normalize_contact_data(contact)
+        if norm['FN'] and norm['BDAY']:
+            self.birthdays.add((norm['FN'], norm['BDAY']))
 
-        if hasattr(event_obj, 'labels') and event_obj.labels:
-            contact_data['CATEGORIES'] = ', '.join(event_obj.labels)
+    @staticmethod
+    def get_source_name(filepath):
+        """Calendar of an ICS file: X-WR-CALNAME, else the file name
 
-        return contact_data
+        Exports name every file alike (Google: basic.ics), so the file
+        name is only the fallback for files without a calendar name.
+        """
+        if not is_csv_file(filepath):
+            try:
+                calendar = read_calendar_name(filepath)
+                if calendar:
+                    return calendar
+            except Exception as e:
+                print("[ICSFileImporterThread] Error reading calendar name: {0}".format(e))
+        return ICSFileImporterThread.get_file_source_name(filepath)
+
+    @staticmethod
+    def get_file_source_name(filepath):
+        """Calendar name from the file name, without the archive timestamp"""
+        if filepath.endswith('.ics.gz'):
+            # Content addressed archive: name from the manifest
+            filepath = ics_manager.get_original_name(filepath)
+        name = splitext(basename(filepath))[0]
+        return sub(r'_\d{8}_\d{6}$', '', name)
 
-    def add_to_events_cache(self, event_obj):
-        """Adds an event to the cache"""
-        key = "{}|{}|{}".format(
-            event_obj.title,
-            event_obj.date,
-            event_obj.time)
-        self.existing_events_cache.add(key.lower())
+    def _is_birthday_event(self, event_obj):
+        """Determine if an ICS event is a birthday"""
+        return self.classifier.is_birthday(event_obj)
 
-    def add_to_contacts_cache(self, contact_data):
-        """Adds a contact to the cache"""
-        name = contact_data.get('FN', '').lower()
-        bday = contact_data.get('BDAY', '')
-        key = "{}|{}".format(name, bday)
-        self.existing_contacts_cache.add(key)
+    def _convert_event_to_contact(self, event_obj):
+        """Convert an ICS event to a contact/birthday"""
+        return self.classifier.to_contact(event_obj)
 
     def run(self):
         """Main thread execution"""
         try:
-            # Read file content
-            with open(self.filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            # PARSE AND IMPORT EVENTS
-            self.parse_and_import_events(content)
+            # PARSE AND IMPORT EVENTS (streamed, optional parser pool)
+            self.parse_and_import_events()
 
-            # SAVE ORIGINAL ICS FILE TO ARCHIVE
-            self.save_ics_to_archive(content)
+            # SAVE ORIGINAL ICS FILE TO ARCHIVE (CSV files are not archived)
+            if not self.cancelled:
+                if not is_csv_file(self.filepath):
+                    self.save_ics_to_archive()
+                self.checkpoint.clear()
 
             # Final callback
             self.callback(1.0, self.current, self.total_events,
@@ -445,185 +498,217 @@ class ICSFileImporterThread(threading.Thread):
             self.callback(1.0, self.current, self.total_events,
                           self.imported, self.skipped, self.errors, True)
 
-    def save_ics_to_archive(self, content):
-        """Save imported ICS file to archive directory"""
+    def get_counters(self):
+        """Counters stored in the checkpoint"""
+        return {
+            'current': self.current,
+            'imported': self.imported,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+    def commit_checkpoint(self):
+        """Save the events and checkpoint the current position"""
+        self.checkpoint.commit(
+            self.bytes_read, self.get_counters(), self.pipeline.flush)
+
+    def save_ics_to_archive(self):
+        """Save imported ICS file to the content addressed archive"""
         try:
-            # Generate filename with timestamp
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            original_name = basename(self.filepath)
-            name_without_ext = splitext(original_name)[0]
-            archive_name = "{}_{}.ics".format(name_without_ext, timestamp)
-            archive_path = join(ICS_BASE_PATH, archive_name)
-            with open(archive_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            archive_name = ics_manager.archive_file(self.filepath)
             if get_debug():
-                print("[ICSArchive] Saved to: {}".format(archive_path))
-            return True
+                print("[ICSArchive] Saved to: {}".format(archive_name))
+            return archive_name is not None
 
         except Exception as e:
             print("[ICSArchive] Error saving: {}".format(str(e)))
             return False
 
-    def parse_and_import_events(self, content):
-        """Parse .ics content and import events"""
-        if get_debug():
-            print("[DEBUG] Starting parse_and_import_events")
-            print("[DEBUG] Preloaded cache sizes: events={0}, contacts={1}".format(
-                len(self.existing_events_cache), len(self.existing_contacts_cache)))
+    def create_pipeline(self):
+        """Import pipeline: normalize, classify, dedup and commit stages"""
+        stages = [
+            PipelineStage('normalize', self.normalize_record),
+            PipelineStage('classify', self.classify_record),
+            PipelineStage('dedup', self.dedup_record, main_loop=True),
+            CommitStage('commit', self.commit_record, self.flush_events),
+        ]
+        if is_csv_file(self.filepath):
+            source = CSVSource(self.filepath, 'events',
+                               start_offset=self.start_offset)
+        else:
+            source = FileSource(self.filepath, 'vevent',
+                                start_offset=self.start_offset)
+        return ImportPipeline(source, stages, on_record=self.record_done)
+
+    def normalize_record(self, record):
+        """Tag the event with its calendar; unparsable blocks are errors"""
+        if record.data is None:
+            record.status = 'error'
+            if get_debug():
+                print("[DEBUG] Failed to parse event block")
+            return False
+        record.data.source = self.source
+        return True
 
-        vevent_blocks = split(r'BEGIN:VEVENT\s*', content, flags=IGNORECASE)
+    def classify_record(self, record):
+        """Birthday or plain event - the contact data is kept on the record"""
+        record.kind = self.classifier.classify(record.data)
+        if record.kind == 'birthday':
+            record.detail = self.classifier.to_contact(record.data)
+        return True
 
-        if get_debug():
-            print("[DEBUG] Found {} VEVENT blocks".format(len(vevent_blocks)))
+    def dedup_record(self, record):
+        """Skip events already stored (O(1) lookups)
 
-        for i, block in enumerate(vevent_blocks):
-            if self.cancelled:
-                break
+        A stored UID goes on to the commit stage when the file has a newer
+        revision (SEQUENCE / LAST-MODIFIED) or cancels it, like a sync.
+        """
+        event_obj = record.data
+        cancelled = event_obj.ics_status == 'CANCELLED'
+
+        if event_obj.uid:
+            if event_obj.uid in self.seen_uids:
+                # Recurrence overrides share the UID of the master event
+                record.status = 'skipped'
+                return False
+            self.seen_uids.add(event_obj.uid)
+            existing = self.by_uid.get(event_obj.uid)
+            if existing is not None:
+                if cancelled or needs_update(event_obj, existing):
+                    record.target = existing
+                    return True
+                record.status = 'skipped'
+                return False
+
+        if cancelled:
+            # Cancelled upstream and never imported
+            record.status = 'skipped'
+            return False
 
-            if not block.strip() or 'END:VEVENT' not in block.upper():
-                continue
+        if record.kind == 'birthday' and self.has_birthday(record.detail):
+            if get_debug():
+                print("[DEBUG] CONTACT duplicate (cache hit), skipping: {0}".format(
+                    record.detail.get('FN', 'Unknown')))
+            record.status = 'skipped'
+            return False
 
-            self.current += 1
+        if self.dedup.has_event(event_obj):
+            if get_debug():
+                print("[DEBUG] EVENT duplicate (cache hit), skipping: {0}".format(
+                    event_obj.title))
+            record.status = 'skipped'
+            return False
+        return True
+
+    def commit_record(self, record):
+        """Add, update or cancel the event; the commit stage saves in batches"""
+        if record.target is not None:
+            existing = record.target
+            if record.data.ics_status == 'CANCELLED':
+                # Dropped from the list on the next flush
+                self.cancelled_ids.add(id(existing))
+                del self.by_uid[existing.uid]
+            else:
+                update_event_from(existing, record.data)
+                self.dedup.add_event(existing)
+            self.event_manager.invalidate_event_index()
+            record.status = 'updated'
+            return True
 
-            # Update progress
-            progress = float(self.current) / \
-                self.total_events if self.total_events > 0 else 0
-            self.callback(progress, self.current, self.total_events,
-                          self.imported, self.skipped, self.errors, False)
+        self.event_manager.add_event(record.data, save=False)
+        self.dedup.add_event(record.data)
+        if record.detail:
+            self.add_birthday(record.detail)
+        record.status = 'imported'
+        return True
+
+    def flush_events(self):
+        """Remove the events cancelled upstream and save the batch"""
+        if self.cancelled_ids:
+            self.event_manager.events = [
+                event for event in self.event_manager.events
+                if id(event) not in self.cancelled_ids]
+            self.cancelled_ids.clear()
+        self.event_manager.save_events()
 
-            if get_debug():
-                print("[DEBUG] Processing block {}".format(i))
+    def record_done(self, record):
+        """Count a record, report progress and checkpoint"""
+        if self.cancelled:
+            self.pipeline.cancel()
+
+        self.current += 1
+        self.total_events = max(self.total_events, self.current)
+        if record.status == 'imported':
+            self.imported += 1
+        elif record.status == 'updated':
+            self.updated += 1
+        elif record.status == 'skipped':
+            self.skipped += 1
+        else:
+            self.errors += 1
 
-            try:
-                event_obj = self.parse_vevent_block(block)
-                if event_obj:
-                    if get_debug():
-                        print("[DEBUG] Event object created")
-                        print(
-                            "[DEBUG] Event title: {0}".format(
-                                event_obj.title))
-                        print("[DEBUG] Event date: {0}".format(event_obj.date))
-
-                    # QUICK DUPLICATE CHECK WITH CACHE
-                    is_duplicate = False
-
-                    # 1. Check if it's a birthday/contact
-                    if self._is_birthday_event(event_obj):
-                        # Convert to contact format
-                        contact_data = self._convert_event_to_contact(
-                            event_obj)
-
-                        # Cache duplicate check O(1)
-                        if self._is_contact_duplicate(contact_data):
-                            if get_debug():
-                                print(
-                                    "[DEBUG] CONTACT duplicate (cache hit), skipping: {0}".format(
-                                        contact_data.get(
-                                            'FN', 'Unknown')))
-                            self.skipped += 1
-                            is_duplicate = True
-                            continue
-
-                    # 2. Check if it's a duplicate event
-                    if not is_duplicate:
-                        # Cache duplicate check O(1)
-                        if self._is_event_duplicate(event_obj):
-                            if get_debug():
-                                print(
-                                    "[DEBUG] EVENT duplicate (cache hit), skipping: {0}".format(
-                                        event_obj.title))
-                            self.skipped += 1
-                            continue
-
-                    # IF NOT DUPLICATE, ADD THE EVENT
-                    try:
-                        # Add event
-                        event_id = self.event_manager.add_event(event_obj)
-
-                        # Update cache
-                        self.add_to_events_cache(event_obj)
-
-                        # If it's a birthday, also update contacts cache
-                        if self._is_birthday_event(event_obj):
-                            contact_data = self._convert_event_to_contact(
-                                event_obj)
-                            self.add_to_contacts_cache(contact_data)
-
-                        self.imported += 1
-                        if get_debug():
-                            print(
-                                "[DEBUG] Event added with ID: {0}".format(event_id))
-
-                    except Exception as e:
-                        if get_debug():
-                            print(
-                                "[DEBUG] add_event failed: {0}".format(
-                                    str(e)))
-
-                        # Fallback: add directly
-                        self.event_manager.events.append(event_obj)
-                        self.add_to_events_cache(event_obj)
-                        self.imported += 1
+        # Commit the events processed so far
+        self.bytes_read = record.bytes_read
+        if self.checkpoint.record_done():
+            self.commit_checkpoint()
 
-                else:
-                    self.errors += 1
-                    if get_debug():
-                        print("[DEBUG] Failed to parse event block")
+        progress = float(record.bytes_read) / record.file_size if record.file_size > 0 else 0
+        self.callback(progress, self.current, self.total_events,
+                      self.imported, self.skipped, self.errors, False)
 
-            except Exception as e:
-                print(
-                    "[ICSFileImporterThread] Error parsing event #{}: {}".format(
-                        self.current, str(e)))
-                self.errors += 1
+    def parse_and_import_events(self):
+        """Parse the .ics file and import events"""
+        if get_debug():
+            print("[DEBUG] Starting parse_and_import_events")
 
-        # Save all events at the end
-        self.event_manager.save_events()
+        self.pipeline = self.create_pipeline()
+        self.pipeline.run()
+
+        if self.cancelled:
+            # Save and remember the position, resumable later
+            self.commit_checkpoint()
         if get_debug():
             print(
-                "[DEBUG] Final save: {0} events imported, {1} skipped".format(
-                    self.imported, self.skipped))
+                "[DEBUG] Final save: {0} events imported, {1} updated, {2} skipped".format(
+                    self.imported, self.updated, self.skipped))
+            print("[DEBUG] Classifier rules: {0}".format(self.classifier.hits))
 
-    def parse_vevent_block(self, block):
+    @staticmethod
+    def parse_vevent_block(block):
         """Parse a single VEVENT block into event data"""
-        title = ''
-        description = ''
+        lines = block.splitlines()
+        if not block.lstrip().upper().startswith('BEGIN:VEVENT'):
+            lines.insert(0, 'BEGIN:VEVENT')
+        for component in iter_components(lines):
+            return ICSFileImporterThread.event_from_component(component)
+        return None
+
+    @staticmethod
+    def event_from_component(component):
+        """Create an Event from a parsed VEVENT component"""
+        title = component.get('SUMMARY').strip()
+        description = component.get('DESCRIPTION').strip()
         date_str = ''
         time_str = get_default_event_time()
         repeat = 'none'  # Default
-        location = ''
-
-        lines = block.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.upper() == 'END:VEVENT':
-                break
-
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().upper()
-                value = value.strip()
-
-                if key.startswith('SUMMARY'):
-                    title = value
-                elif key.startswith('DTSTART'):
-                    date_time = self.parse_ical_datetime(value)
-                    if date_time:
-                        date_str = date_time['date']
-                        time_str = date_time['time']
-                elif key.startswith('DESCRIPTION'):
-                    description = value
-                elif key.startswith('LOCATION'):
-                    location = value.replace('\\n', '\n').replace('\\,', ',')
-                elif key.startswith('RRULE'):
-                    if 'FREQ=YEARLY' in value.upper():
-                        repeat = 'yearly'
-                    elif 'FREQ=MONTHLY' in value.upper():
-                        repeat = 'monthly'
-                    elif 'FREQ=WEEKLY' in value.upper():
-                        repeat = 'weekly'
-                    elif 'FREQ=DAILY' in value.upper():
-                        repeat = 'daily'
+        location = component.get('LOCATION').strip()
+
+        date_time = ICSFileImporterThread.parse_ical_datetime(
+            component.get('DTSTART').strip())
+        if date_time:
+            date_str = date_time['date']
+            time_str = date_time['time']
+
+        rrule = component.get('RRULE').upper()
+        if 'FREQ=YEARLY' in rrule:
+            repeat = 'yearly'
+        elif 'FREQ=MONTHLY' in rrule:
+            repeat = 'monthly'
+        elif 'FREQ=WEEKLY' in rrule:
+            repeat = 'weekly'
+        elif 'FREQ=DAILY' in rrule:
+            repeat = 'daily'
 
         # Validate required fields
         if not title or not date_str:
@@ -660,6 +745,17 @@ class ICSFileImporterThread(threading.Thread):
                 event.labels.append('birthday')
             event.labels.append('google-calendar')
 
+            # iCalendar identity for incremental re-import
+            event.uid = component.get('UID').strip()
+            try:
+                event.sequence = int(component.get('SEQUENCE', '0').strip())
+            except ValueError:
+                event.sequence = 0
+            event.last_modified = (component.get('LAST-MODIFIED') or
+                                   component.get('DTSTAMP')).strip()
+            # Not persisted: only used to skip/remove cancelled events
+            event.ics_status = component.get('STATUS').strip().upper()
+
             return event
 
         except Exception as e:
@@ -668,7 +764,8 @@ class ICSFileImporterThread(threading.Thread):
                     str(e)))
             return None
 
-    def parse_ical_datetime(self, dt_string):
+    @staticmethod
+    def parse_ical_datetime(dt_string):
         """Parse iCalendar date-time string"""
         try:
             # Google Calendar birthdays: DTSTART;VALUE=DATE:19820414
@@ -753,44 +850,40 @@ class ICSFileImporterThread(threading.Thread):
 
 
 class ICSConverter:
-    """Convert ICS files to daily text files"""
+    """Convert ICS files to the monthly bucket store"""
 
     def __init__(self, language="it"):
         self.language = language
-        self.ics_base_path = join(ICS_BASE_PATH, language, "day")
         self.raw_ics_path = ICS_BASE_PATH  # join(PLUGIN_PATH, "base/ics")
+        self.store = ICSMonthStore(language)
 
-        for path in (self.raw_ics_path, self.ics_base_path):
-            if not exists(path):
-                try:
-                    makedirs(path)
-                except OSError:
-                    # può essere stato creato da un altro processo
-                    if not exists(path):
-                        raise
+        if not exists(self.raw_ics_path):
+            try:
+                makedirs(self.raw_ics_path)
+            except OSError:
+                # può essere stato creato da un altro processo
+                if not exists(self.raw_ics_path):
+                    raise
 
     def convert_ics_to_daily_files(self, ics_filepath):
-        """Convert a single ICS file into daily TXT files"""
+        """Convert a single ICS file into daily entries of the month buckets"""
         try:
-            with open(ics_filepath, 'r') as f:
-                content = f.read()
-
-            # Parse events from the ICS file
-            events = self.parse_ics_content(content)
-
-            # Group events by date
-            events_by_date = {}
-            for event in events:
-                date_key = event['date']  # Format: YYYY-MM-DD
-                if date_key not in events_by_date:
-                    events_by_date[date_key] = []
-                events_by_date[date_key].append(event)
-
-            # Create a file for each date
-            for date_str, date_events in events_by_date.items():
-                self.create_daily_file(date_str, date_events)
-
-            return len(events)
+            # Stream events from the ICS file, grouped by date
+            entries_by_date = {}
+            count = 0
+            for component, _bytes_read, _size in iter_ics_file(ics_filepath):
+                event = self.format_event(component)
+                if event:
+                    date_key = event['date'].replace('-', '')  # YYYYMMDD
+                    if date_key not in entries_by_date:
+                        entries_by_date[date_key] = []
+                    entries_by_date[date_key].append(self.format_entry(event))
+                    count += 1
+
+            # One read/merge/write per month
+            self.store.merge_entries(entries_by_date)
+
+            return count
 
         except Exception as e:
             print("[ICSConverter] Error:", str(e))
@@ -798,44 +891,19 @@ class ICSConverter:
 
     def parse_ics_content(self, content):
         """Parse ICS content to extract events"""
-        events = []
-        lines = content.split('\n')
-
-        in_event = False
-        current_event = {}
-
-        for line in lines:
-            line = line.strip()
-
-            if line == 'BEGIN:VEVENT':
-                in_event = True
-                current_event = {}
-            elif line == 'END:VEVENT':
-                in_event = False
-                if current_event:
-                    events.append(current_event)
-            elif in_event and ':' in line:
-                key, value = line.split(':', 1)
-                current_event[key] = value
-
-        # Convert to standard format
         formatted_events = []
-        for event in events:
-            formatted = self.format_event(event)
+        for component in iter_ics_text(content):
+            formatted = self.format_event(component)
             if formatted:
                 formatted_events.append(formatted)
 
         return formatted_events
 
-    def format_event(self, event):
-        """Format event for daily file"""
+    def format_event(self, component):
+        """Format a VEVENT component for daily file"""
         try:
-            # Extract data from DTSTART
-            dtstart = event.get('DTSTART', '')
-            if 'VALUE=DATE:' in dtstart:
-                date_str = dtstart.split('VALUE=DATE:')[1]
-            else:
-                date_str = dtstart.split(':')[1] if ':' in dtstart else dtstart
+            # Extract date from DTSTART (YYYYMMDD or YYYYMMDDTHHMMSS)
+            date_str = component.get('DTSTART').strip()[:8]
 
             if len(date_str) == 8 and date_str.isdigit():
                 # Convert YYYYMMDD → YYYY-MM-DD
@@ -844,41 +912,28 @@ class ICSConverter:
             else:
                 return None
 
-            # Extract title
-            title = event.get('SUMMARY', 'Event')
-            description = event.get('DESCRIPTION', '')
+            # Extract title - daily files are "title|description|type" lines
+            title = component.get('SUMMARY', 'Event')
+            description = component.get('DESCRIPTION')
 
             return {
                 'date': date_formatted,
-                'title': title,
-                'description': description,
+                'title': ' '.join(title.split()).replace('|', '/'),
+                'description': ' '.join(description.split()).replace('|', '/'),
                 'type': 'birthday'  # Or 'event' depending on the content
             }
 
         except BaseException:
             return None
 
-    def create_daily_file(self, date_str, events):
-        """Create daily txt file for a specific date"""
-        # Convert YYYY-MM-DD → YYYYMMDD
-        yyyymmdd = date_str.replace('-', '')
-        filepath = join(self.ics_base_path, "%s.txt" % yyyymmdd)
-
-        lines = []
-        for event in events:
-            # Format: Title|Description|Type
-            line = "{0}|{1}|{2}".format(
-                event['title'],
-                event['description'],
-                event.get('type', 'event')
-            )
-            lines.append(line)
-
-        with open(filepath, 'w') as f:
-            f.write('\n'.join(lines))
-
-        if get_debug():
-            print("[ICSConverter] Created: %s" % filepath)
+    @staticmethod
+    def format_entry(event):
+        """Daily entry line - Format: Title|Description|Type"""
+        return "{0}|{1}|{2}".format(
+            event['title'],
+            event['description'],
+            event.get('type', 'event')
+        )
 
 
 class ICSImportProgressScreen(Screen):
@@ -907,16 +962,19 @@ class ICSImportProgressScreen(Screen):
         </screen>
         """
 
-    def __init__(self, session, event_manager, filepath, total_events):
+    def __init__(self, session, event_manager, filepath, total_events,
+                 resume=False):
         Screen.__init__(self, session)
         self.event_manager = event_manager
         self.filepath = filepath
         self.total_events = total_events
+        self.resume = resume
         self.imported = 0
         self.skipped = 0
         self.errors = 0
         self.current = 0
         self.import_thread = None
+        self.channel = None
         self.last_update = time.time()
         self["title"] = Label(_("Importing iCalendar File"))
         self["filename"] = Label(basename(filepath))
@@ -991,13 +1049,18 @@ class ICSImportProgressScreen(Screen):
                     self.import_completed(imported, skipped, errors)
             except Exception as e:
                 print("[ICSImportProgress] GUI update error: {0}".format(e))
-        # Create and start importer
+        # Create and start importer - the worker posts into the channel,
+        # widgets are only updated on the main loop
+        self.channel = ProgressChannel(progress_callback)
         self.importer = ICSFileImporterThread(
             self.event_manager,
             self.filepath,
             self.total_events,
-            progress_callback
+            self.channel.report,
+            resume=self.resume
         )
+        self.import_thread = self.importer
+        self.channel.start()
 
         if not self.importer.start():
             self.session.open(
@@ -1114,6 +1177,9 @@ class ICSImportProgressScreen(Screen):
 
     def close(self, result=None):
         """Close screen"""
+        if self.channel:
+            self.channel.stop()
+
         # Ensure thread is stopped
         if self.import_thread and self.import_thread.is_alive():
             self.import_thread.cancelled = True
@@ -13,47 +13,397 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 ###########################################################
 """
 from __future__ import print_function
+import gzip
+import hashlib
+import io
 import os
+import tempfile
 import time
 import glob
 from datetime import datetime
+from json import dump, load
 from os.path import exists, join, getsize, getmtime, basename
 
+from .config_manager import get_debug
+from .event_classifier import BIRTHDAY_KEYWORDS, compile_keywords
 from .formatters import ICS_BASE_PATH
+from .ics_parser import (
+    escape_text,
+    iter_ics_file,
+    open_ics_binary,
+    parse_content_line,
+    unescape_text,
+    unfold_raw_lines,
+)
+
+ARCHIVE_SUFFIX = ".ics.gz"
+MANIFEST_NAME = "archive.json"
+PARSED_DIR = "parsed"
+PARSED_SUFFIX = ".events.gz"
+RECORD_MARK = "\x1e"    # starts the header line of a cached VEVENT
+BIRTHDAY_MATCH = compile_keywords(BIRTHDAY_KEYWORDS)
+
+
+def scan_ics_lines(lines):
+    """Catalog data of an ICS stream (raw bytes lines) in one pass
+
+    Returns a dict with events, birthdays, date_min, date_max (YYYYMMDD)
+    and calendar (X-WR-CALNAME). Only the current line is kept in memory.
+    """
+    info = {
+        'events': 0,
+        'birthdays': 0,
+        'date_min': '',
+        'date_max': '',
+        'calendar': '',
+    }
+    in_event = False
+    nested = 0
+
+    for line in unfold_raw_lines(lines):
+        upper = line[:16].upper()
+
+        if not in_event:
+            if upper.startswith('BEGIN:VEVENT'):
+                in_event = True
+                nested = 0
+                info['events'] += 1
+            elif upper.startswith('X-WR-CALNAME') and not info['calendar']:
+                parsed = parse_content_line(line)
+                if parsed:
+                    info['calendar'] = parsed[2].strip()
+            continue
+
+        if upper.startswith('BEGIN:'):
+            nested += 1
+        elif upper.startswith('END:'):
+            if nested == 0:
+                in_event = False
+            else:
+                nested -= 1
+        elif nested == 0 and upper.startswith(('SUMMARY', 'DTSTART')):
+            parsed = parse_content_line(line)
+            if not parsed:
+                continue
+            name, _params, value = parsed
+            if name == 'SUMMARY':
+                summary = value.lower()
+                if BIRTHDAY_MATCH.search(summary):
+                    info['birthdays'] += 1
+            elif name == 'DTSTART':
+                value = value.strip()[:8]
+                if len(value) == 8 and value.isdigit():
+                    if not info['date_min'] or value < info['date_min']:
+                        info['date_min'] = value
+                    if value > info['date_max']:
+                        info['date_max'] = value
+
+    return info
 
 
 class ICSManager:
-    """Manage imported ICS files"""
+    """Manage imported ICS files
+
+    Imported files are archived once per content: the name is the SHA-1 of
+    the data (<sha1>.ics.gz, gzip-compressed). archive.json is the catalog
+    of the archive: original name, import times, size, mtime, event and
+    birthday count, DTSTART range and calendar name of every file, so the
+    browser and statistics never have to read the files. Plain .ics files
+    from older versions are cataloged the first time they are listed.
+
+    For exports every archive also gets a parsed cache (parsed/<key>.events.gz,
+    key = SHA-1 of path, size and mtime): one header line per VEVENT with
+    its date and escaped SUMMARY, followed by the unfolded content lines.
+    Unchanged archives are streamed from the cache without parsing.
+    """
 
     def __init__(self):
         self.base_path = ICS_BASE_PATH
+        self.manifest_path = join(self.base_path, MANIFEST_NAME)
+        self.parsed_path = join(self.base_path, PARSED_DIR)
 
-    def get_imported_ics_files(self):
-        """Get list of all imported ICS files"""
-        ics_files = []
+    def load_manifest(self):
+        """Load archive catalog (filename -> info)"""
+        if not exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return load(f)
+        except Exception as e:
+            print("[ICSManager] Error reading manifest: %s" % str(e))
+            return {}
+
+    def save_manifest(self, manifest):
+        """Save archive catalog atomically"""
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                dump(manifest, f, indent=2)
+            os.rename(temp_path, self.manifest_path)
+            return True
+        except Exception as e:
+            print("[ICSManager] Error saving manifest: %s" % str(e))
+            return False
+
+    def scan_file(self, filepath):
+        """Catalog data of an archived or plain ICS file"""
+        with open_ics_binary(filepath) as f:
+            info = scan_ics_lines(f)
+        info['stored_size'] = getsize(filepath)
+        info['mtime'] = getmtime(filepath)
+        return info
+
+    def archive_file(self, filepath):
+        """Archive an ICS file by content hash - returns the archive filename
+
+        One streaming pass hashes, compresses and catalogs the file.
+        Identical content already archived costs no extra space: only the
+        import time in the catalog is updated.
+        """
+        if not exists(self.base_path):
+            os.makedirs(self.base_path)
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Unique per call: imports running at the same time do not share it
+        fd, temp_path = tempfile.mkstemp(
+            prefix="archive_", suffix=".tmp", dir=self.base_path)
+        os.close(fd)
+        sha1 = hashlib.sha1()
+        sizes = [0]
+
+        def copy_lines(src, dst):
+            for raw_line in src:
+                sha1.update(raw_line)
+                dst.write(raw_line)
+                sizes[0] += len(raw_line)
+                yield raw_line
+
+        try:
+            with open(filepath, 'rb') as src:
+                with gzip.open(temp_path, 'wb') as dst:
+                    info = scan_ics_lines(copy_lines(src, dst))
+
+            filename = sha1.hexdigest() + ARCHIVE_SUFFIX
+            archive_path = join(self.base_path, filename)
+            manifest = self.load_manifest()
+
+            if exists(archive_path) and filename in manifest:
+                os.remove(temp_path)
+                if get_debug():
+                    print("[ICSManager] Already archived: %s" % filename)
+            else:
+                # mkstemp creates the file readable by the owner only
+                os.chmod(temp_path, 0o644)
+                os.rename(temp_path, archive_path)
+                info.update({
+                    'imported': now,
+                    'size': sizes[0],
+                    'stored_size': getsize(archive_path),
+                    'mtime': getmtime(archive_path),
+                })
+                manifest[filename] = info
+                if get_debug():
+                    print("[ICSManager] Archived %s as %s" % (
+                        basename(filepath), filename))
+
+            manifest[filename]['last_imported'] = now
+            manifest[filename]['original_name'] = basename(filepath)
+            self.save_manifest(manifest)
+            return filename
 
-        # Search for .ics files in base/ics directory
-        pattern = join(self.base_path, "*.ics")
-        files = glob.glob(pattern)
+        except Exception as e:
+            print("[ICSManager] Error archiving %s: %s" % (filepath, str(e)))
+            if exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def get_original_name(self, filename):
+        """Original file name of an archive entry"""
+        info = self.load_manifest().get(basename(filename))
+        if info:
+            return info.get('original_name', filename)
+        return basename(filename)
+
+    def open_ics(self, filename):
+        """Open an archived file as a text stream (decompressed on the fly)"""
+        filepath = join(self.base_path, filename)
+        if filename.endswith('.gz'):
+            return io.TextIOWrapper(
+                gzip.open(filepath, 'rb'), encoding='utf-8', errors='ignore')
+        return open(filepath, 'r', encoding='utf-8', errors='ignore')
+
+    def get_catalog(self):
+        """Catalog entries of all archived files, refreshed by mtime
+
+        Files whose mtime differs from the catalog (or plain .ics files not
+        cataloged yet) are scanned once and the catalog is saved; all other
+        files cost a single stat.
+        """
+        manifest = self.load_manifest()
+        changed = False
+
+        filenames = set(manifest)
+        for filepath in glob.glob(join(self.base_path, "*.ics")):
+            filenames.add(basename(filepath))
 
-        for filepath in files:
+        for filename in filenames:
+            filepath = join(self.base_path, filename)
+            if not exists(filepath):
+                if manifest.pop(filename, None) is not None:
+                    changed = True
+                continue
+
+            info = manifest.get(filename)
             try:
-                if exists(filepath):
-                    filename = basename(filepath)
-                    size = getsize(filepath)
-                    modified = datetime.fromtimestamp(getmtime(filepath))
-
-                    ics_files.append({
-                        'filename': filename,
-                        'path': filepath,
-                        'size': size,
-                        'modified': modified
-                    })
+                if info is None or info.get('mtime') != getmtime(filepath):
+                    if get_debug():
+                        print("[ICSManager] Cataloging %s" % filename)
+                    scanned = self.scan_file(filepath)
+                    if info is None:
+                        # Legacy plain file: listed by its mtime
+                        info = {
+                            'original_name': filename,
+                            'size': scanned['stored_size'],
+                        }
+                    info.update(scanned)
+                    manifest[filename] = info
+                    changed = True
             except Exception as e:
                 print(
                     "[ICSManager] Error reading file %s: %s" %
                     (filepath, str(e)))
 
+        if changed:
+            self.save_manifest(manifest)
+        return manifest
+
+    def get_parsed_cache_path(self, filepath):
+        """Parsed cache file of an ICS file in its current version"""
+        stat = os.stat(filepath)
+        key = "%s|%d|%d" % (filepath, stat.st_size, int(stat.st_mtime))
+        return join(self.parsed_path,
+                    hashlib.sha1(key.encode('utf-8')).hexdigest() + PARSED_SUFFIX)
+
+    def read_parsed_cache(self, cache_path):
+        """Yield (title, YYYYMMDD, lines) from a parsed cache"""
+        header = None
+        lines = []
+        with io.TextIOWrapper(gzip.open(cache_path, 'rb'), encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if line.startswith(RECORD_MARK):
+                    if header is not None:
+                        yield header[1], header[0], lines
+                    header = line[1:].split('\t', 1)
+                    header[1] = unescape_text(header[1])
+                    lines = []
+                else:
+                    lines.append(line)
+        if header is not None:
+            yield header[1], header[0], lines
+
+    def build_parsed_cache(self, filepath, cache_path):
+        """Parse an ICS file, yielding (title, YYYYMMDD, lines) and caching
+
+        The cache is only moved into place when the whole file was read.
+        """
+        if not exists(self.parsed_path):
+            os.makedirs(self.parsed_path)
+        temp_path = cache_path + ".tmp"
+        complete = False
+        try:
+            with io.TextIOWrapper(gzip.open(temp_path, 'wb'), encoding='utf-8') as f:
+                for component, _bytes_read, _size in iter_ics_file(filepath):
+                    title = component.get('SUMMARY').strip()
+                    date_str = component.get('DTSTART').strip()[:8]
+                    if not title or len(date_str) != 8:
+                        continue
+                    f.write(RECORD_MARK + date_str + "\t" + escape_text(title) + "\n")
+                    for line in component.lines:
+                        f.write(line + "\n")
+                    yield title, date_str, component.lines
+            complete = True
+        finally:
+            if complete:
+                os.rename(temp_path, cache_path)
+            elif exists(temp_path):
+                os.remove(temp_path)
+        if get_debug():
+            print("[ICSManager] Parsed cache built for %s" % basename(filepath))
+
+    def iter_archive_events(self, filepaths):
+        """Yield (title, YYYYMMDD, lines) of the VEVENTs of ICS files
+
+        Files are read from their parsed cache, only new or changed files
+        are parsed. At the end only the caches of archives that are gone
+        (or changed since) are removed: a scoped call keeps the caches of
+        the archives it did not read.
+        """
+        valid = set()
+        for filepath in filepaths:
+            try:
+                cache_path = self.get_parsed_cache_path(filepath)
+                valid.add(basename(cache_path))
+                if exists(cache_path):
+                    events = self.read_parsed_cache(cache_path)
+                else:
+                    events = self.build_parsed_cache(filepath, cache_path)
+                for event in events:
+                    yield event
+            except Exception as e:
+                print("[ICSManager] Error reading events of %s: %s" % (
+                    basename(filepath), str(e)))
+        valid.update(self.get_archive_cache_names())
+        self.prune_parsed_cache(valid)
+
+    def get_archive_cache_names(self):
+        """Parsed cache names of the archived files in their current version"""
+        filenames = set(self.load_manifest())
+        for filepath in glob.glob(join(self.base_path, "*.ics")):
+            filenames.add(basename(filepath))
+        names = set()
+        for filename in filenames:
+            filepath = join(self.base_path, filename)
+            if exists(filepath):
+                names.add(basename(self.get_parsed_cache_path(filepath)))
+        return names
+
+    def prune_parsed_cache(self, keep=()):
+        """Remove parsed caches not in keep (file names)"""
+        if not exists(self.parsed_path):
+            return
+        for filename in os.listdir(self.parsed_path):
+            if filename not in keep:
+                try:
+                    os.remove(join(self.parsed_path, filename))
+                except OSError as e:
+                    print("[ICSManager] Error removing cache %s: %s" % (
+                        filename, str(e)))
+
+    def get_imported_ics_files(self):
+        """Get list of all imported ICS files"""
+        ics_files = []
+
+        for filename, info in self.get_catalog().items():
+            try:
+                modified = datetime.strptime(
+                    info.get('last_imported') or info.get('imported'),
+                    "%Y-%m-%d %H:%M:%S")
+            except (TypeError, ValueError):
+                modified = datetime.fromtimestamp(info.get('mtime', 0))
+            ics_files.append({
+                'filename': filename,
+                'name': info.get('original_name', filename),
+                'path': join(self.base_path, filename),
+                'size': info.get('stored_size', 0),
+                'modified': modified,
+                'events': info.get('events', 0),
+                'birthdays': info.get('birthdays', 0),
+                'date_min': info.get('date_min', ''),
+                'date_max': info.get('date_max', ''),
+                'calendar': info.get('calendar', ''),
+            })
+
         # Sort by modification date (newest first)
         ics_files.sort(key=lambda x: x['modified'], reverse=True)
         return ics_files
@@ -65,7 +415,7 @@ class ICSManager:
             return None
 
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            with self.open_ics(filename) as f:
                 return f.read()
         except BaseException:
             # Fallback to latin-1
@@ -82,6 +432,9 @@ class ICSManager:
         if exists(filepath):
             try:
                 os.remove(filepath)
+                manifest = self.load_manifest()
+                if manifest.pop(filename, None) is not None:
+                    self.save_manifest(manifest)
                 return True
             except Exception as e:
                 print(
@@ -116,9 +469,11 @@ class ICSManager:
                 'total_files': len(files),
                 'total_size_kb': round(total_size, 1),
                 'total_size_mb': round(total_size / 1024, 2),
-                'oldest_file': oldest['filename'],
+                'total_events': sum(f['events'] for f in files),
+                'total_birthdays': sum(f['birthdays'] for f in files),
+                'oldest_file': oldest['name'],
                 'oldest_date': oldest['modified'].strftime("%Y-%m-%d"),
-                'newest_file': newest['filename'],
+                'newest_file': newest['name'],
                 'newest_date': newest['modified'].strftime("%Y-%m-%d")
             }
         else:
@@ -126,6 +481,8 @@ class ICSManager:
                 'total_files': 0,
                 'total_size_kb': 0,
                 'total_size_mb': 0,
+                'total_events': 0,
+                'total_birthdays': 0,
                 'oldest_file': None,
                 'oldest_date': None,
                 'newest_file': None,
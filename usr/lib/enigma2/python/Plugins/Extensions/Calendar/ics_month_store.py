@@ -0,0 +1,262 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Monthly bucket store for the ICS database (ics/<lang>/month/YYYYMM.txt).
+
+Each bucket starts with an index line
+
+    #INDEX DD:offset:length DD:offset:length ...
+
+(byte offsets into the body after the index line), followed by one section
+per day: a "[YYYYMMDD]" header and the day lines. A day holds the calendar
+record saved from the main screen (a VCALENDAR block) and the entries of
+imported calendars ("title|description|type" lines). Imports are merged
+into a day by title and type instead of replacing it.
+
+The old layout with one ics/<lang>/day/YYYYMMDD.txt per date is migrated
+into buckets the first time the store is used.
+"""
+from __future__ import print_function
+import os
+import glob
+from os.path import basename, exists, join
+
+from .config_manager import get_debug
+from .formatters import ICS_BASE_PATH
+
+INDEX_PREFIX = b"#INDEX"
+
+
+def split_day(lines):
+    """Split day lines into (record lines, imported entries)"""
+    record = []
+    entries = []
+    in_record = False
+    for line in lines:
+        if line == "BEGIN:VCALENDAR":
+            in_record = True
+        if in_record:
+            record.append(line)
+            if line == "END:VCALENDAR":
+                in_record = False
+        elif line.strip():
+            entries.append(line)
+    return record, entries
+
+
+def entry_key(entry):
+    """Merge key of an imported entry: title and type"""
+    fields = entry.split('|')
+    return "{0}|{1}".format(fields[0].strip(), fields[-1].strip()).lower()
+
+
+class ICSMonthStore:
+    """Read and write the ICS database by month"""
+
+    def __init__(self, language):
+        self.language = language
+        self.month_path = join(ICS_BASE_PATH, language, "month")
+        self.day_path = join(ICS_BASE_PATH, language, "day")
+        self.migrated = False
+
+    def get_month_file(self, year, month):
+        return join(self.month_path, "%04d%02d.txt" % (int(year), int(month)))
+
+    @staticmethod
+    def parse_index(line):
+        """Index line -> {day: (offset, length)}"""
+        index = {}
+        for item in line[len(INDEX_PREFIX):].split():
+            day, offset, length = item.split(b':')
+            index[int(day)] = (int(offset), int(length))
+        return index
+
+    def read_index(self, f):
+        """Index of an open bucket and the byte position of its body"""
+        line = f.readline()
+        if not line.startswith(INDEX_PREFIX):
+            return {}, 0
+        return self.parse_index(line), len(line)
+
+    def get_days(self, year, month):
+        """Days of the month with data - reads the index line only"""
+        self.migrate_day_files()
+        filepath = self.get_month_file(year, month)
+        if not exists(filepath):
+            return []
+        try:
+            with open(filepath, 'rb') as f:
+                index, _body_start = self.read_index(f)
+            return sorted(index)
+        except Exception as e:
+            print("[ICSMonthStore] Error reading index {0}: {1}".format(
+                filepath, e))
+            return []
+
+    def get_day(self, year, month, day):
+        """Lines stored for one day (seek through the index)"""
+        self.migrate_day_files()
+        filepath = self.get_month_file(year, month)
+        if not exists(filepath):
+            return []
+        try:
+            with open(filepath, 'rb') as f:
+                index, body_start = self.read_index(f)
+                if int(day) not in index:
+                    return []
+                offset, length = index[int(day)]
+                f.seek(body_start + offset)
+                data = f.read(length)
+            return data.decode('utf-8', 'ignore').splitlines()
+        except Exception as e:
+            print("[ICSMonthStore] Error reading {0}: {1}".format(filepath, e))
+            return []
+
+    def read_month(self, year, month):
+        """All days of a bucket: {day: [lines]}"""
+        filepath = self.get_month_file(year, month)
+        days = {}
+        if not exists(filepath):
+            return days
+        with open(filepath, 'rb') as f:
+            index, _body_start = self.read_index(f)
+            body = f.read()
+        for day, (offset, length) in index.items():
+            days[day] = body[offset:offset + length].decode(
+                'utf-8', 'ignore').splitlines()
+        return days
+
+    def write_month(self, year, month, days):
+        """Write a bucket atomically; an empty month removes the file"""
+        filepath = self.get_month_file(year, month)
+        days = dict((day, lines) for day, lines in days.items() if lines)
+        if not days:
+            if exists(filepath):
+                os.remove(filepath)
+            return
+
+        if not exists(self.month_path):
+            os.makedirs(self.month_path)
+
+        body = []
+        index = []
+        position = 0
+        for day in sorted(days):
+            header = ("[%04d%02d%02d]\n" % (int(year), int(month), day)).encode('utf-8')
+            data = ("\n".join(days[day]) + "\n").encode('utf-8')
+            body.append(header)
+            body.append(data)
+            position += len(header)
+            index.append("%02d:%d:%d" % (day, position, len(data)))
+            position += len(data)
+
+        temp_path = filepath + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(INDEX_PREFIX + (" " + " ".join(index) + "\n").encode('ascii'))
+            f.write(b''.join(body))
+        os.rename(temp_path, filepath)
+
+    @staticmethod
+    def group_by_month(items):
+        """{'YYYYMMDD': value} -> {(year, month): {day: value}}"""
+        months = {}
+        for date_str, value in items.items():
+            if len(date_str) != 8 or not date_str.isdigit():
+                continue
+            key = (int(date_str[:4]), int(date_str[4:6]))
+            months.setdefault(key, {})[int(date_str[6:8])] = value
+        return months
+
+    def merge_entries(self, entries_by_date):
+        """Merge imported entries ({'YYYYMMDD': [lines]}) into the buckets
+
+        An entry with the same title and type as a stored one replaces it;
+        the day record and other entries are kept. Returns months written.
+        """
+        self.migrate_day_files()
+        written = 0
+        for (year, month), new_days in self.group_by_month(entries_by_date).items():
+            days = self.read_month(year, month)
+            for day, new_entries in new_days.items():
+                record, entries = split_day(days.get(day, []))
+                merged = {}
+                for entry in entries + new_entries:
+                    merged[entry_key(entry)] = entry
+                days[day] = record + list(merged.values())
+            self.write_month(year, month, days)
+            written += 1
+            if get_debug():
+                print("[ICSMonthStore] Merged %d days into %04d-%02d" % (
+                    len(new_days), year, month))
+        return written
+
+    def set_day_records(self, records):
+        """Replace the day records ({'YYYYMMDD': [lines]}), keep entries
+
+        An empty list removes the record of that day.
+        """
+        self.migrate_day_files()
+        for (year, month), new_days in self.group_by_month(records).items():
+            days = self.read_month(year, month)
+            for day, record in new_days.items():
+                _old_record, entries = split_day(days.get(day, []))
+                days[day] = list(record) + entries
+            self.write_month(year, month, days)
+
+    def iter_days(self):
+        """Yield ('YYYYMMDD', lines) for every stored day, month by month"""
+        self.migrate_day_files()
+        for filepath in sorted(glob.glob(join(self.month_path, "*.txt"))):
+            month_key = basename(filepath)[:6]
+            if not month_key.isdigit():
+                continue
+            days = self.read_month(int(month_key[:4]), int(month_key[4:]))
+            for day in sorted(days):
+                yield "%s%02d" % (month_key, day), days[day]
+
+    def set_day_record(self, year, month, day, lines):
+        """Replace the record of a single day"""
+        self.set_day_records(
+            {"%04d%02d%02d" % (int(year), int(month), int(day)): lines})
+
+    def migrate_day_files(self):
+        """Move ics/<lang>/day/YYYYMMDD.txt files into month buckets"""
+        if self.migrated:
+            return
+        self.migrated = True
+        if not exists(self.day_path):
+            return
+
+        day_files = {}
+        for filepath in glob.glob(join(self.day_path, "*.txt")):
+            filename = basename(filepath)
+            if len(filename) == 12 and filename[:8].isdigit():
+                day_files[filename[:8]] = filepath
+        if not day_files:
+            return
+
+        try:
+            for (year, month), files in self.group_by_month(day_files).items():
+                days = self.read_month(year, month)
+                for day, filepath in files.items():
+                    with open(filepath, 'r') as f:
+                        lines = f.read().splitlines()
+                    days[day] = days.get(day, []) + lines
+                self.write_month(year, month, days)
+                for filepath in files.values():
+                    os.remove(filepath)
+            print("[ICSMonthStore] Migrated %d day files to month buckets" %
+                  len(day_files))
+        except Exception as e:
+            print("[ICSMonthStore] Error migrating day files: {0}".format(e))
@@ -0,0 +1,295 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Streaming iCalendar (RFC 5545) reader shared by the ICS importer, converter,
+browser statistics and exporter.
+
+Lines are unfolded, property parameters parsed and TEXT values unescaped.
+Components are yielded one at a time, so memory is bounded by the largest
+component and not by the file.
+"""
+from __future__ import print_function
+import gzip
+import re
+from os.path import getsize
+from struct import unpack
+
+DEFAULT_COMPONENTS = ('VEVENT',)
+
+# Line break followed by the space/tab of a continuation line
+_FOLD = re.compile(b'\r?\n[ \t]')
+
+
+def open_ics_binary(filepath):
+    """Open a plain or gzip-compressed (.gz) ICS file for binary reading"""
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, 'rb')
+    return open(filepath, 'rb')
+
+
+def get_content_size(filepath):
+    """Uncompressed size of an ICS file (gzip ISIZE trailer for .gz)"""
+    if not filepath.endswith('.gz'):
+        return getsize(filepath)
+    with open(filepath, 'rb') as f:
+        f.seek(-4, 2)
+        return unpack('<I', f.read(4))[0]
+
+
+def unfold_lines(lines):
+    """Join folded lines (leading space/tab) into logical content lines"""
+    for line, _position in _iter_logical_lines((line, None) for line in lines):
+        yield line
+
+
+def unfold_raw_lines(raw_lines):
+    """Join folded raw (bytes) lines, then decode each logical line
+
+    Lines are folded at 75 octets, which can split a multi-byte UTF-8
+    character: decoding the physical lines would drop it.
+    """
+    for line, _position in _iter_raw_logical_lines(
+            (raw_line, None) for raw_line in raw_lines):
+        yield line
+
+
+def unfold_bytes(data):
+    """Unfold a block of raw bytes before it is decoded"""
+    return _FOLD.sub(b'', data)
+
+
+def unescape_text(value):
+    """Unescape an RFC 5545 TEXT value (\\n, \\, \\; and \\\\)"""
+    if '\\' not in value:
+        return value
+    result = []
+    i = 0
+    length = len(value)
+    while i < length:
+        char = value[i]
+        if char == '\\' and i + 1 < length:
+            following = value[i + 1]
+            if following in 'nN':
+                result.append('\n')
+            elif following in ',;\\':
+                result.append(following)
+            else:
+                result.append(char + following)
+            i += 2
+            continue
+        result.append(char)
+        i += 1
+    return ''.join(result)
+
+
+def escape_text(value):
+    """Escape text for an RFC 5545 TEXT value"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def parse_content_line(line):
+    """Split a content line into (NAME, params, raw value)
+
+    Parameter names are uppercased; quoted parameter values may contain
+    ':', ';' and ','. Returns None for lines without a value.
+    """
+    params = {}
+    in_quotes = False
+    name_end = None
+    param_start = None
+    param_name = None
+    value_start = None
+
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif in_quotes:
+            continue
+        elif char in ';:':
+            if name_end is None:
+                name_end = i
+            elif param_name is not None:
+                params[param_name] = line[param_start:i].strip('"')
+                param_name = None
+            if char == ':':
+                value_start = i + 1
+                break
+            param_start = i + 1
+        elif char == '=' and name_end is not None and param_name is None:
+            param_name = line[param_start:i].strip().upper()
+            param_start = i + 1
+
+    if value_start is None:
+        return None
+    return line[:name_end].strip().upper(), params, line[value_start:]
+
+
+class ICSComponent:
+    """A parsed calendar component (VEVENT, VTODO, ...)"""
+
+    # Properties whose value is TEXT and must be unescaped
+    TEXT_PROPERTIES = ('SUMMARY', 'DESCRIPTION', 'LOCATION', 'COMMENT',
+                       'CATEGORIES', 'CONTACT', 'RESOURCES', 'STATUS')
+
+    def __init__(self, name):
+        self.name = name
+        self.properties = []    # (NAME, params, value) of this component
+        self.lines = []         # unfolded lines between BEGIN and END
+
+    def add(self, name, params, value):
+        if name in self.TEXT_PROPERTIES:
+            value = unescape_text(value)
+        self.properties.append((name, params, value))
+
+    def get(self, name, default=''):
+        """First value of a property"""
+        for prop_name, _params, value in self.properties:
+            if prop_name == name:
+                return value
+        return default
+
+    def get_params(self, name):
+        """Parameters of the first property with this name"""
+        for prop_name, params, _value in self.properties:
+            if prop_name == name:
+                return params
+        return {}
+
+    def get_all(self, name):
+        """All values of a repeated property"""
+        return [value for prop_name, _params, value in self.properties
+                if prop_name == name]
+
+
+def iter_components(lines, names=DEFAULT_COMPONENTS):
+    """Yield ICSComponent objects for the wanted component names
+
+    lines can be any iterable of raw (folded) text lines. Nested components
+    (e.g. VALARM inside VEVENT) are kept in the parent's raw lines but
+    their properties are not mixed into the parent.
+    """
+    for component, _line in _iter_components(
+            _iter_logical_lines((line, None) for line in lines), names):
+        yield component
+
+
+def iter_ics_text(content, names=DEFAULT_COMPONENTS):
+    """Yield components from ICS text"""
+    return iter_components(content.splitlines(), names)
+
+
+def iter_ics_file(filepath, names=DEFAULT_COMPONENTS):
+    """Stream components from an ICS file (plain or .gz)
+
+    Yields (component, bytes_read, file_size) reading the file line by line;
+    sizes are uncompressed bytes.
+    """
+    file_size = get_content_size(filepath)
+
+    def read_lines():
+        bytes_read = 0
+        with open_ics_binary(filepath) as f:
+            for raw_line in f:
+                bytes_read += len(raw_line)
+                yield raw_line, bytes_read
+
+    for component, bytes_read in _iter_components(
+            _iter_raw_logical_lines(read_lines()), names):
+        yield component, bytes_read, file_size
+
+
+def read_calendar_name(filepath):
+    """X-WR-CALNAME of an ICS file (plain or .gz), '' if it has none
+
+    Only the calendar header before the first component is read.
+    """
+    with open_ics_binary(filepath) as f:
+        for line in unfold_raw_lines(f):
+            upper = line[:16].upper()
+            if upper.startswith('BEGIN:') and not upper.startswith('BEGIN:VCALENDAR'):
+                break
+            if upper.startswith('X-WR-CALNAME'):
+                parsed = parse_content_line(line)
+                if parsed and parsed[2].strip():
+                    return unescape_text(parsed[2].strip())
+    return ''
+
+
+def _iter_logical_lines(items):
+    """Unfold (line, position) pairs - position is where the line ends"""
+    logical = None
+    position = None
+    for raw_line, pos in items:
+        line = raw_line.rstrip('\r\n')
+        if logical is not None and line[:1] in (' ', '\t'):
+            logical += line[1:]
+            position = pos
+            continue
+        if logical is not None:
+            yield logical, position
+        logical = line
+        position = pos
+    if logical is not None:
+        yield logical, position
+
+
+def _iter_raw_logical_lines(items):
+    """Unfold (raw line, position) pairs on the bytes and decode"""
+    parts = None
+    position = None
+    for raw_line, pos in items:
+        line = raw_line.rstrip(b'\r\n')
+        if parts is not None and line[:1] in (b' ', b'\t'):
+            parts.append(line[1:])
+            position = pos
+            continue
+        if parts is not None:
+            yield b''.join(parts).decode('utf-8', 'ignore'), position
+        parts = [line]
+        position = pos
+    if parts is not None:
+        yield b''.join(parts).decode('utf-8', 'ignore'), position
+
+
+def _iter_components(items, names):
+    """Yield (component, position) from unfolded (line, position) pairs"""
+    current = None
+    depth = 0
+
+    for line, position in items:
+        line = line.strip()
+        if not line:
+            continue
+        upper = line.upper()
+
+        if current is None:
+            if upper.startswith('BEGIN:') and upper[6:] in names:
+                current = ICSComponent(upper[6:])
+                depth = 0
+            continue
+
+        if upper.startswith('BEGIN:'):
+            depth += 1
+        elif upper.startswith('END:'):
+            if depth == 0:
+                yield current, position
+                current = None
+                continue
+            depth -= 1
+        elif depth == 0:
+            parsed = parse_content_line(line)
+            if parsed:
+                current.add(*parsed)
+        current.lines.append(line)
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+UID based incremental re-import of ICS files.
+
+A newer export of an already imported calendar is compared with the stored
+events by UID (SEQUENCE / LAST-MODIFIED decide which version wins) and only
+the difference - added, changed and cancelled events - is applied, with a
+single save of the events file.
+"""
+from __future__ import print_function
+
+from .config_manager import get_debug
+from .ics_importer import ICSFileImporterThread, needs_update, update_event_from
+from .ics_parser import iter_ics_file
+
+
+def _event_key(event):
+    """Fallback identity for events without UID"""
+    return "{}|{}|{}".format(event.title, event.date, event.time).lower()
+
+
+def compute_sync_diff(event_manager, filepath, remove_missing=True):
+    """Compare an ICS file with the events imported from the same calendar
+
+    Returns a dict with 'added' (new Event objects), 'changed' (list of
+    (existing, incoming)), 'cancelled' (existing events), 'unchanged' (count)
+    and 'source'. With remove_missing, events of this calendar no longer
+    present in the file are cancelled too. The calendar is the file's
+    X-WR-CALNAME (file name only without one), so calendars exported under
+    the same file name do not cancel each other's events.
+    """
+    source = ICSFileImporterThread.get_source_name(filepath)
+    by_uid = {}
+    keys = set()
+    for event in event_manager.events:
+        if event.uid:
+            by_uid[event.uid] = event
+        else:
+            keys.add(_event_key(event))
+
+    diff = {
+        'source': source,
+        'added': [],
+        'changed': [],
+        'cancelled': [],
+        'unchanged': 0,
+    }
+    seen_uids = set()
+
+    for component, _bytes_read, _size in iter_ics_file(filepath):
+        incoming = ICSFileImporterThread.event_from_component(component)
+        if not incoming:
+            continue
+        incoming.source = source
+        cancelled = incoming.ics_status == 'CANCELLED'
+
+        if not incoming.uid:
+            # No identity: legacy title|date|time check
+            key = _event_key(incoming)
+            if key in keys or cancelled:
+                diff['unchanged'] += 1
+            else:
+                keys.add(key)
+                diff['added'].append(incoming)
+            continue
+
+        if incoming.uid in seen_uids:
+            # Recurrence overrides share the UID of the master event
+            continue
+        seen_uids.add(incoming.uid)
+
+        existing = by_uid.get(incoming.uid)
+        if existing is None:
+            if not cancelled:
+                diff['added'].append(incoming)
+        elif cancelled:
+            diff['cancelled'].append(existing)
+        elif needs_update(incoming, existing):
+            diff['changed'].append((existing, incoming))
+        else:
+            diff['unchanged'] += 1
+
+    if remove_missing:
+        for uid, event in by_uid.items():
+            if event.source == source and uid not in seen_uids:
+                diff['cancelled'].append(event)
+
+    if get_debug():
+        print("[ICSSync] {0}: {1} added, {2} changed, {3} cancelled, {4} unchanged".format(
+            source, len(diff['added']), len(diff['changed']),
+            len(diff['cancelled']), diff['unchanged']))
+    return diff
+
+
+def apply_sync_diff(event_manager, diff):
+    """Apply a diff from compute_sync_diff with one save - returns count"""
+    touched = 0
+
+    for existing, incoming in diff['changed']:
+        update_event_from(existing, incoming)
+        touched += 1
+
+    if diff['cancelled']:
+        cancelled_ids = set(id(event) for event in diff['cancelled'])
+        event_manager.events = [
+            event for event in event_manager.events
+            if id(event) not in cancelled_ids]
+        touched += len(diff['cancelled'])
+
+    # Events parsed in the same millisecond share their time based id
+    used_ids = set(event.id for event in event_manager.events)
+    for event in diff['added']:
+        while event.id in used_ids:
+            event.id += 1
+        used_ids.add(event.id)
+        event_manager.events.append(event)
+        touched += 1
+
+    if touched:
+        event_manager.save_events()
+
+    if get_debug():
+        print("[ICSSync] Applied {0} changes".format(touched))
+    return touched
@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Streaming ICS writer for exports.
+
+Components are written to a buffered file as they are produced, so the
+memory used does not depend on the size of the export. Lines end with
+CRLF and are folded at 75 octets (RFC 5545 3.1) without splitting UTF-8
+sequences. The file is written next to the target as .tmp and renamed
+over it when the calendar is closed; a failed export leaves the previous
+file untouched.
+"""
+from __future__ import print_function
+import io
+import os
+
+from .config_manager import get_debug
+from .ics_parser import escape_text
+
+FOLD_OCTETS = 75
+WRITE_BUFFER = 65536
+
+
+def fold_line(line):
+    """Content line -> CRLF terminated, folded UTF-8 bytes"""
+    data = line.encode('utf-8')
+    if len(data) <= FOLD_OCTETS:
+        return data + b"\r\n"
+
+    parts = []
+    start = 0
+    limit = FOLD_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        # Do not cut inside a multi-byte character
+        while end > start and (ord(data[end:end + 1]) & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end])
+        start = end
+        # Continuation lines start with a space
+        limit = FOLD_OCTETS - 1
+    parts.append(data[start:])
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+class ICSWriter:
+    """Write a VCALENDAR to a file one component at a time
+
+        with ICSWriter(path, prodid) as writer:
+            writer.write_component(lines)
+
+    An exception inside the block discards the temporary file.
+    """
+
+    def __init__(self, output_path, prodid, headers=None):
+        self.output_path = output_path
+        self.temp_path = output_path + ".tmp"
+        self.prodid = prodid
+        self.headers = headers or [("CALSCALE", "GREGORIAN"),
+                                   ("METHOD", "PUBLISH")]
+        self.f = None
+        self.components = 0
+        self.bytes_written = 0
+
+    def open(self):
+        self.f = io.open(self.temp_path, 'wb', WRITE_BUFFER)
+        self.write_line("BEGIN:VCALENDAR")
+        self.write_line("VERSION:2.0")
+        self.write_line("PRODID:" + self.prodid)
+        for name, value in self.headers:
+            self.write_line(name + ":" + value)
+        return self
+
+    def write_line(self, line):
+        data = fold_line(line)
+        self.f.write(data)
+        self.bytes_written += len(data)
+
+    def write_lines(self, lines):
+        for line in lines:
+            self.write_line(line)
+
+    def write_property(self, name, value, params=""):
+        """Write a TEXT property, escaping the value"""
+        self.write_line(name + params + ":" + escape_text(value))
+
+    def write_component(self, lines, name="VEVENT"):
+        """Write the lines of a component, adding BEGIN/END if missing"""
+        if lines and lines[0] == "BEGIN:" + name:
+            self.write_lines(lines)
+        else:
+            self.write_line("BEGIN:" + name)
+            self.write_lines(lines)
+            self.write_line("END:" + name)
+        self.components += 1
+
+    def close(self):
+        """End the calendar and move the file into place"""
+        self.write_line("END:VCALENDAR")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+        self.f = None
+        os.rename(self.temp_path, self.output_path)
+        if get_debug():
+            print("[ICSWriter] {0}: {1} components, {2} bytes".format(
+                self.output_path, self.components, self.bytes_written))
+
+    def abort(self):
+        """Drop the partial file"""
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        if os.path.exists(self.temp_path):
+            try:
+                os.remove(self.temp_path)
+            except OSError as e:
+                print("[ICSWriter] Error removing {0}: {1}".format(
+                    self.temp_path, e))
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Checkpoints for resumable vCard / ICS imports.
+
+Every CHECKPOINT_RECORDS records the importer writes the byte offset after
+the last committed record together with its counters. A commit that also
+has to flush buffered work first records the target offset as
+'pending_offset' before flushing; if the box restarts in between, the
+marker tells the resumed import that records past 'offset' may already be
+stored (they are then caught by the duplicate checks).
+"""
+from __future__ import print_function
+import hashlib
+import os
+import time
+from json import dump, load
+from os.path import exists, getsize, join
+
+from .config_manager import get_debug
+from .formatters import DATA_PATH
+
+CHECKPOINT_RECORDS = 500    # records between two checkpoints
+HASH_BLOCK = 65536          # bytes hashed at the start and end of the file
+
+
+class ImportCheckpoint:
+    """Checkpoint of one import kind ('vcard' or 'ics')"""
+
+    def __init__(self, kind, filepath):
+        self.kind = kind
+        self.filepath = filepath
+        self.path = join(DATA_PATH, "import_{0}.checkpoint".format(kind))
+        self.source_hash = None
+        self.offset = 0
+        self.counters = {}
+        self.since_commit = 0
+
+    @staticmethod
+    def hash_source(filepath):
+        """Fingerprint of a source file: size, first and last 64 KB"""
+        sha1 = hashlib.sha1()
+        size = getsize(filepath)
+        sha1.update(str(size).encode('ascii'))
+        with open(filepath, 'rb') as f:
+            sha1.update(f.read(HASH_BLOCK))
+            if size > HASH_BLOCK:
+                f.seek(max(HASH_BLOCK, size - HASH_BLOCK))
+                sha1.update(f.read(HASH_BLOCK))
+        return sha1.hexdigest()
+
+    def get_source_hash(self):
+        if self.source_hash is None:
+            self.source_hash = self.hash_source(self.filepath)
+        return self.source_hash
+
+    def load(self):
+        """Saved state for this file, None if missing or for another file"""
+        if not exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as f:
+                state = load(f)
+            if (state.get('kind') != self.kind or
+                    state.get('path') != self.filepath or
+                    state.get('source_hash') != self.get_source_hash()):
+                return None
+            self.offset = state.get('offset', 0)
+            self.counters = state.get('counters', {})
+            return state
+        except Exception as e:
+            print("[ImportCheckpoint] Error reading checkpoint: {0}".format(e))
+            return None
+
+    def write(self, offset, counters, pending_offset=None):
+        """Write the checkpoint atomically"""
+        state = {
+            'kind': self.kind,
+            'path': self.filepath,
+            'source_hash': self.get_source_hash(),
+            'file_size': getsize(self.filepath),
+            'offset': offset,
+            'counters': counters,
+            'updated': time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if pending_offset is not None:
+            state['pending_offset'] = pending_offset
+
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                dump(state, f)
+            os.rename(temp_path, self.path)
+        except Exception as e:
+            print("[ImportCheckpoint] Error writing checkpoint: {0}".format(e))
+
+    def record_done(self):
+        """Count a processed record - True when a commit is due"""
+        self.since_commit += 1
+        return self.since_commit >= CHECKPOINT_RECORDS
+
+    def commit(self, offset, counters, flush=None):
+        """Record progress up to offset; flush writes buffered work first"""
+        if flush is not None:
+            self.write(self.offset, self.counters, pending_offset=offset)
+            flush()
+        self.write(offset, counters)
+        self.offset = offset
+        self.counters = dict(counters)
+        self.since_commit = 0
+        if get_debug():
+            print("[ImportCheckpoint] {0} committed at byte {1}".format(
+                self.kind, offset))
+
+    def clear(self):
+        """Remove the checkpoint (import finished or discarded)"""
+        self.offset = 0
+        self.counters = {}
+        self.since_commit = 0
+        if exists(self.path):
+            try:
+                os.remove(self.path)
+            except Exception as e:
+                print("[ImportCheckpoint] Error removing checkpoint: {0}".format(e))
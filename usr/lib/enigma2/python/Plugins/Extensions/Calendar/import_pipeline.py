@@ -0,0 +1,325 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Staged import pipeline shared by the ICS and vCard importers.
+
+    read/split -> parse -> normalize -> classify | queue | dedup -> commit
+
+The source (file reader splitting records, parser with the optional process
+pool) and the stages before the first main-loop stage form the producer
+side; with threaded=True it runs in a worker thread feeding a bounded
+queue. Dedup and commit touch the managers and always run on the consumer
+side - the importer thread for ICS, the eTimer time budget for vCard.
+Inside one thread the stages are chained directly: one thread per stage
+would only add GIL contention on a receiver CPU.
+
+Every stage records items in/out, busy time and the slowest item, printed
+at the end of the import with debug enabled.
+"""
+from __future__ import print_function
+import threading
+import time
+
+from .config_manager import get_debug
+from .parallel_parser import iter_file_chunks, iter_parsed_chunks
+
+try:
+    from queue import Queue, Empty, Full
+except ImportError:
+    from Queue import Queue, Empty, Full
+
+QUEUE_SIZE = 500        # records buffered between producer and consumer
+COMMIT_BATCH = 200      # records per commit flush
+
+
+class ImportRecord:
+    """A record travelling through the pipeline"""
+
+    def __init__(self, data, bytes_read=0, file_size=0):
+        self.data = data            # Event object or contact dict
+        self.bytes_read = bytes_read
+        self.file_size = file_size
+        self.kind = None            # set by the classifier
+        self.status = None          # imported / updated / skipped / error
+        self.detail = None
+        self.target = None          # stored item a newer version replaces
+
+
+class PipelineStage:
+    """One pipeline stage with throughput and latency metrics
+
+    process(record) returns True to pass the record on, False when the
+    stage is done with it (record.status says why). Stages flagged
+    main_loop use the managers and run on the consumer side.
+    """
+
+    main_loop = False
+
+    def __init__(self, name, func=None, main_loop=None):
+        self.name = name
+        self.func = func
+        if main_loop is not None:
+            self.main_loop = main_loop
+        self.items_in = 0
+        self.items_out = 0
+        self.busy = 0.0
+        self.max_latency = 0.0
+
+    def process(self, record):
+        return self.func(record)
+
+    def run(self, record):
+        start = time.time()
+        passed = self.process(record)
+        self.record_timing(time.time() - start, 1, passed)
+        return passed
+
+    def record_timing(self, elapsed, count=1, passed=True):
+        self.items_in += count
+        if passed:
+            self.items_out += count
+        self.busy += elapsed
+        if count and elapsed / count > self.max_latency:
+            self.max_latency = elapsed / count
+
+    def flush(self):
+        """Write buffered work (committer stages)"""
+        pass
+
+    def get_metrics(self):
+        return {
+            'stage': self.name,
+            'in': self.items_in,
+            'out': self.items_out,
+            'busy_ms': int(self.busy * 1000),
+            'avg_ms': self.busy * 1000.0 / self.items_in if self.items_in else 0.0,
+            'max_ms': self.max_latency * 1000.0,
+            'per_sec': int(self.items_in / self.busy) if self.busy > 0 else 0,
+        }
+
+
+class CommitStage(PipelineStage):
+    """Batch committer: commit(record) per record, flush() per batch"""
+
+    main_loop = True
+
+    def __init__(self, name, commit, flush=None, batch_size=COMMIT_BATCH):
+        PipelineStage.__init__(self, name, commit)
+        self.flush_func = flush
+        self.batch_size = batch_size
+        self.pending = 0
+        self.flushes = 0
+
+    def process(self, record):
+        passed = self.func(record)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+        return passed
+
+    def flush(self):
+        if not self.pending or self.flush_func is None:
+            self.pending = 0
+            return
+        start = time.time()
+        self.flush_func()
+        self.busy += time.time() - start
+        self.pending = 0
+        self.flushes += 1
+
+    def get_metrics(self):
+        metrics = PipelineStage.get_metrics(self)
+        metrics['flushes'] = self.flushes
+        return metrics
+
+
+def _timed(iterable, stage, count):
+    """Charge the time spent producing each item to stage"""
+    iterator = iter(iterable)
+    while True:
+        start = time.time()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        stage.record_timing(time.time() - start, count(item))
+        yield item
+
+
+class FileSource:
+    """Reader/splitter and parser stages for a vCard or ICS file"""
+
+    def __init__(self, filepath, kind, start_offset=0, workers=None):
+        self.filepath = filepath
+        self.kind = kind
+        self.start_offset = start_offset
+        self.workers = workers
+        self.stages = [PipelineStage('read'), PipelineStage('parse')]
+
+    def __iter__(self):
+        read_stage, parse_stage = self.stages
+        chunks = _timed(
+            iter_file_chunks(self.filepath, self.kind, self.workers,
+                             self.start_offset),
+            read_stage, lambda chunk: len(chunk[1]))
+        results = _timed(
+            iter_parsed_chunks(chunks, self.workers),
+            parse_stage, len)
+        for chunk_results in results:
+            for data, bytes_read, file_size in chunk_results:
+                yield ImportRecord(data, bytes_read, file_size)
+
+
+class ImportPipeline:
+    """Run records from a source through the stages
+
+    source yields ImportRecord objects (FileSource, or any generator for
+    other formats). on_record(record) is called on the consumer side for
+    every record, in source order, after the last stage that handled it.
+    """
+
+    def __init__(self, source, stages, on_record=None, threaded=False,
+                 queue_size=QUEUE_SIZE):
+        self.source = source
+        self.stages = stages
+        self.on_record = on_record
+        self.threaded = threaded
+        self.queue_size = queue_size
+
+        split = 0
+        while split < len(stages) and not stages[split].main_loop:
+            split += 1
+        self.producer_stages = stages[:split]
+        self.consumer_stages = stages[split:]
+
+        self.queue_wait = PipelineStage('queue wait')
+        self.queue = None
+        self.records = None
+        self.worker = None
+        self.cancelled = False
+        self.finished = False
+
+    def start(self):
+        """Start the producer side"""
+        if self.threaded:
+            self.queue = Queue(self.queue_size)
+            self.worker = threading.Thread(target=self.produce)
+            self.worker.daemon = True
+            self.worker.start()
+        else:
+            self.records = self.iter_produced()
+
+    @staticmethod
+    def run_stages(stages, record):
+        """Pass a record through stages until one is done with it"""
+        try:
+            for stage in stages:
+                if not stage.run(record):
+                    return
+        except Exception as e:
+            print("[ImportPipeline] Error in stage {0}: {1}".format(
+                stage.name, e))
+            record.status = 'error'
+            record.detail = str(e)
+
+    def iter_produced(self):
+        for record in self.source:
+            if self.cancelled:
+                return
+            self.run_stages(self.producer_stages, record)
+            yield record
+
+    def produce(self):
+        """Worker thread: producer stages into the bounded queue"""
+        try:
+            for record in self.iter_produced():
+                while not self.cancelled:
+                    try:
+                        self.queue.put(record, True, 0.5)
+                        break
+                    except Full:
+                        continue
+                if self.cancelled:
+                    return
+        except Exception as e:
+            print("[ImportPipeline] Producer error: {0}".format(e))
+        # End of stream marker
+        self.queue.put(None)
+
+    def next_record(self, deadline=None):
+        """Next record, None at the end - Empty if none ready by deadline"""
+        if self.queue is None:
+            return next(self.records, None)
+        start = time.time()
+        try:
+            if deadline is None:
+                return self.queue.get()
+            return self.queue.get(True, max(0.001, deadline - start))
+        finally:
+            self.queue_wait.record_timing(time.time() - start)
+
+    def process(self, deadline=None):
+        """Consume records until deadline - True when nothing is left"""
+        while not self.finished and not self.cancelled:
+            if deadline is not None and time.time() >= deadline:
+                return False
+            try:
+                record = self.next_record(deadline)
+            except Empty:
+                # Producer still working - come back later
+                return False
+            except Exception as e:
+                print("[ImportPipeline] Error reading source: {0}".format(e))
+                record = None
+
+            if record is None:
+                self.finish()
+                break
+
+            if record.status is None:
+                self.run_stages(self.consumer_stages, record)
+            if self.on_record is not None:
+                self.on_record(record)
+        return True
+
+    def run(self):
+        """Start and consume everything in the calling thread"""
+        self.start()
+        self.process()
+
+    def flush(self):
+        """Flush buffered commits (checkpoints, cancel)"""
+        for stage in self.stages:
+            stage.flush()
+
+    def finish(self):
+        self.finished = True
+        self.flush()
+        if get_debug():
+            self.log_metrics()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def get_metrics(self):
+        stages = list(getattr(self.source, 'stages', []))
+        stages.extend(self.stages)
+        if self.queue is not None:
+            stages.append(self.queue_wait)
+        return [stage.get_metrics() for stage in stages]
+
+    def log_metrics(self):
+        for metrics in self.get_metrics():
+            print("[ImportPipeline] {stage}: {in} in, {out} out, {busy_ms} ms, "
+                  "avg {avg_ms:.3f} ms, max {max_ms:.1f} ms, {per_sec}/s".format(**metrics))
@@ -0,0 +1,239 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Parallel parse stage for large vCard / ICS imports.
+
+The input is split at record boundaries (BEGIN:VCARD / BEGIN:VEVENT) into
+chunks, the chunks are parsed in a multiprocessing pool and the results are
+returned in the original file order, so duplicate checks and saving stay
+single-threaded in the importers. With one worker (default) or when no
+pool can be created everything runs serially in this process.
+
+For the pool, plain files are pre-scanned (prescan.py) and the chunks are
+byte ranges: each worker reads and splits its own range, the main process
+neither reads the file line by line nor sends the text to the workers.
+"""
+from __future__ import print_function
+import time
+from itertools import islice
+
+from .config_manager import get_debug, get_parse_workers
+from .ics_parser import get_content_size, open_ics_binary, unfold_bytes
+from .prescan import RECORD_MARKERS, scan_records
+
+CHUNK_RECORDS = 200     # records sent to a worker at once
+MAX_WORKERS = 8
+
+
+def get_worker_count(workers=None):
+    """Resolve the configured worker count (0 = one per CPU)"""
+    if workers is None:
+        workers = get_parse_workers()
+    if workers <= 0:
+        try:
+            from multiprocessing import cpu_count
+            workers = cpu_count()
+        except (ImportError, NotImplementedError):
+            workers = 1
+    return max(1, min(workers, MAX_WORKERS))
+
+
+def iter_record_blocks(raw_lines, kind, bytes_read=0):
+    """Split raw lines at record boundaries
+
+    Yields (block_text, bytes_read): block_text starts after the BEGIN
+    line and ends with the END line, like the regex split used by the
+    importers; bytes_read is the offset after the END line, counted from
+    the bytes_read passed in.
+    """
+    begin, end = RECORD_MARKERS[kind]
+    block_lines = None
+    for raw_line in raw_lines:
+        bytes_read += len(raw_line)
+        marker = raw_line.strip().upper()
+
+        if marker == begin:
+            block_lines = []
+        elif block_lines is None:
+            continue
+        else:
+            block_lines.append(raw_line)
+            if marker == end:
+                # Unfolded before decoding (folds can split UTF-8)
+                yield (unfold_bytes(b''.join(block_lines)).decode(
+                    'utf-8', 'ignore'), bytes_read)
+                block_lines = None
+
+
+def iter_record_chunks(filepath, kind, chunk_records=CHUNK_RECORDS,
+                       start_offset=0):
+    """Split a file at record boundaries
+
+    Plain and gzip-compressed (.gz) files are accepted; start_offset (a
+    record boundary from a resumed import) skips the records before it.
+    Yields (kind, blocks, file_size) where blocks is a list of
+    (block_text, bytes_read), see iter_record_blocks().
+    """
+    file_size = get_content_size(filepath)
+    blocks = []
+
+    with open_ics_binary(filepath) as f:
+        if start_offset:
+            f.seek(start_offset)
+        for block in iter_record_blocks(f, kind, start_offset):
+            blocks.append(block)
+            if len(blocks) >= chunk_records:
+                yield kind, blocks, file_size
+                blocks = []
+
+    if blocks:
+        yield kind, blocks, file_size
+
+
+class FileRange:
+    """Byte range of a file holding some records - a chunk read by the
+    worker that parses it; len() is the number of records"""
+
+    def __init__(self, filepath, start, end, records):
+        self.filepath = filepath
+        self.start = start
+        self.end = end
+        self.records = records
+
+    def __len__(self):
+        return self.records
+
+    def read_blocks(self, kind):
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.start)
+            data = f.read(self.end - self.start)
+        return list(iter_record_blocks(
+            data.splitlines(True), kind, self.start))
+
+
+def iter_range_chunks(filepath, kind, chunk_records=CHUNK_RECORDS,
+                      start_offset=0):
+    """Chunks as FileRange from a pre-scan of a plain file
+
+    Yields (kind, FileRange, file_size) like iter_record_chunks().
+    """
+    scan = scan_records(filepath, kind)
+    for start, end, records in scan.chunk_ranges(chunk_records, start_offset):
+        yield kind, FileRange(filepath, start, end, records), scan.file_size
+
+
+def iter_file_chunks(filepath, kind, workers=None, start_offset=0):
+    """Byte range chunks for the pool, line split chunks otherwise
+    (one worker, or gzip files that cannot be read at an offset)"""
+    if get_worker_count(workers) > 1 and not filepath.endswith('.gz'):
+        return iter_range_chunks(filepath, kind, start_offset=start_offset)
+    return iter_record_chunks(filepath, kind, start_offset=start_offset)
+
+
+def parse_chunk(chunk):
+    """Parse one chunk - runs in the worker processes
+
+    Returns a list of (record, bytes_read, file_size); record is None when
+    a block cannot be parsed.
+    """
+    kind, blocks, file_size = chunk
+    if isinstance(blocks, FileRange):
+        blocks = blocks.read_blocks(kind)
+    if kind == 'vcard':
+        from .vcf_importer import VCardFileImporter
+        parse_block = VCardFileImporter.parse_vcard_block
+    else:
+        from .ics_importer import ICSFileImporterThread
+        parse_block = ICSFileImporterThread.parse_vevent_block
+
+    results = []
+    for block, bytes_read in blocks:
+        try:
+            record = parse_block(block)
+        except Exception as e:
+            print("[ParallelParser] Error parsing {0}: {1}".format(kind, e))
+            record = None
+        results.append((record, bytes_read, file_size))
+    return results
+
+
+def create_pool(workers):
+    """Create a process pool, None if not possible on this box"""
+    try:
+        from multiprocessing import Pool
+        return Pool(workers)
+    except Exception as e:
+        print("[ParallelParser] Pool not available, parsing serially: {0}".format(e))
+        return None
+
+
+def iter_parsed_chunks(chunks, workers=None):
+    """Parse chunks from iter_record_chunks
+
+    Yields one result list (see parse_chunk) per chunk, in input order.
+    """
+    workers = get_worker_count(workers)
+    pool = create_pool(workers) if workers > 1 else None
+
+    if get_debug():
+        print("[ParallelParser] Parsing with {0} worker(s)".format(
+            workers if pool else 1))
+
+    if pool is None:
+        for chunk in chunks:
+            yield parse_chunk(chunk)
+        return
+
+    try:
+        # Bounded window of chunks in flight, results keep file order
+        window = workers * 2
+        while True:
+            batch = list(islice(chunks, window))
+            if not batch:
+                break
+            for results in pool.imap(parse_chunk, batch):
+                yield results
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def iter_parsed_records(filepath, kind, workers=None, start_offset=0):
+    """Parse a vCard ('vcard') or ICS ('vevent') file
+
+    Yields (record, bytes_read, file_size) in file order. Records are contact
+    dicts for vCard and Event objects for ICS.
+    """
+    chunks = iter_file_chunks(filepath, kind, workers, start_offset)
+    for results in iter_parsed_chunks(chunks, workers):
+        for result in results:
+            yield result
+
+
+def benchmark(filepath, kind, worker_counts=(1, 2, 4)):
+    """Time a full parse with several worker counts
+
+    Returns a list of (workers, seconds, records).
+    """
+    results = []
+    for workers in worker_counts:
+        start = time.time()
+        records = 0
+        for _record in iter_parsed_records(filepath, kind, workers):
+            records += 1
+        elapsed = time.time() - start
+        results.append((workers, elapsed, records))
+        print("[ParallelParser] {0} worker(s): {1} records in {2:.2f}s".format(
+            workers, records, elapsed))
+    return results
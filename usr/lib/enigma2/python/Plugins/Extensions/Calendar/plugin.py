@@ -102,8 +102,8 @@ import datetime
 import glob
 import shutil
 from os import remove, makedirs, listdir
-from os.path import exists, dirname, join, basename, getmtime, getsize
-from time import localtime, time, strftime
+from os.path import exists, dirname, join, basename, normpath
+from time import localtime, time
 
 from enigma import getDesktop, eTimer
 from Plugins.Plugin import PluginDescriptor
@@ -118,28 +118,53 @@ from skin import parseColor
 
 from . import _, __version__, PLUGIN_ICON
 from .config_manager import (
+    get_backup_location,
     get_check_interval,
     get_debug,
     get_default_event_time,
+    get_export_changes_only,
+    get_export_deletions,
     get_export_format,
     get_last_used_default_time,
     init_all_config,
+    restore_from_plugin_file,
     save_all_config,
     update_last_used_default_time,
     validate_event_time
 )
+from .backup import (
+    BACKUP_SUFFIX,
+    create_backup,
+    is_volatile_path,
+    read_backup_manifest,
+    restore_backup,
+)
 from .birthday_dialog import BirthdayDialog
 from .birthday_manager import BirthdayManager
 from .event_dialog import EventDialog
+from .duplicate_checker import DedupIndex
 from .event_manager import EventManager, Event
+from .csv_io import export_events_to_csv
+from .export_job import ExportCancelled, ExportJob, ExportProgressScreen
+from .export_filter import ExportFilter
+from .export_manifest import ExportManifest
 from .contacts_view import ContactsView
 from .events_view import EventsView
 from .ics_events_view import ICSEventsView
 from .ics_browser import ICSBrowser
 from .ics_importer import ICSImporter
-from .vcf_importer import VCardImporter, export_contacts_to_vcf
+from .ics_manager import ics_manager
+from .ics_month_store import ICSMonthStore
+from .ics_parser import escape_text
+from .ics_writer import ICSWriter
+from .vcf_importer import (
+    VCardImporter,
+    export_contacts_to_csv,
+    export_contacts_to_vcf,
+)
 from .holidays import (
     HolidaysImportScreen,
+    HolidaysManager,
     clear_holidays_dialog,
     show_holidays_today,
     show_upcoming_holidays as holidays_upcoming
@@ -412,6 +437,7 @@ class Calendar(Screen):
                 print("[Calendar] Event system disabled")
 
         self.language = config.osd.language.value.split("_")[0].strip()
+        self.ics_store = ICSMonthStore(self.language)
 
         if get_debug():
             print("[Calendar] BirthdayManager initialized, contacts: %d" %
@@ -612,6 +638,7 @@ class Calendar(Screen):
                 (_("Manage Event"), self.show_events),
                 (_("Add Event"), self.add_event),
                 (_("Import Google Calendar (.ics)"), self.import_ics_file),
+                (_("Export Events to CSV"), self.export_events_csv),
                 (_("Manage ICS Files"), self.manage_ics_files),
                 (_("Cleanup past events"), self.cleanup_past_events),
                 (_("Delete ALL events"), self.clear_all_events),
@@ -654,6 +681,10 @@ class Calendar(Screen):
                  self.convert_to_legacy))
             menu.append((_("Convert to vCard format"), self.convert_to_vcard))
             menu.append((_("Export All to ICS File"), self.export_all_to_ics))
+        menu.extend([
+            (_("Backup Database"), self.backup_database),
+            (_("Restore Database"), self.restore_database),
+        ])
 
         # --- SYSTEM SECTION ---
         menu.extend([
@@ -971,13 +1002,8 @@ class Calendar(Screen):
                 self.day
             )
         elif self.database_format == "ics":
-            file_path = "%s/%s/day/%d%02d%02d.txt" % (
-                self.ICS_BASE_PATH,
-                self.language,
-                self.year,
-                self.month,
-                self.day
-            )
+            # Monthly bucket: the day is read through the bucket index
+            file_path = self.ics_store.get_month_file(self.year, self.month)
         else:  # legacy
             file_path = "%s/%s/day/%d%02d%02d.txt" % (
                 self.DATA_PATH,
@@ -1021,15 +1047,19 @@ class Calendar(Screen):
                 print("[Calendar] Error reading holiday file: %s" % str(e))
 
         # SECOND: Load main data
-        if exists(file_path):
-            try:
-                with open(file_path, "r") as f:
-                    lines = f.readlines()
+        ics_lines = None
+        if self.database_format == "ics":
+            ics_lines = self.ics_store.get_day(self.year, self.month, self.day)
 
+        if ics_lines or (ics_lines is None and exists(file_path)):
+            try:
                 # Parse based on format
-                if self.database_format == "ics":
-                    data = self._parse_ics_content(lines)
+                if ics_lines is not None:
+                    data = self._parse_ics_content("\n".join(ics_lines))
                 else:
+                    with open(file_path, "r") as f:
+                        lines = f.readlines()
+
                     data = self._parse_file_content(
                         lines, self.database_format)
 
@@ -1605,29 +1635,29 @@ class Calendar(Screen):
 
             export_path = join(export_dir, filename)
 
-            # Menu for sort method selection (only for vcard)
-            if export_format == "vcard":
+            # Menu for sort method selection (only for vcard and csv)
+            if export_format in ("vcard", "csv"):
                 menu = [
                     (_("Sort by name (alphabetical)"),
                      lambda: self.do_export(
                         'name',
                         export_path,
-                        'vcard')),
+                        export_format)),
                     (_("Sort by birthday (month/day)"),
                      lambda: self.do_export(
                         'birthday',
                         export_path,
-                        'vcard')),
+                        export_format)),
                     (_("Sort by category"),
                      lambda: self.do_export(
                         'category',
                         export_path,
-                        'vcard')),
+                        export_format)),
                     (_("No sorting (original order)"),
                      lambda: self.do_export(
                         'none',
                         export_path,
-                        'vcard')),
+                        export_format)),
                 ]
             else:
                 # For other formats, export directly
@@ -1686,24 +1716,65 @@ class Calendar(Screen):
 
             self["status"].setText(_("Exporting contacts..."))
 
-            # Export based on format
+            # Export based on format, in background
             if export_format == "vcard":
-                count = export_contacts_to_vcf(
-                    self.birthday_manager, export_path, sort_method)
+                def work(job):
+                    return export_contacts_to_vcf(
+                        self.birthday_manager, export_path, sort_method, job)
                 format_name = "vCard"
             elif export_format == "ics":
                 # TODO: Add ICS export function
-                count = self.export_to_ics(export_path, sort_method)
+                def work(job):
+                    return self.export_to_ics(export_path, sort_method)
                 format_name = "ICS"
             elif export_format == "csv":
-                # TODO: Add CSV export function
-                count = self.export_to_csv(export_path, sort_method)
+                def work(job):
+                    return export_contacts_to_csv(
+                        self.birthday_manager, export_path, sort_method, job)
                 format_name = "CSV"
             else:  # txt
                 # TODO: Add TXT export function
-                count = self.export_to_txt(export_path, sort_method)
+                def work(job):
+                    return self.export_to_txt(export_path, sort_method)
                 format_name = "Text"
 
+            job = ExportJob(
+                _("Exporting {0}").format(format_name), export_path, work)
+            self.session.openWithCallback(
+                lambda count: self.export_done(
+                    count, sort_method, export_path, export_format, format_name,
+                    job),
+                ExportProgressScreen,
+                job
+            )
+
+        except Exception as e:
+            print("[Calendar] Error in do_export: {0}".format(str(e)))
+            self.session.open(
+                MessageBox,
+                _("Export error: {0}").format(str(e)),
+                MessageBox.TYPE_ERROR
+            )
+
+    def export_done(
+            self,
+            count,
+            sort_method,
+            export_path,
+            export_format,
+            format_name,
+            job=None):
+        """Show the result of a contacts export"""
+        try:
+            # Reset status
+            self["status"].setText(_("Calendar Planner | Ready"))
+
+            # None: cancelled, or hidden and notified by the job
+            if count is None:
+                return
+            if job is not None and job.show_error(self.session):
+                return
+
             if count > 0:
                 sort_text = {
                     'name': _("sorted by name"),
@@ -1713,7 +1784,7 @@ class Calendar(Screen):
                 }
 
                 # Show appropriate message based on format
-                if export_format == "vcard":
+                if export_format in ("vcard", "csv"):
                     message = _("{0} file exported successfully!\n\nFile: {1}\nContacts: {2}\n({3})").format(
                         format_name, export_path, count, sort_text.get(sort_method, ''))
                 else:
@@ -1725,6 +1796,12 @@ class Calendar(Screen):
                     message,
                     MessageBox.TYPE_INFO
                 )
+            elif get_export_changes_only():
+                self.session.open(
+                    MessageBox,
+                    _("No changes since the last export"),
+                    MessageBox.TYPE_INFO
+                )
             else:
                 self.session.open(
                     MessageBox,
@@ -1732,11 +1809,8 @@ class Calendar(Screen):
                     MessageBox.TYPE_INFO
                 )
 
-            # Reset status
-            self["status"].setText(_("Calendar Planner | Ready"))
-
         except Exception as e:
-            print("[Calendar] Error in do_export: {0}".format(str(e)))
+            print("[Calendar] Error in export_done: {0}".format(str(e)))
             self.session.open(
                 MessageBox,
                 _("Export error: {0}").format(str(e)),
@@ -1884,26 +1958,6 @@ class Calendar(Screen):
 
     def _save_ics_data(self):
         """Save data in ICS format"""
-        file_path = "{0}/{1}/day/{2}{3:02d}{4:02d}.txt".format(
-            self.ICS_BASE_PATH,
-            self.language,
-            self.year,
-            self.month,
-            self.day
-        )
-
-        directory = dirname(file_path)
-        if not exists(directory):
-            try:
-                makedirs(directory)
-                if get_debug():
-                    print(
-                        "[Calendar] Created ICS directory: {0}".format(directory))
-            except Exception as e:
-                print(
-                    "[Calendar] Error creating ICS directory: {0}".format(
-                        str(e)))
-
         try:
             # Get current values
             # date_text = self._clean_field_text(self["date"].getText())
@@ -1938,11 +1992,13 @@ class Calendar(Screen):
                 contacts=note_text
             )
 
-            with open(file_path, "w") as f:
-                f.write(ics_content)
+            # Day record in the month bucket, imported entries are kept
+            self.ics_store.set_day_record(
+                self.year, self.month, self.day, ics_content.split("\n"))
 
             if get_debug():
-                print("[Calendar] ICS data saved to: {0}".format(file_path))
+                print("[Calendar] ICS data saved to: {0}".format(
+                    self.ics_store.get_month_file(self.year, self.month)))
 
         except Exception as e:
             print("[Calendar] Error saving ICS data: {0}".format(str(e)))
@@ -2253,21 +2309,10 @@ class Calendar(Screen):
             if not exists(self.ICS_BASE_PATH):
                 return 0
 
-            cutoff_time = time() - (days_old * 24 * 60 * 60)
-            deleted_count = 0
-
-            for filename in listdir(self.ICS_BASE_PATH):
-                if filename.endswith(".ics"):
-                    filepath = join(self.ICS_BASE_PATH, filename)
-                    file_time = getmtime(filepath)
-
-                    if file_time < cutoff_time:
-                        remove(filepath)
-                        deleted_count += 1
-                        if get_debug():
-                            print(
-                                "[Calendar] Deleted old ICS file: {0}".format(filename))
-
+            deleted_count = ics_manager.cleanup_old_files(days_old)
+            if get_debug():
+                print(
+                    "[Calendar] Deleted {0} old ICS files".format(deleted_count))
             return deleted_count
 
         except Exception as e:
@@ -2280,23 +2325,16 @@ class Calendar(Screen):
             if not exists(self.ICS_BASE_PATH):
                 stats_text = _("No ICS directory found")
             else:
-                files = glob.glob(join(self.ICS_BASE_PATH, "*.ics"))
-                total_size = sum(getsize(f) for f in files) / 1024.0  # KB
-
-                if files:
-                    oldest = min(files, key=getmtime)
-                    newest = max(files, key=getmtime)
-
-                    oldest_date = strftime(
-                        "%Y-%m-%d", localtime(getmtime(oldest)))
-                    newest_date = strftime(
-                        "%Y-%m-%d", localtime(getmtime(newest)))
+                stats = ics_manager.get_stats()
 
+                if stats['total_files']:
                     stats_text = _("ICS Files Statistics:\n\n")
-                    stats_text += _("Total files: {0}\n").format(len(files))
-                    stats_text += _("Total size: {0:.1f} KB\n").format(total_size)
-                    stats_text += _("Oldest file: {0}\n").format(oldest_date)
-                    stats_text += _("Newest file: {0}").format(newest_date)
+                    stats_text += _("Total files: {0}\n").format(stats['total_files'])
+                    stats_text += _("Total size: {0:.1f} KB\n").format(stats['total_size_kb'])
+                    stats_text += _("Total events: {0}\n").format(stats['total_events'])
+                    stats_text += _("Birthdays: {0}\n").format(stats['total_birthdays'])
+                    stats_text += _("Oldest file: {0}\n").format(stats['oldest_date'])
+                    stats_text += _("Newest file: {0}").format(stats['newest_date'])
                 else:
                     stats_text = _("No ICS files found")
 
@@ -2375,7 +2413,7 @@ class Calendar(Screen):
 
     def _create_ics_directory(self):
         """Create ICS directory structure"""
-        ics_lang_dir = join(self.ICS_BASE_PATH, self.language, "day")
+        ics_lang_dir = self.ics_store.month_path
 
         if not exists(ics_lang_dir):
             try:
@@ -2390,7 +2428,6 @@ class Calendar(Screen):
         """Convert legacy format files to ICS"""
         try:
             source_dir = join(self.DATA_PATH, self.language, "day")
-            dest_dir = join(self.ICS_BASE_PATH, self.language, "day")
 
             if not exists(source_dir):
                 if get_debug():
@@ -2398,6 +2435,7 @@ class Calendar(Screen):
                 return 0
 
             converted = 0
+            records = {}
             for filepath in glob.glob(join(source_dir, "*.txt")):
                 filename = basename(filepath)
 
@@ -2418,11 +2456,7 @@ class Calendar(Screen):
                         data, filename[:-4])
 
                     if ics_content:
-                        # Save ICS file
-                        dest_file = join(dest_dir, filename)
-                        with open(dest_file, 'w') as f:
-                            f.write(ics_content)
-
+                        records[filename[:8]] = ics_content.split("\n")
                         converted += 1
                         if get_debug():
                             print("[Calendar] Converted to ICS:", filename)
@@ -2433,6 +2467,8 @@ class Calendar(Screen):
                             filename, str(e)))
                     continue
 
+            # Written per month bucket
+            self.ics_store.set_day_records(records)
             return converted
 
         except Exception as e:
@@ -2443,7 +2479,6 @@ class Calendar(Screen):
         """Convert vCard format files to ICS"""
         try:
             source_dir = join(self.VCARDS_PATH, self.language)
-            dest_dir = join(self.ICS_BASE_PATH, self.language, "day")
 
             if not exists(source_dir):
                 if get_debug():
@@ -2451,6 +2486,7 @@ class Calendar(Screen):
                 return 0
 
             converted = 0
+            records = {}
             for filepath in glob.glob(join(source_dir, "*.txt")):
                 filename = basename(filepath)
 
@@ -2471,11 +2507,7 @@ class Calendar(Screen):
                         data, filename[:-4])
 
                     if ics_content:
-                        # Save ICS file
-                        dest_file = join(dest_dir, filename)
-                        with open(dest_file, 'w') as f:
-                            f.write(ics_content)
-
+                        records[filename[:8]] = ics_content.split("\n")
                         converted += 1
                         if get_debug():
                             print(
@@ -2487,6 +2519,8 @@ class Calendar(Screen):
                             filename, str(e)))
                     continue
 
+            # Written per month bucket
+            self.ics_store.set_day_records(records)
             return converted
 
         except Exception as e:
@@ -2625,27 +2659,16 @@ class Calendar(Screen):
     def _convert_ics_to_legacy(self):
         """Converti da formato ICS a legacy"""
         try:
-            source_dir = join(self.ICS_BASE_PATH, self.language, "day")
             dest_dir = join(self.DATA_PATH, self.language, "day")
 
-            if not exists(source_dir):
-                if get_debug():
-                    print("[Calendar] No ICS directory found:", source_dir)
-                return 0
-
             converted = 0
 
-            for filepath in glob.glob(join(source_dir, "*.txt")):
-                filename = basename(filepath)
-
-                # Check if it's a date file (YYYYMMDD.txt)
-                if len(filename) != 12 or not filename.endswith(".txt"):
-                    continue
+            # Day records from the ICS month buckets
+            for date_str, lines in self.ics_store.iter_days():
+                filename = date_str + ".txt"
 
                 try:
-                    # Read ICS file
-                    with open(filepath, 'r') as f:
-                        content = f.read()
+                    content = "\n".join(lines)
 
                     # Parse ICS format
                     data = self._parse_ics_to_legacy(content)
@@ -2679,27 +2702,16 @@ class Calendar(Screen):
     def _convert_ics_to_vcard(self):
         """Converti da formato ICS a vCard"""
         try:
-            source_dir = join(self.ICS_BASE_PATH, self.language, "day")
             dest_dir = join(self.VCARDS_PATH, self.language)
 
-            if not exists(source_dir):
-                if get_debug():
-                    print("[Calendar] No ICS directory found:", source_dir)
-                return 0
-
             converted = 0
 
-            for filepath in glob.glob(join(source_dir, "*.txt")):
-                filename = basename(filepath)
-
-                # Check if it's a date file (YYYYMMDD.txt)
-                if len(filename) != 12 or not filename.endswith(".txt"):
-                    continue
+            # Day records from the ICS month buckets
+            for date_str, lines in self.ics_store.iter_days():
+                filename = date_str + ".txt"
 
                 try:
-                    # Read ICS file
-                    with open(filepath, 'r') as f:
-                        content = f.read()
+                    content = "\n".join(lines)
 
                     # Parse ICS format
                     data = self._parse_ics_to_vcard(content)
@@ -2975,6 +2987,37 @@ class Calendar(Screen):
 
             return join(export_dir, filename)
 
+        def export_done(ics_file, events_count, job):
+            # None: screen hidden, the job notifies when done
+            if events_count is None or job.show_error(self.session):
+                return
+            if events_count > 0:
+                message = _(
+                    "Export completed successfully!\n\n"
+                    "File: {0}\n"
+                    "Events exported: {1}\n\n"
+                    "The file can be imported into Google Calendar,\n"
+                    "Outlook, or other calendar applications."
+                ).format(ics_file, events_count)
+
+                self.session.open(
+                    MessageBox,
+                    message,
+                    MessageBox.TYPE_INFO
+                )
+            elif get_export_changes_only():
+                self.session.open(
+                    MessageBox,
+                    _("No changes since the last export"),
+                    MessageBox.TYPE_INFO
+                )
+            else:
+                self.session.open(
+                    MessageBox,
+                    _("No data to export"),
+                    MessageBox.TYPE_INFO
+                )
+
         def do_export(result):
             if not result:
                 return
@@ -2985,29 +3028,16 @@ class Calendar(Screen):
                 if get_debug():
                     print("[Calendar] Exporting to:", ics_file)
 
-                # Create ICS file
-                events_count = self._create_complete_ics_file(ics_file)
-
-                if events_count > 0:
-                    message = _(
-                        "Export completed successfully!\n\n"
-                        "File: {0}\n"
-                        "Events exported: {1}\n\n"
-                        "The file can be imported into Google Calendar,\n"
-                        "Outlook, or other calendar applications."
-                    ).format(ics_file, events_count)
-
-                    self.session.open(
-                        MessageBox,
-                        message,
-                        MessageBox.TYPE_INFO
-                    )
-                else:
-                    self.session.open(
-                        MessageBox,
-                        _("No data to export"),
-                        MessageBox.TYPE_INFO
-                    )
+                # Create ICS file in background
+                job = ExportJob(
+                    _("Exporting to ICS"),
+                    ics_file,
+                    lambda job: self._create_complete_ics_file(ics_file, job))
+                self.session.openWithCallback(
+                    lambda events_count: export_done(ics_file, events_count, job),
+                    ExportProgressScreen,
+                    job
+                )
 
             except Exception as e:
                 print("[Calendar] Export error:", str(e))
@@ -3031,6 +3061,224 @@ class Calendar(Screen):
             MessageBox.TYPE_YESNO
         )
 
+    def export_events_csv(self):
+        """Export events to a CSV file in the configured column layout"""
+        from .formatters import create_export_directory, generate_export_filename
+        if not self.event_manager or not self.event_manager.events:
+            self.session.open(
+                MessageBox,
+                _("No events to export"),
+                MessageBox.TYPE_INFO
+            )
+            return
+
+        export_dir = create_export_directory(
+            config.plugins.calendar.export_location.value,
+            config.plugins.calendar.export_subdir.value)
+        csv_file = join(export_dir, generate_export_filename(
+            "events_export",
+            config.plugins.calendar.export_add_timestamp.value, ".csv"))
+
+        def export_done(count):
+            # None: cancelled, or hidden and notified by the job
+            if count is None or job.show_error(self.session):
+                return
+            if count > 0:
+                message = _("CSV file exported successfully!\n\nFile: {0}\nEvents: {1}").format(
+                    csv_file, count)
+            elif get_export_changes_only():
+                message = _("No changes since the last export")
+            else:
+                message = _("No events to export")
+            self.session.open(MessageBox, message, MessageBox.TYPE_INFO)
+
+        job = ExportJob(
+            _("Exporting CSV"),
+            csv_file,
+            lambda job: export_events_to_csv(self.event_manager, csv_file, job))
+        self.session.openWithCallback(export_done, ExportProgressScreen, job)
+
+    def _get_backup_dir(self):
+        """Backups go to the configured backup location"""
+        from .formatters import create_export_directory
+        return create_export_directory(
+            get_backup_location(),
+            config.plugins.calendar.export_subdir.value)
+
+    def _get_backup_dirs(self):
+        """Backup directory, then the export directory used by older
+        versions, so their backups can still be restored"""
+        dirs = [self._get_backup_dir()]
+        export_dir = join(
+            config.plugins.calendar.export_location.value.rstrip("/"),
+            config.plugins.calendar.export_subdir.value)
+        if normpath(export_dir) != normpath(dirs[0]):
+            dirs.append(export_dir)
+        return dirs
+
+    def backup_database(self):
+        """Save the whole database and settings in one compressed file"""
+        try:
+            backup_file = join(
+                self._get_backup_dir(),
+                "calendar_backup_{0}{1}".format(
+                    datetime.datetime.now().strftime("%Y%m%d_%H%M%S"),
+                    BACKUP_SUFFIX))
+            if get_debug():
+                print("[Calendar] Backup to:", backup_file)
+
+            def backup_done(count):
+                if count is None or job.show_error(self.session):
+                    return
+                if count:
+                    message = _("Backup completed!\n\nFile: {0}\nFiles saved: {1}").format(
+                        backup_file, count)
+                    if is_volatile_path(backup_file):
+                        message += "\n\n" + _(
+                            "Warning: /tmp is cleared at every reboot. Copy the "
+                            "backup elsewhere or change the backup location.")
+                    self.session.open(
+                        MessageBox,
+                        message,
+                        MessageBox.TYPE_INFO
+                    )
+
+            job = ExportJob(
+                _("Backup database"),
+                backup_file,
+                lambda job: create_backup(backup_file, self.DATA_PATH, job),
+                label=_("Backup"))
+            self.session.openWithCallback(backup_done, ExportProgressScreen, job)
+
+        except Exception as e:
+            print("[Calendar] Backup error:", str(e))
+            self.session.open(
+                MessageBox,
+                _("Backup error: {0}").format(str(e)),
+                MessageBox.TYPE_ERROR
+            )
+
+    def restore_database(self):
+        """Pick a backup, then what to restore from it"""
+        from .formatters import MenuDialog
+        try:
+            backup_dirs = self._get_backup_dirs()
+            backups = []
+            for backup_dir in backup_dirs:
+                backups.extend(glob.glob(join(backup_dir, "*" + BACKUP_SUFFIX)))
+            # Newest first (the names carry the timestamp)
+            backups.sort(key=basename, reverse=True)
+            if not backups:
+                self.session.open(
+                    MessageBox,
+                    _("No backups found in:\n{0}").format("\n".join(backup_dirs)),
+                    MessageBox.TYPE_INFO
+                )
+                return
+
+            menu = [(basename(path),
+                     lambda path=path: self._choose_restore_scope(path))
+                    for path in backups]
+            self.session.openWithCallback(
+                lambda choice: choice[1]() if choice else None,
+                MenuDialog,
+                menu
+            )
+
+        except Exception as e:
+            print("[Calendar] Restore error:", str(e))
+            self.session.open(
+                MessageBox,
+                _("Restore error: {0}").format(str(e)),
+                MessageBox.TYPE_ERROR
+            )
+
+    def _choose_restore_scope(self, backup_file):
+        """Selective restore - menu of the categories in the backup"""
+        from .formatters import MenuDialog
+        manifest = read_backup_manifest(backup_file)
+        if manifest is None:
+            self.session.open(
+                MessageBox,
+                _("Invalid backup file:\n{0}").format(basename(backup_file)),
+                MessageBox.TYPE_ERROR
+            )
+            return
+
+        names = {
+            'events': _("Events"),
+            'contacts': _("Contacts"),
+            'holidays': _("Holidays"),
+            'dates': _("Personal dates"),
+            'ics': _("Imported ICS files"),
+            'settings': _("Settings"),
+        }
+        categories = manifest.get('categories', {})
+        menu = [(_("Restore everything"),
+                 lambda: self._confirm_restore(backup_file, None))]
+        for category in ('events', 'contacts', 'holidays', 'dates', 'ics', 'settings'):
+            if categories.get(category):
+                menu.append((
+                    "{0} ({1})".format(names[category], categories[category]),
+                    lambda category=category: self._confirm_restore(
+                        backup_file, (category,))))
+        self.session.openWithCallback(
+            lambda choice: choice[1]() if choice else None,
+            MenuDialog,
+            menu
+        )
+
+    def _confirm_restore(self, backup_file, categories):
+        def do_restore(result):
+            if result:
+                self._run_restore(backup_file, categories)
+
+        self.session.openWithCallback(
+            do_restore,
+            MessageBox,
+            _("Restore from {0}?\n\n"
+              "Current data will be overwritten by the backup.").format(
+                basename(backup_file)),
+            MessageBox.TYPE_YESNO
+        )
+
+    def _run_restore(self, backup_file, categories):
+        def work(job):
+            count, job.restored = restore_backup(
+                backup_file, categories, self.DATA_PATH, job)
+            return count
+
+        job = ExportJob(
+            _("Restoring database"),
+            backup_file,
+            work,
+            done_callback=self._restore_done,
+            label=_("Restore"))
+        job.restored = set()
+
+        def restore_done(count):
+            self["status"].setText(_("Calendar Planner | Ready"))
+            if count is not None:
+                job.show_error(self.session)
+
+        self.session.openWithCallback(restore_done, ExportProgressScreen, job)
+
+    def _restore_done(self, job):
+        """Main loop: apply settings and reload what was restored"""
+        restored = job.restored
+        if 'settings' in restored:
+            restore_from_plugin_file()
+        if 'events' in restored and self.event_manager:
+            self.event_manager.load_events()
+            self.event_manager.invalidate_event_index()
+        if 'contacts' in restored:
+            self.birthday_manager.load_all_contacts()
+        if restored:
+            self._paint_calendar()
+        if get_debug():
+            print("[Calendar] Restore done: {0} files ({1})".format(
+                job.result, ", ".join(sorted(restored))))
+
     def _add_contacts_to_ics(self, ics_lines):
         """Add contact birthdays to ICS lines"""
         try:
@@ -3144,69 +3392,74 @@ class Calendar(Screen):
             traceback.print_exc()
             return 0
 
-    def _create_complete_ics_file(self, output_path):
-        """Create a complete ICS file with all database entries"""
+    def _create_complete_ics_file(self, output_path, job=None, changes_only=None,
+                                  export_filter=None):
+        """Create a complete ICS file with all database entries
+
+        With an ExportJob, each phase and written event is reported to it
+        and a cancel aborts the file. changes_only (default: config) writes
+        only the events changed since the last export, see ExportManifest.
+        export_filter (default: the export settings) limits the export to
+        a date range, labels and sources.
+        """
+        writer = None
         try:
             if get_debug():
                 print("[Calendar] === _create_complete_ics_file START ===")
 
-            ics_lines = []
-            ics_lines.append("BEGIN:VCALENDAR")
-            ics_lines.append("VERSION:2.0")
-            ics_lines.append(
-                "PRODID:-//Calendar Planner v{0}//EN".format(__version__))
-            ics_lines.append("CALSCALE:GREGORIAN")
-            ics_lines.append("METHOD:PUBLISH")
+            # Components are streamed to disk, nothing is collected here
+            writer = ICSWriter(
+                output_path,
+                "-//Calendar Planner v{0}//EN".format(__version__))
+            writer.open()
 
             events_count = 0
             duplicate_count = 0
 
-            # Usa il duplicate checker
-            from .duplicate_checker import DuplicateChecker
+            # Keys of the events already written (title + day)
+            processed_events = DedupIndex()
 
-            # Cache per eventi già processati
-            processed_events = set()
+            if export_filter is None:
+                export_filter = ExportFilter.from_config()
+            if get_debug():
+                print("[Calendar] Export scope: " + export_filter.describe())
 
-            # 1. Add events from events.json
-            if hasattr(self, 'event_manager') and self.event_manager:
-                if get_debug():
-                    print("[Calendar] Adding events from events.json")
+            # UIDs and hashes of the previous export
+            manifest = ExportManifest(
+                "ics", changes_only, scoped=export_filter.is_scoped())
+
+            # Snapshot of the managers - no file is re-read
+            events, contacts = self._get_export_snapshot(export_filter)
+
+            # 1. Add events
+            if get_debug():
+                print("[Calendar] Adding %d events" % len(events))
+            if job is not None:
+                job.set_phase(_("Events"), len(events))
+            for event in events:
+                if job is not None:
+                    job.step()
                 try:
-                    events_file = join(self.DATA_PATH, "events.json")
-                    if exists(events_file):
-                        with open(events_file, 'r') as f:
-                            import json
-                            events_data = json.load(f)
+                    event_data = event.to_dict()
+                    if processed_events.has_day(event.title, event.date):
+                        duplicate_count += 1
+                        continue
 
-                        for event_data in events_data:
-                            try:
-                                # Controlla se è un duplicato usando
-                                # DuplicateChecker
-                                if DuplicateChecker.check_event_duplicate(
-                                        self.event_manager, event_data)[0]:
-                                    duplicate_count += 1
-                                    continue
-
-                                event_lines = self._create_ics_event_from_json(
-                                    event_data)
-                                if event_lines:
-                                    ics_lines.extend(event_lines)
-                                    events_count += 1
-                                    # Aggiungi all'evento processato
-                                    self._add_to_processed_events(
-                                        processed_events, event_lines)
-                            except Exception as e:
-                                print(
-                                    "[Calendar] Error converting event: " + str(e))
-                                continue
+                    event_lines = self._create_ics_event_from_json(event_data)
+                    if event_lines:
+                        if manifest.write_component(writer, event_lines):
+                            events_count += 1
+                        processed_events.add_day(event.title, event.date)
                 except Exception as e:
-                    print("[Calendar] Error reading events.json: " + str(e))
+                    print(
+                        "[Calendar] Error converting event: " + str(e))
+                    continue
 
             # 2. Add contact birthdays
             if get_debug():
                 print("[Calendar] Adding contact birthdays")
             birthday_count, birthday_duplicates = self._add_contacts_to_ics_with_dedup(
-                ics_lines, processed_events)
+                writer, processed_events, contacts, job, manifest)
             events_count += birthday_count
             duplicate_count += birthday_duplicates
             if get_debug():
@@ -3220,169 +3473,206 @@ class Calendar(Screen):
             # 3. Add events from imported ICS files
             if get_debug():
                 print("[Calendar] Adding imported ICS files")
-            ics_count, ics_duplicates = self._add_imported_ics_files_with_dedup(
-                ics_lines, processed_events)
-            events_count += ics_count
-            duplicate_count += ics_duplicates
-            if get_debug():
-                print(
-                    "[Calendar] Added " +
-                    str(ics_count) +
-                    " events from ICS files, " +
-                    str(ics_duplicates) +
-                    " duplicates skipped")
+            if export_filter.wants_source("ics"):
+                ics_count, ics_duplicates = self._add_imported_ics_files_with_dedup(
+                    writer, processed_events, job, manifest, export_filter)
+                events_count += ics_count
+                duplicate_count += ics_duplicates
+                if get_debug():
+                    print(
+                        "[Calendar] Added " +
+                        str(ics_count) +
+                        " events from ICS files, " +
+                        str(ics_duplicates) +
+                        " duplicates skipped")
+
+            # 4. Add holidays (off by default)
+            if export_filter.wants_source("holidays"):
+                holiday_count = self._add_holidays_to_ics(
+                    writer, processed_events, job, manifest, export_filter)
+                events_count += holiday_count
+                if get_debug():
+                    print("[Calendar] Added " + str(holiday_count) + " holidays")
 
-            ics_lines.append("END:VCALENDAR")
+            # 5. Cancel events deleted since the last export
+            if get_export_deletions():
+                cancelled_count = manifest.write_cancellations(writer)
+                events_count += cancelled_count
+                if get_debug() and cancelled_count:
+                    print("[Calendar] Cancelled " + str(cancelled_count) +
+                          " deleted events")
 
-            # Write to file
+            # Close the calendar and move the file into place
             if get_debug():
                 print(
                     "[Calendar] Writing to file, total events: " +
                     str(events_count))
                 print("[Calendar] Duplicates skipped: " + str(duplicate_count))
-            with open(output_path, 'w') as f:
-                f.write("\n".join(ics_lines))
+            writer.close()
+            manifest.save()
             if get_debug():
                 print("[Calendar] File created: " + output_path)
                 print("[Calendar] === _create_complete_ics_file END ===")
 
             return events_count
 
+        except ExportCancelled:
+            if writer is not None:
+                writer.abort()
+            raise
         except Exception as e:
             print("[Calendar] Complete ICS file error: " + str(e))
             import traceback
             traceback.print_exc()
+            if writer is not None:
+                writer.abort()
             return 0
 
-    def _add_to_processed_events(self, processed_set, event_lines):
-        """Add event to processed set for deduplication"""
-        key_parts = []
-        for line in event_lines:
-            if line.startswith("SUMMARY:"):
-                key_parts.append(line[8:].strip().lower())
-            elif line.startswith("DTSTART;"):
-                # Extract data from DTSTART;VALUE=DATE:YYYYMMDD
-                if ':' in line:
-                    date_part = line.split(':')[-1]
-                    if len(date_part) >= 8:
-                        key_parts.append(date_part[:8])
-        key = "|".join(key_parts)
-        if key:
-            processed_set.add(key)
-
-    def _add_contacts_to_ics_with_dedup(self, ics_lines, processed_events):
-        """Add contact birthdays with deduplication"""
-        try:
-            contacts_path = join(self.CONTACTS_PATH)
-            if get_debug():
-                print("[Calendar] Contacts path: " + contacts_path)
+    def _get_export_snapshot(self, export_filter=None):
+        """Events and contacts to export, from the loaded managers
 
-            if not exists(contacts_path):
-                return 0, 0
+        The lists are copied by reference, the export then works on a
+        consistent view while the managers keep changing. Storage is only
+        read when the event system is disabled. The export filter is
+        answered by the query indexes of the managers.
+        """
+        if export_filter is None:
+            export_filter = ExportFilter()
 
-            contacts_files = listdir(contacts_path)
+        if self.event_manager:
+            events = tuple(self.event_manager.query_events(export_filter))
+        else:
+            events = tuple(e for e in self._load_export_events()
+                           if export_filter.match_event(e))
+
+        if not export_filter.wants_source("birthdays"):
+            contacts = ()
+        elif self.birthday_manager:
+            contacts = tuple(self.birthday_manager.query_contacts(
+                export_filter, need_birthday=True))
+        else:
+            contacts = tuple(BirthdayManager().query_contacts(
+                export_filter, need_birthday=True))
+
+        if get_debug():
+            print("[Calendar] Export snapshot: %d events, %d contacts" % (
+                len(events), len(contacts)))
+        return events, contacts
+
+    def _load_export_events(self):
+        """Events from events.json (event system disabled)"""
+        events_file = join(self.DATA_PATH, "events.json")
+        if not exists(events_file):
+            return []
+        try:
+            with open(events_file, 'r') as f:
+                import json
+                return [Event.from_dict(data) for data in json.load(f)]
+        except Exception as e:
+            print("[Calendar] Error reading events.json: " + str(e))
+            return []
+
+    def _add_contacts_to_ics_with_dedup(
+            self, writer, processed_events, contacts, job=None, manifest=None):
+        """Add contact birthdays with deduplication"""
+        try:
             if get_debug():
-                print("[Calendar] Total contact files: " +
-                      str(len(contacts_files)))
+                print("[Calendar] Total contacts: " + str(len(contacts)))
+            if job is not None:
+                job.set_phase(_("Birthdays"), len(contacts))
 
             birthday_count = 0
             duplicate_count = 0
 
-            for filename in contacts_files:
-                if filename.endswith(".txt"):
-                    filepath = join(contacts_path, filename)
-                    try:
-                        with open(filepath, 'r') as f:
-                            content = f.read()
-
-                        # Parse contact data
-                        lines = content.split('\n')
-                        contact_data = {}
-                        for line in lines:
-                            line = line.strip()
-                            if ':' in line:
-                                key, value = line.split(':', 1)
-                                contact_data[key.strip()] = value.strip()
-
-                        # Check for birthday
-                        name = contact_data.get('FN', '')
-                        birthday = contact_data.get('BDAY', '')
-
-                        if name and birthday and len(
-                                birthday) == 10:  # YYYY-MM-DD
-                            # Controlla se è già stato processato
-                            event_key = "{}|{}".format(
-                                name.lower(), birthday.replace('-', ''))
-                            if event_key in processed_events:
-                                duplicate_count += 1
-                                continue
+            for contact_data in contacts:
+                if job is not None:
+                    job.step()
+                try:
+                    # Check for birthday
+                    name = contact_data.get('FN', '')
+                    birthday = contact_data.get('BDAY', '')
+
+                    if name and birthday and len(
+                            birthday) == 10:  # YYYY-MM-DD
+                        # Controlla se è già stato processato
+                        if processed_events.has_day(name, birthday):
+                            duplicate_count += 1
+                            continue
 
-                            # Create birthday event
-                            bday_lines = []
-                            bday_lines.append("BEGIN:VEVENT")
-                            bday_lines.append(
-                                "SUMMARY:" + name + " - Birthday")
+                        # Create birthday event
+                        bday_lines = []
+                        bday_lines.append("BEGIN:VEVENT")
+                        bday_lines.append(
+                            "SUMMARY:" + escape_text(name + " - Birthday"))
+                        bday_lines.append(
+                            "DTSTART;VALUE=DATE:" +
+                            birthday.replace(
+                                '-',
+                                ''))
+                        bday_lines.append(
+                            "DTEND;VALUE=DATE:" +
+                            birthday.replace(
+                                '-',
+                                ''))
+                        bday_lines.append("RRULE:FREQ=YEARLY")
+
+                        # Add contact info
+                        description = ""
+                        phone = contact_data.get('TEL', '')
+                        email = contact_data.get('EMAIL', '')
+
+                        if phone:
+                            description += "Phone: " + \
+                                phone.replace('|', ', ') + "\n"
+                        if email:
+                            description += "Email: " + \
+                                email.replace('|', ', ') + "\n"
+
+                        if description:
                             bday_lines.append(
-                                "DTSTART;VALUE=DATE:" +
-                                birthday.replace(
-                                    '-',
-                                    ''))
-                            bday_lines.append(
-                                "DTEND;VALUE=DATE:" +
-                                birthday.replace(
-                                    '-',
-                                    ''))
-                            bday_lines.append("RRULE:FREQ=YEARLY")
+                                "DESCRIPTION:" + escape_text(description))
 
-                            # Add contact info
-                            description = ""
-                            phone = contact_data.get('TEL', '')
-                            email = contact_data.get('EMAIL', '')
-
-                            if phone:
-                                description += "Phone: " + \
-                                    phone.replace('|', ', ') + "\\n"
-                            if email:
-                                description += "Email: " + \
-                                    email.replace('|', ', ') + "\\n"
+                        # Generate UID
+                        import hashlib
+                        uid_base = "birthday-" + birthday + "-" + name
+                        uid_hash = hashlib.md5(
+                            uid_base.encode()).hexdigest()[:8]
+                        bday_lines.append("UID:" + uid_hash)
 
-                            if description:
-                                bday_lines.append("DESCRIPTION:" + description)
+                        bday_lines.append("END:VEVENT")
 
-                            # Generate UID
-                            import hashlib
-                            uid_base = "birthday-" + birthday + "-" + name
-                            uid_hash = hashlib.md5(
-                                uid_base.encode()).hexdigest()[:8]
-                            bday_lines.append("UID:" + uid_hash)
-
-                            bday_lines.append("END:VEVENT")
-
-                            # Add to ICS lines
-                            ics_lines.extend(bday_lines)
+                        # Write to the export
+                        if manifest is None:
+                            writer.write_component(bday_lines)
+                            birthday_count += 1
+                        elif manifest.write_component(writer, bday_lines):
                             birthday_count += 1
-                            processed_events.add(event_key)
+                        processed_events.add_day(name, birthday)
 
-                    except Exception as e:
-                        print(
-                            "[Calendar] Error processing contact " +
-                            filename +
-                            ": " +
-                            str(e))
-                        continue
+                except Exception as e:
+                    print(
+                        "[Calendar] Error processing contact " +
+                        str(contact_data.get('id', '')) +
+                        ": " +
+                        str(e))
+                    continue
             if get_debug():
                 print(
                     "[Calendar] Total birthdays added: " +
                     str(birthday_count))
             return birthday_count, duplicate_count
 
+        except ExportCancelled:
+            raise
         except Exception as e:
             print("[Calendar] Error adding contacts to ICS: " + str(e))
             import traceback
             traceback.print_exc()
             return 0, 0
 
-    def _add_imported_ics_files_with_dedup(self, ics_lines, processed_events):
+    def _add_imported_ics_files_with_dedup(
+            self, writer, processed_events, job=None, manifest=None,
+            export_filter=None):
         """Add events from imported ICS files with deduplication"""
         try:
             ics_files = []
@@ -3395,73 +3685,92 @@ class Calendar(Screen):
             for base_path in possible_paths:
                 if exists(base_path):
                     for filename in listdir(base_path):
-                        if filename.lower().endswith('.ics'):
+                        if filename.lower().endswith(('.ics', '.ics.gz')):
                             ics_files.append(join(base_path, filename))
             if get_debug():
                 print("[Calendar] Found ICS files: %d" % len(ics_files))
 
             events_count = 0
             duplicate_count = 0
-
-            for ics_file in ics_files:
-                try:
-                    with open(ics_file, 'r') as f:
-                        content = f.read()
-
-                    # Extract all VEVENT blocks
-                    import re
-                    vevent_blocks = re.split(
-                        r'BEGIN:VEVENT\s*', content, flags=re.IGNORECASE)
-
-                    for block in vevent_blocks:
-                        if not block.strip() or 'END:VEVENT' not in block.upper():
-                            continue
-
-                        title = ''
-                        date_str = ''
-
-                        for line in block.split('\n'):
-                            line = line.strip()
-                            if line.upper().startswith('SUMMARY:'):
-                                title = line[8:].strip()
-                            elif line.upper().startswith('DTSTART;'):
-                                if ':' in line:
-                                    dt_value = line.split(':')[-1]
-                                    if len(dt_value) >= 8:
-                                        date_str = dt_value[:8]  # YYYYMMDD
-
-                        if title and date_str:
-                            # Check for duplicates
-                            event_key = "%s|%s" % (title.lower(), date_str)
-                            if event_key in processed_events:
-                                duplicate_count += 1
-                                continue
-
-                            # Add the entire VEVENT block
-                            ics_lines.append("BEGIN:VEVENT")
-                            for line in block.split('\n'):
-                                line = line.strip()
-                                if line and 'END:VEVENT' not in line.upper():
-                                    ics_lines.append(line)
-                            ics_lines.append("END:VEVENT")
-
-                            events_count += 1
-                            processed_events.add(event_key)
-
-                except Exception as e:
-                    print(
-                        "[Calendar] Error processing ICS file %s: %s" %
-                        (basename(ics_file), str(e)))
+            if job is not None:
+                job.set_phase(_("Imported ICS files"))
+
+            # Parsed cache: only new or changed files are parsed
+            scoped = export_filter is not None and export_filter.is_scoped()
+            for title, date_str, lines in ics_manager.iter_archive_events(ics_files):
+                if job is not None:
+                    job.step()
+                if scoped and not export_filter.match_component(date_str, lines):
+                    continue
+                # Check for duplicates
+                if processed_events.has_day(title, date_str):
+                    duplicate_count += 1
                     continue
 
+                # Add the entire VEVENT component
+                if manifest is None:
+                    writer.write_component(lines)
+                    events_count += 1
+                elif manifest.write_component(
+                        writer, lines, processed_events.day_key(title, date_str)):
+                    events_count += 1
+                processed_events.add_day(title, date_str)
+
             return events_count, duplicate_count
 
+        except ExportCancelled:
+            raise
         except Exception as e:
             print("[Calendar] Error adding imported ICS files: %s" % str(e))
             import traceback
             traceback.print_exc()
             return 0, 0
 
+    def _add_holidays_to_ics(
+            self, writer, processed_events, job=None, manifest=None,
+            export_filter=None):
+        """Add the holidays of the export range as all-day events"""
+        try:
+            date_from = export_filter.date_from if export_filter else ""
+            date_to = export_filter.date_to if export_filter else ""
+            holidays = HolidaysManager(self.language).get_holidays_in_range(
+                date_from, date_to)
+            if job is not None:
+                job.set_phase(_("Holidays"), len(holidays))
+
+            import hashlib
+            holiday_count = 0
+            for date_str, holiday in holidays:
+                if job is not None:
+                    job.step()
+                if processed_events.has_day(holiday, date_str):
+                    continue
+                day = date_str.replace('-', '')
+                uid_hash = hashlib.md5(
+                    ("holiday-" + date_str + "-" + holiday).encode()).hexdigest()[:8]
+                lines = [
+                    "BEGIN:VEVENT",
+                    "SUMMARY:" + escape_text(holiday),
+                    "DTSTART;VALUE=DATE:" + day,
+                    "DTEND;VALUE=DATE:" + day,
+                    "CATEGORIES:holiday",
+                    "UID:holiday-" + uid_hash,
+                    "END:VEVENT",
+                ]
+                if manifest is None:
+                    writer.write_component(lines)
+                    holiday_count += 1
+                elif manifest.write_component(writer, lines):
+                    holiday_count += 1
+                processed_events.add_day(holiday, date_str)
+            return holiday_count
+
+        except ExportCancelled:
+            raise
+        except Exception as e:
+            print("[Calendar] Error adding holidays to ICS: " + str(e))
+            return 0
+
     def _create_ics_event_from_json(self, event_data):
         """Create ICS event lines from JSON event data"""
         try:
@@ -3471,14 +3780,12 @@ class Calendar(Screen):
             time_str = event_data.get('time', get_default_event_time())
             description = event_data.get('description', '')
             repeat = event_data.get('repeat', '')
-            enabled = event_data.get('enabled', True)
 
             if not title or not date_str:
                 return None
 
-            # Skip disabled events
-            if not enabled:
-                return None
+            # Disabled events are left out by the export filter
+            # (export_enabled_only)
 
             # Format date for ICS
             date_parts = date_str.split('-')
@@ -3495,16 +3802,14 @@ class Calendar(Screen):
 
             event_lines = []
             event_lines.append("BEGIN:VEVENT")
-            event_lines.append("SUMMARY:" + title)
+            event_lines.append("SUMMARY:" + escape_text(title))
             event_lines.append("DTSTART:" + dtstart)
 
             # Calculate end time (1 hour duration by default)
             event_lines.append("DTEND:" + dtstart[:-4] + "0100")  # +1 hour
 
             if description:
-                # Escape newlines for ICS
-                desc_escaped = description.replace("\n", "\\n")
-                event_lines.append("DESCRIPTION:" + desc_escaped)
+                event_lines.append("DESCRIPTION:" + escape_text(description))
 
             # Add repeat rules if applicable
             if repeat == "daily":
@@ -3833,6 +4138,11 @@ class Calendar(Screen):
         else:
             current_month_holidays = {}
 
+        # ICS database: days with data, from the month bucket index only
+        ics_days = set()
+        if self.database_format == "ics" and config.plugins.calendar.events_show_indicators.value:
+            ics_days = set(self.ics_store.get_days(self.year, self.month))
+
         for x in range(42):
             self['d' + str(x)].setText('')
             self['d' + str(x)].instance.clearForegroundColor()
@@ -3873,11 +4183,13 @@ class Calendar(Screen):
 
                     # Check for events (priority 2 - only if not a holiday)
                     has_events = False
-                    if not is_holiday and self.event_manager and config.plugins.calendar.events_show_indicators.value:
-                        date_str = "{0}-{1:02d}-{2:02d}".format(
-                            self.year, self.month, i)
-                        day_events = self.event_manager.get_events_for_date(
-                            date_str)
+                    if not is_holiday and config.plugins.calendar.events_show_indicators.value:
+                        day_events = i in ics_days
+                        if not day_events and self.event_manager:
+                            date_str = "{0}-{1:02d}-{2:02d}".format(
+                                self.year, self.month, i)
+                            day_events = self.event_manager.get_events_for_date(
+                                date_str)
 
                         if day_events:
                             has_events = True
@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Fast pre-scan of vCard / ICS files before an import.
+
+The file is memory-mapped and the record boundaries (BEGIN:VCARD,
+BEGIN:VEVENT at the start of a line, any case) are found on the raw bytes
+by one compiled pattern: no decoding, no line objects, no copy of the
+file. A scan returns the record count and, on request, the byte offset of
+every BEGIN line in a compact array, used to split the file into byte
+ranges for the parser pool and for exact progress totals.
+
+Gzip-compressed files and boxes without mmap are scanned in blocks of
+decompressed/read data with the same pattern; offsets then refer to the
+uncompressed content, like the bytes_read of the importers.
+"""
+from __future__ import print_function
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+from .config_manager import get_debug
+from .ics_parser import get_content_size, open_ics_binary
+
+try:
+    import mmap
+except ImportError:
+    mmap = None
+
+RECORD_MARKERS = {
+    'vcard': (b'BEGIN:VCARD', b'END:VCARD'),
+    'vevent': (b'BEGIN:VEVENT', b'END:VEVENT'),
+}
+
+SCAN_BLOCK = 1 << 20    # bytes per block without mmap
+
+# Marker at the start of a line, case-insensitive, not a longer name
+_PATTERNS = {}
+
+
+def _get_pattern(kind):
+    pattern = _PATTERNS.get(kind)
+    if pattern is None:
+        begin = RECORD_MARKERS[kind][0]
+        pattern = re.compile(b'(?i)\n' + re.escape(begin) + b'\\b')
+        _PATTERNS[kind] = pattern
+    return pattern
+
+
+def _starts_with_marker(data, kind):
+    """Marker on the first line (no newline before it)"""
+    begin = RECORD_MARKERS[kind][0]
+    head = bytes(data[:len(begin) + 1])
+    return (head[:len(begin)].upper() == begin and
+            (len(head) == len(begin) or not head[-1:].isalnum()))
+
+
+class RecordScan:
+    """Records found by scan_records()
+
+    offsets (array of int, None for a count-only scan) holds the byte
+    offset of every BEGIN line in file order.
+    """
+
+    def __init__(self, kind, count, offsets, file_size):
+        self.kind = kind
+        self.count = count
+        self.offsets = offsets
+        self.file_size = file_size
+
+    def chunk_ranges(self, chunk_records, start_offset=0):
+        """(start, end, records) byte ranges of chunk_records records
+
+        A range ends where the next one starts (the last at the end of
+        the file); records before start_offset are skipped.
+        """
+        offsets = self.offsets
+        first = bisect_left(offsets, start_offset)
+        for index in range(first, len(offsets), chunk_records):
+            following = index + chunk_records
+            if following < len(offsets):
+                yield offsets[index], offsets[following], chunk_records
+            else:
+                yield offsets[index], self.file_size, len(offsets) - index
+
+
+def _scan_mapped(data, kind, with_offsets):
+    pattern = _get_pattern(kind)
+    first = [0] if _starts_with_marker(data, kind) else []
+    if with_offsets:
+        # 64 bit items: 8 bytes per record, also for files over 2 GB
+        offsets = array('q', first)
+        offsets.extend(match.start() + 1 for match in pattern.finditer(data))
+        return len(offsets), offsets
+    return len(first) + len(pattern.findall(data)), None
+
+
+def _scan_stream(f, kind, with_offsets):
+    """Block-wise scan; the tail of each block is kept for markers
+    crossing the block boundary"""
+    pattern = _get_pattern(kind)
+    # New line, marker and the byte checked by \b after it
+    keep = len(RECORD_MARKERS[kind][0]) + 2
+    offsets = array('q') if with_offsets else None
+    count = 0
+    # A new line in front stands for the start of the file
+    base = -1           # file offset of data[0]
+    data = b'\n' + f.read(SCAN_BLOCK)
+    while data:
+        block = f.read(SCAN_BLOCK)
+        # Matches from limit on are found again with the next block
+        limit = len(data) if not block else max(0, len(data) - keep + 1)
+        for match in pattern.finditer(data):
+            if match.start() >= limit:
+                break
+            count += 1
+            if with_offsets:
+                offsets.append(base + match.start() + 1)
+        if not block:
+            break
+        tail = data[limit:]
+        base += limit
+        data = tail + block
+    return count, offsets
+
+
+def scan_records(filepath, kind, with_offsets=True):
+    """Count the records of a vCard ('vcard') or ICS ('vevent') file
+
+    Returns a RecordScan; with_offsets=False only counts (faster, no
+    memory for the offsets).
+    """
+    start = time.time()
+    file_size = get_content_size(filepath)
+    count = 0
+    offsets = array('q') if with_offsets else None
+
+    if file_size:
+        if mmap is not None and not filepath.endswith('.gz'):
+            with open(filepath, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    count, offsets = _scan_mapped(data, kind, with_offsets)
+                finally:
+                    data.close()
+        else:
+            with open_ics_binary(filepath) as f:
+                count, offsets = _scan_stream(f, kind, with_offsets)
+
+    if get_debug():
+        print("[PreScan] {0}: {1} {2} records in {3:.3f}s".format(
+            filepath, count, kind, time.time() - start))
+    return RecordScan(kind, count, offsets, file_size)
+
+
+def count_records(filepath, kind):
+    """Number of records, 0 when the file cannot be read"""
+    try:
+        return scan_records(filepath, kind, with_offsets=False).count
+    except Exception as e:
+        print("[PreScan] Error scanning {0}: {1}".format(filepath, e))
+        return 0
+
+
+def count_lines(filepath):
+    """Number of line breaks of a file, on the raw bytes"""
+    count = 0
+    with open(filepath, 'rb') as f:
+        while True:
+            block = f.read(SCAN_BLOCK)
+            if not block:
+                break
+            count += block.count(b'\n')
+    return count
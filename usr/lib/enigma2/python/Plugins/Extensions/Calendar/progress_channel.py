@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+###########################################################
+#  Calendar Planner for Enigma2 v1.9                      #
+#  Created by: Lululla                                    #
+###########################################################
+
+Last Updated: 2026-01-15
+Status: Stable with complete vCard & ICS support
+Credits: Lululla
+Homepage: www.corvoboys.org www.linuxsat-support.com
+###########################################################
+
+Progress channel between importer threads and the progress screens.
+
+Workers only post snapshots: progress goes into a single slot (the newest
+snapshot replaces the previous one), the final snapshot into a queue. The
+screen drains the channel on an eTimer, so widgets are only touched from
+the main loop and at most once per refresh interval, however fast the
+worker reports.
+"""
+from __future__ import print_function
+from collections import deque
+
+from .config_manager import get_debug
+
+REFRESH_INTERVAL = 200  # ms between screen updates
+
+
+class ProgressChannel:
+    """Deliver importer progress on the enigma2 main loop
+
+    The callback receives the snapshot tuple posted by the worker; by the
+    importer convention its last item is the finished flag. After the
+    finished snapshot has been delivered the channel stops.
+    """
+
+    def __init__(self, callback, interval_ms=REFRESH_INTERVAL):
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.latest = None      # newest progress snapshot
+        self.final = deque()    # finished snapshot (thread safe append)
+        self.timer = None
+        self.timer_conn = None
+
+    def report(self, *snapshot):
+        """Worker side: post a snapshot - never touches the UI"""
+        if snapshot and snapshot[-1]:
+            self.final.append(snapshot)
+        else:
+            # Single reference assignment, newest value wins
+            self.latest = snapshot
+
+    def start(self):
+        """Main loop side: start draining the channel"""
+        from enigma import eTimer
+        self.timer = eTimer()
+        try:
+            self.timer_conn = self.timer.timeout.connect(self.drain)
+        except AttributeError:
+            self.timer.callback.append(self.drain)
+        self.timer.start(self.interval_ms, False)
+
+    def stop(self):
+        """Stop draining, pending snapshots are dropped"""
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+            self.timer_conn = None
+
+    def drain(self):
+        """Deliver the newest snapshot, or the final one and stop"""
+        if self.final:
+            snapshot = self.final.popleft()
+            self.latest = None
+            self.stop()
+        else:
+            snapshot = self.latest
+            self.latest = None
+            if snapshot is None:
+                return
+
+        try:
+            self.callback(*snapshot)
+        except Exception as e:
+            print("[ProgressChannel] Callback error: {0}".format(e))
+            if get_debug():
+                import traceback
+                traceback.print_exc()
@@ -14,9 +14,10 @@ Homepage: www.corvoboys.org www.linuxsat-support.com
 """
 from __future__ import print_function
 
+import os
 import time
 from datetime import datetime
-from re import split, IGNORECASE, search, sub
+from re import search, sub
 from os.path import basename, exists, getsize, join, getmtime
 
 from enigma import eTimer, getDesktop
@@ -28,14 +29,39 @@ from Components.ActionMap import ActionMap
 from Components.ProgressBar import ProgressBar
 
 from . import _
-from .config_manager import get_debug
+from .config_manager import (
+    get_csv_layout,
+    get_debug,
+    get_import_parse_thread,
+    get_import_time_budget,
+)
 from .formatters import (
     parse_vcard_phone,
     parse_vcard_email,
     clean_field_storage,
 )
+from .csv_io import (
+    CONTACT_LAYOUTS,
+    CSVSource,
+    contact_to_row,
+    count_csv_rows,
+    detect_csv_kind,
+    is_csv_file,
+    iter_csv_contacts,
+    write_csv,
+)
+from .export_job import ExportCancelled
+from .export_filter import ExportFilter
+from .export_manifest import ExportManifest
+from .import_checkpoint import ImportCheckpoint
+from .ics_parser import unfold_raw_lines
+from .import_pipeline import CommitStage, FileSource, ImportPipeline, PipelineStage
+from .parallel_parser import get_worker_count, iter_parsed_records
+from .prescan import count_records
+from .progress_channel import ProgressChannel
 from .duplicate_checker import (
     DuplicateChecker,
+    merge_contact_fields,
     run_complete_cleanup,
 )
 
@@ -43,116 +69,6 @@ from .duplicate_checker import (
 class VCardFileImporter:
     """Main vCard file importer - unified class with static methods"""
 
-    # Static shared cache for all imports
-    _contacts_cache = set()
-    _cache_initialized = False
-
-    @staticmethod
-    def init_cache(birthday_manager):
-        """Initialize cache with existing contacts"""
-        if VCardFileImporter._cache_initialized:
-            return
-
-        if get_debug():
-            print("[VCardCache] Initializing cache...")
-
-        for contact in birthday_manager.contacts:
-            # Create multiple keys for better matching
-            name = contact.get('FN', '').strip().lower()
-            bday = contact.get('BDAY', '').strip()
-            phone = contact.get('TEL', '').strip()
-            email = contact.get('EMAIL', '').strip().lower()
-
-            if name:
-                # 1. Full name
-                VCardFileImporter._contacts_cache.add("name:" + name)
-
-                # 2. Name + birthday (if present)
-                if bday:
-                    VCardFileImporter._contacts_cache.add(
-                        "name_bday:" + name + ":" + bday)
-
-                # 3. Phone (if present)
-                if phone:
-                    clean_phone = ''.join(
-                        c for c in phone if c.isdigit() or c == '+')
-                    if clean_phone:
-                        VCardFileImporter._contacts_cache.add(
-                            "phone:" + clean_phone)
-
-                # 4. Email (if present)
-                if email and '@' in email:
-                    VCardFileImporter._contacts_cache.add("email:" + email)
-
-        VCardFileImporter._cache_initialized = True
-
-        if get_debug():
-            print("[VCardCache] Cache initialized with {0} entries".format(
-                len(VCardFileImporter._contacts_cache)))
-
-    @staticmethod
-    def clear_cache():
-        """Clear cache"""
-        VCardFileImporter._contacts_cache.clear()
-        VCardFileImporter._cache_initialized = False
-        if get_debug():
-            print("[VCardCache] Cache cleared")
-
-    @staticmethod
-    def add_to_cache(contact_data):
-        """Add new contact to cache"""
-        name = contact_data.get('FN', '').strip().lower()
-        bday = contact_data.get('BDAY', '').strip()
-        phone = contact_data.get('TEL', '').strip()
-        email = contact_data.get('EMAIL', '').strip().lower()
-
-        if name:
-            VCardFileImporter._contacts_cache.add("name:" + name)
-
-            if bday:
-                VCardFileImporter._contacts_cache.add(
-                    "name_bday:" + name + ":" + bday)
-
-            if phone:
-                clean_phone = ''.join(
-                    c for c in phone if c.isdigit() or c == '+')
-                if clean_phone:
-                    VCardFileImporter._contacts_cache.add(
-                        "phone:" + clean_phone)
-
-            if email and '@' in email:
-                VCardFileImporter._contacts_cache.add("email:" + email)
-
-    @staticmethod
-    def is_duplicate_by_cache(contact_data):
-        """Check duplicate using cache O(1)"""
-        name = contact_data.get('FN', '').strip().lower()
-        bday = contact_data.get('BDAY', '').strip()
-        phone = contact_data.get('TEL', '').strip()
-        email = contact_data.get('EMAIL', '').strip().lower()
-
-        # 1. Check by full name
-        if name and "name:" + name in VCardFileImporter._contacts_cache:
-            return True, "name"
-
-        # 2. Check by name + birthday
-        if name and bday and "name_bday:" + name + ":" + \
-                bday in VCardFileImporter._contacts_cache:
-            return True, "name_birthday"
-
-        # 3. Check by phone
-        if phone:
-            clean_phone = ''.join(c for c in phone if c.isdigit() or c == '+')
-            if clean_phone and "phone:" + clean_phone in VCardFileImporter._contacts_cache:
-                return True, "phone"
-
-        # 4. Check by email
-        if email and '@' in email and "email:" + \
-                email in VCardFileImporter._contacts_cache:
-            return True, "email"
-
-        return False, None
-
     @staticmethod
     def normalize_contact_data(contact_data):
         """Normalize contact data for comparison"""
@@ -201,212 +117,143 @@ class VCardFileImporter:
 
     @staticmethod
     def count_contacts(filepath):
-        """Count contacts in vCard file"""
-        contact_count = 0
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                # Read file in chunks for efficiency
-                chunk_size = 1024 * 1024  # 1MB chunks
-                buffer = ''
-
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-
-                    buffer += chunk
-
-                    # Count BEGIN:VCARD occurrences in buffer
-                    while 'BEGIN:VCARD' in buffer.upper():
-                        contact_count += 1
-                        # Find position and remove counted part
-                        pos = buffer.upper().find('BEGIN:VCARD')
-                        # Move past this BEGIN:VCARD
-                        buffer = buffer[pos + len('BEGIN:VCARD'):]
-
-                # Count any remaining in final buffer
-                contact_count += buffer.upper().count('BEGIN:VCARD')
-            if get_debug():
-                print(
-                    "[VCardFileImporter] Counted {0} contacts in {1}".format(
-                        contact_count, filepath))
-            return contact_count
+        """Count contacts in vCard file (pre-scan of the raw bytes)"""
+        if is_csv_file(filepath):
+            return count_csv_rows(filepath)
+        return count_records(filepath, 'vcard')
 
-        except Exception as e:
-            print("[VCardFileImporter] Error counting contacts: {0}".format(e))
-            # Fallback: quick count from file start
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read(1000000)  # Read first 1MB
-                    return max(content.count('BEGIN:VCARD'),
-                               content.count('BEGIN:VCARD\r\n'),
-                               content.count('BEGIN:VCARD\n'))
-            except BaseException:
-                return 0
+    @staticmethod
+    def unfold_lines(lines):
+        """Join RFC 6350 folded lines (leading space/tab) to logical lines"""
+        logical = None
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if logical is not None and line[:1] in (' ', '\t'):
+                logical += line[1:]
+                continue
+            if logical is not None:
+                yield logical
+            logical = line
+        if logical is not None:
+            yield logical
+
+    @staticmethod
+    def iter_vcard_file(filepath, start_offset=0):
+        """Stream contacts from a vCard file, one card in memory at a time
+
+        Yields (contact_data, bytes_read, file_size) for every card found;
+        contact_data is None when the card has no usable name. A resumed
+        import starts reading at start_offset.
+        """
+        file_size = getsize(filepath)
+        bytes_read = start_offset
+        card_lines = None
+
+        with open(filepath, 'rb') as f:
+            if start_offset:
+                f.seek(start_offset)
+            for raw_line in f:
+                bytes_read += len(raw_line)
+                marker = raw_line.strip().upper()
+
+                if marker == b'BEGIN:VCARD':
+                    card_lines = []
+                elif card_lines is None:
+                    continue
+                elif marker == b'END:VCARD':
+                    try:
+                        # Unfolded on the bytes: folds can split UTF-8
+                        contact_data = VCardFileImporter.parse_vcard_lines(
+                            unfold_raw_lines(card_lines))
+                    except Exception as e:
+                        print(
+                            "[VCardFileImporter] Error parsing card: {0}".format(e))
+                        contact_data = None
+                    card_lines = None
+                    yield contact_data, bytes_read, file_size
+                else:
+                    card_lines.append(raw_line)
+
+    @staticmethod
+    def iter_contacts(filepath, start_offset=0):
+        """Stream parsed contacts, using the parser pool when configured"""
+        if is_csv_file(filepath):
+            return iter_csv_contacts(filepath, start_offset)
+        if get_worker_count() > 1:
+            return iter_parsed_records(
+                filepath, 'vcard', start_offset=start_offset)
+        return VCardFileImporter.iter_vcard_file(filepath, start_offset)
+
+    @staticmethod
+    def estimate_total(current, bytes_read, file_size):
+        """Estimate the number of cards from the bytes consumed so far"""
+        if current <= 0 or bytes_read <= 0:
+            return 0
+        if bytes_read >= file_size:
+            return current
+        return max(current, int(round(current * float(file_size) / bytes_read)))
 
     @staticmethod
     def import_file_sync(birthday_manager, filepath, progress_callback=None):
-        """Import contacts from vCard file synchronously - OPTIMIZED"""
+        """Import contacts from a vCard or CSV file synchronously
+
+        Runs the same pipeline as VCardFileImporterThread (normalize,
+        dedup, batched commit) in the calling thread. progress_callback
+        gets (progress, current, total, imported, updated, skipped,
+        errors) after each card and cancels the import by returning False.
+        """
         if get_debug():
             print(
-                "[VCardFileImporter] Starting optimized import from: {0}".format(filepath))
+                "[VCardFileImporter] Starting import from: {0}".format(filepath))
 
         if not exists(filepath):
             if get_debug():
                 print("[VCardFileImporter] ERROR: File not found")
             return 0, 0, 0, 1
 
-        imported = 0
-        updated = 0
-        skipped = 0
-        errors = 0
-
-        try:
-            # INITIALIZE CACHE
-            VCardFileImporter.init_cache(birthday_manager)
-
-            # Count total contacts
-            total = VCardFileImporter.count_contacts(filepath)
-            if get_debug():
-                print(
-                    "[VCardFileImporter] Total contacts found: {0}".format(total))
-                print("[VCardCache] Using cache with {0} entries".format(
-                    len(VCardFileImporter._contacts_cache)))
-
-            if total == 0:
-                if progress_callback:
-                    progress_callback(1.0, 0, 0, 0, 0, 0, 0)
-                return 0, 0, 0, 0
-
-            # Read file content
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            # Split by VCARD blocks
-            vcard_blocks = split(r'BEGIN:VCARD\s*', content, flags=IGNORECASE)
-            if get_debug():
-                print(
-                    "[VCardFileImporter] Found {0} blocks".format(
-                        len(vcard_blocks)))
-
-            current = 0
-            for block in vcard_blocks:
-                if not block.strip() or 'END:VCARD' not in block.upper():
-                    continue
-
-                current += 1
-
-                # Update progress
-                if progress_callback:
-                    progress = float(current) / total if total > 0 else 0
-                    if not progress_callback(
-                            progress,
-                            current,
-                            total,
-                            imported,
-                            updated,
-                            skipped,
-                            errors):
-                        if get_debug():
-                            print("[VCardFileImporter] Import cancelled by user")
-                        break
-
-                try:
-                    # Parse vCard block
-                    contact_data = VCardFileImporter.parse_vcard_block(block)
-
-                    if not contact_data:
-                        errors += 1
-                        continue
-
-                    # FAST DUPLICATE CHECK WITH CACHE (O(1))
-                    is_duplicate, duplicate_type = VCardFileImporter.is_duplicate_by_cache(
-                        contact_data)
+        stages = ContactImportStages(birthday_manager)
+        counts = {'current': 0, 'imported': 0, 'updated': 0, 'skipped': 0,
+                  'error': 0}
 
-                    if is_duplicate:
-                        if get_debug():
-                            print(
-                                "[VCardCache] Duplicate found via cache ({0}): {1}".format(
-                                    duplicate_type, contact_data.get(
-                                        'FN', 'Unknown')))
-
-                        # Try to update existing contact (merge data)
-                        updated_id = VCardFileImporter.update_existing_contact(
-                            birthday_manager, contact_data)
-
-                        if updated_id:
-                            updated += 1
-                            if get_debug():
-                                print(
-                                    "[VCardFileImporter] Updated contact: {0}".format(
-                                        contact_data.get(
-                                            'FN', 'Unknown')))
-                        else:
-                            skipped += 1
-                            if get_debug():
-                                print(
-                                    "[VCardFileImporter] Skipped exact duplicate: {0}".format(
-                                        contact_data.get(
-                                            'FN', 'Unknown')))
-                        continue
-
-                    # If not duplicate, check with DuplicateChecker (slower but
-                    # thorough)
-                    contact_exists_check, reason = DuplicateChecker.contact_exists(
-                        birthday_manager, contact_data)
-                    if contact_exists_check:
-                        # Try to update
-                        updated_id = VCardFileImporter.update_existing_contact(
-                            birthday_manager, contact_data)
-
-                        if updated_id:
-                            updated += 1
-                            if get_debug():
-                                print(
-                                    "[VCardFileImporter] Updated contact after detailed check: {0}".format(
-                                        contact_data.get(
-                                            'FN', 'Unknown')))
-                        else:
-                            skipped += 1
-                            if get_debug():
-                                print(
-                                    "[VCardFileImporter] Skipped duplicate ({0}): {1}".format(
-                                        reason, contact_data.get(
-                                            'FN', 'Unknown')))
-                        continue
-
-                    # Save new contact
-                    contact_id = birthday_manager.save_contact(contact_data)
-                    if contact_id:
-                        imported += 1
-                        # ADD TO CACHE
-                        VCardFileImporter.add_to_cache(contact_data)
-
-                        if get_debug():
-                            print(
-                                "[VCardFileImporter] Imported new contact: {0}".format(
-                                    contact_data.get(
-                                        'FN', 'Unknown')))
-                    else:
-                        errors += 1
+        def record_done(record):
+            counts['current'] += 1
+            if record.status in counts:
+                counts[record.status] += 1
+            else:
+                counts['error'] += 1
+            if progress_callback:
+                progress = float(record.bytes_read) / \
+                    record.file_size if record.file_size > 0 else 0
+                total = VCardFileImporter.estimate_total(
+                    counts['current'], record.bytes_read, record.file_size)
+                if not progress_callback(
+                        progress,
+                        counts['current'],
+                        total,
+                        counts['imported'],
+                        counts['updated'],
+                        counts['skipped'],
+                        counts['error']):
+                    if get_debug():
+                        print("[VCardFileImporter] Import cancelled by user")
+                    pipeline.cancel()
 
-                except Exception as e:
-                    print(
-                        "[VCardFileImporter] ERROR importing contact #{0}: {1}".format(
-                            current, str(e)))
-                    errors += 1
+        try:
+            pipeline = stages.create_pipeline(filepath, on_record=record_done)
+            pipeline.run()
+            # Cancelled imports keep the contacts processed so far
+            stages.flush_pending_updates()
 
-            # Clear cache after import
-            VCardFileImporter.clear_cache()
+            if progress_callback and counts['current'] == 0:
+                progress_callback(1.0, 0, 0, 0, 0, 0, 0)
 
+            result = (counts['imported'], counts['updated'],
+                      counts['skipped'], counts['error'])
             if get_debug():
                 print(
                     "[VCardFileImporter] Import completed. Result: imported={0}, updated={1}, skipped={2}, errors={3}".format(
-                        imported,
-                        updated,
-                        skipped,
-                        errors))
-            return imported, updated, skipped, errors
+                        *result))
+            return result
 
         except Exception as e:
             print(
@@ -418,7 +265,13 @@ class VCardFileImporter:
 
     @staticmethod
     def parse_vcard_block(block):
-        """Parse a single vCard block into contact data – FIX spacing issue"""
+        """Parse a single vCard block into contact data"""
+        return VCardFileImporter.parse_vcard_lines(
+            VCardFileImporter.unfold_lines(block.split('\n')))
+
+    @staticmethod
+    def parse_vcard_lines(lines):
+        """Parse unfolded vCard lines into contact data – FIX spacing issue"""
         contact = {
             'FN': '',           # Formatted Name
             'BDAY': '',         # Birthday
@@ -432,7 +285,6 @@ class VCardFileImporter:
             'URL': '',          # Website
         }
 
-        lines = block.split('\n')
         phones = []      # Store multiple phone numbers
         emails = []      # Store multiple email addresses
 
@@ -444,10 +296,6 @@ class VCardFileImporter:
             if line.upper() == 'END:VCARD':
                 break
 
-            # Skip continuation lines
-            if line.startswith(' ') or line.startswith('\t'):
-                continue
-
             # Skip lines without colon
             if ':' not in line:
                 continue
@@ -464,7 +312,7 @@ class VCardFileImporter:
                 # DEBUG for BDAY field
                 if prop_base == 'BDAY' and get_debug():
                     print(
-                        "[DEBUG parse_vcard_block] Found BDAY field: '{0}'".format(value))
+                        "[DEBUG parse_vcard_lines] Found BDAY field: '{0}'".format(value))
 
                 if prop_base == 'FN':
                     contact['FN'] = value
@@ -548,7 +396,7 @@ class VCardFileImporter:
 
         if get_debug() and contact['FN']:
             print(
-                "[DEBUG parse_vcard_block] Parsed contact: {0}, BDAY: {1}".format(
+                "[DEBUG parse_vcard_lines] Parsed contact: {0}, BDAY: {1}".format(
                     contact.get(
                         'FN', 'Unknown'), contact.get(
                         'BDAY', 'Empty')))
@@ -771,102 +619,69 @@ class VCardFileImporter:
         return False
 
     @staticmethod
-    def update_existing_contact(birthday_manager, contact_data):
-        """Update existing contact instead of skipping - avoids duplicates"""
-        name = contact_data.get('FN', '').strip()
+    def find_existing_contact(birthday_manager, contact_data):
+        """Find the stored contact for the same person via the contact index"""
+        index = birthday_manager.contact_index
+        norm = DuplicateChecker.normalize_contact_data(contact_data)
+        if not norm['FN']:
+            return None
 
-        if not name:
+        # Only contacts sharing name, a phone or an email can match
+        for contact_id in index.candidates(norm):
+            contact = index.get(contact_id)
+            if contact and VCardFileImporter.is_same_person(
+                    contact, contact_data):
+                return contact
+        return None
+
+    @staticmethod
+    def update_existing_contact(
+            birthday_manager, contact_data, pending_updates=None):
+        """Update existing contact instead of skipping - avoids duplicates
+
+        Missing fields are merged in memory. With pending_updates (dict
+        id -> contact) the contact is only re-indexed and collected there,
+        so the caller can write a batch of contacts with one
+        birthday_manager.save_contacts() call (save_pending_updates).
+        """
+        contact = VCardFileImporter.find_existing_contact(
+            birthday_manager, contact_data)
+        if not contact:
             return None
 
-        for i, contact in enumerate(birthday_manager.contacts):
-            # Use is_same_person for better matching
-            if VCardFileImporter.is_same_person(contact, contact_data):
-                # UPDATE LOGIC: Fill empty fields, don't overwrite existing
-                # data
-                updated = False
-
-                existing_bday = contact.get('BDAY', '').strip()
-                new_bday = contact_data.get('BDAY', '').strip()
-                existing_phone = contact.get('TEL', '').strip()
-                new_phone = contact_data.get('TEL', '').strip()
-                existing_email = contact.get('EMAIL', '').strip()
-                new_email = contact_data.get('EMAIL', '').strip()
-
-                # Update only empty fields
-                if not existing_bday and new_bday:
-                    contact['BDAY'] = new_bday
-                    updated = True
-
-                # PHONE HANDLING: avoid duplicates
-                if new_phone:
-                    # Extract existing numbers
-                    existing_phones = []
-                    if existing_phone:
-                        existing_phones = [
-                            p.strip() for p in existing_phone.split('|') if p.strip()]
-
-                    # Extract new numbers
-                    new_phones = [p.strip()
-                                  for p in new_phone.split('|') if p.strip()]
-
-                    # Add only new numbers
-                    phones_added = False
-                    for phone in new_phones:
-                        if phone and phone not in existing_phones:
-                            existing_phones.append(phone)
-                            phones_added = True
-
-                    if phones_added:
-                        # Remove duplicates while preserving order
-                        unique_phones = list(dict.fromkeys(existing_phones))
-                        contact['TEL'] = '|'.join(unique_phones)
-                        updated = True
-
-                # EMAIL HANDLING: avoid duplicates
-                if new_email:
-                    # Extract existing emails
-                    existing_emails = []
-                    if existing_email:
-                        existing_emails = [
-                            e.strip() for e in existing_email.split('|') if e.strip()]
-
-                    # Extract new emails
-                    new_emails = [e.strip()
-                                  for e in new_email.split('|') if e.strip()]
-
-                    # Add only new emails
-                    emails_added = False
-                    for email in new_emails:
-                        if email and email not in existing_emails:
-                            existing_emails.append(email)
-                            emails_added = True
-
-                    if emails_added:
-                        # Remove duplicates while preserving order
-                        unique_emails = list(dict.fromkeys(existing_emails))
-                        contact['EMAIL'] = '|'.join(unique_emails)
-                        updated = True
-
-                # Update other fields if empty
-                for field in [
-                    'ADR',
-                    'ORG',
-                    'TITLE',
-                    'CATEGORIES',
-                    'NOTE',
-                        'URL']:
-                    existing = contact.get(field, '').strip()
-                    new_val = contact_data.get(field, '').strip()
-                    if not existing and new_val:
-                        contact[field] = new_val
-                        updated = True
-
-                if updated:
-                    # Save the updated contact
-                    birthday_manager.save_contact(contact)
-                    return contact['id']  # Return contact ID
+        # UPDATE LOGIC: Fill empty fields, don't overwrite existing data
+        if not merge_contact_fields(contact, contact_data):
+            return None
 
-        return None
+        if pending_updates is None:
+            birthday_manager.save_contact(contact)
+        else:
+            # Re-index now so next cards see the merged phones/emails
+            birthday_manager.contact_index.add(contact)
+            pending_updates[contact['id']] = contact
+        return contact['id']
+
+    @staticmethod
+    def add_new_contact(birthday_manager, contact_data, pending_updates):
+        """Queue a new contact for the batched save
+
+        The contact gets its id and enters the contact index right away,
+        so the next cards see it; save_pending_updates() writes it with the
+        merged contacts and refreshes the contact list once per batch.
+        """
+        contact_id = birthday_manager.new_contact_id()
+        contact_data['id'] = contact_id
+        birthday_manager.contact_index.add(contact_data)
+        pending_updates[contact_id] = contact_data
+        return contact_id
+
+    @staticmethod
+    def save_pending_updates(birthday_manager, pending_updates):
+        """Persist contacts added or merged during an import in one batch"""
+        if not pending_updates:
+            return
+        birthday_manager.save_contacts(list(pending_updates.values()))
+        pending_updates.clear()
 
 
 class VCardImporter(Screen):
@@ -913,10 +728,10 @@ class VCardImporter(Screen):
         if get_debug():
             print("[VCardImporter] Start path: {0}".format(start_path))
 
-        matching_pattern = r".*\.(vcf|vcard)$"
+        matching_pattern = r".*\.(vcf|vcard|csv)$"
         self["filelist"] = FileList(
             start_path, matchingPattern=matching_pattern)
-        self["status"] = Label(_("Select vCard file to import"))
+        self["status"] = Label(_("Select vCard or CSV file to import"))
         self["key_red"] = Label(_("Cancel"))
         self["key_green"] = Label(_("Import"))
         self["key_yellow"] = Label(_("View"))
@@ -1009,47 +824,7 @@ class VCardImporter(Screen):
 
     def count_contacts_in_file(self, filepath):
         """Count contacts in vCard file using single method"""
-        contact_count = 0
-        try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                # Read file in chunks for efficiency
-                chunk_size = 1024 * 1024  # 1MB chunks
-                buffer = ''
-
-                while True:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-
-                    buffer += chunk
-
-                    # Count BEGIN:VCARD occurrences in buffer
-                    while 'BEGIN:VCARD' in buffer.upper():
-                        contact_count += 1
-                        # Find position and remove counted part
-                        pos = buffer.upper().find('BEGIN:VCARD')
-                        # Move past this BEGIN:VCARD
-                        buffer = buffer[pos + len('BEGIN:VCARD'):]
-
-                # Count any remaining in final buffer
-                contact_count += buffer.upper().count('BEGIN:VCARD')
-            if get_debug():
-                print(
-                    "[VCardImporter] Counted {0} contacts in {1}".format(
-                        contact_count, filepath))
-            return contact_count
-
-        except Exception as e:
-            print("[VCardImporter] Error counting contacts: {0}".format(e))
-            # Fallback: quick count from file start
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read(1000000)  # Read first 1MB
-                    return max(content.count('BEGIN:VCARD'),
-                               content.count('BEGIN:VCARD\r\n'),
-                               content.count('BEGIN:VCARD\n'))
-            except BaseException:
-                return 0
+        return VCardFileImporter.count_contacts(filepath)
 
     def do_import(self):
         """Import selected file"""
@@ -1081,8 +856,16 @@ class VCardImporter(Screen):
 
         # Quick check if file is valid vCard
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                first_chunk = f.read(1024)
+            if is_csv_file(filepath):
+                if detect_csv_kind(filepath) != 'contacts':
+                    self.session.open(
+                        MessageBox,
+                        _("No contact columns found in CSV file\n{0}").format(filename),
+                        MessageBox.TYPE_WARNING)
+                    return
+            else:
+                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                    first_chunk = f.read(1024)
                 if 'BEGIN:VCARD' not in first_chunk.upper():
                     self.session.open(
                         MessageBox,
@@ -1098,16 +881,34 @@ class VCardImporter(Screen):
             )
             return
 
-        # Count events first
-        event_count = self.count_contacts_in_file(filepath)
-        if event_count == 0:
-            self.session.open(
+        # Offer to continue an interrupted import of the same file
+        state = ImportCheckpoint('vcard', filepath).load()
+        if state:
+            self.session.openWithCallback(
+                lambda result: self.resume_callback(result, filepath),
                 MessageBox,
-                _("No events found in file\n{0}").format(filename),
-                MessageBox.TYPE_INFO
-            )
+                _("A previous import of {0} stopped after {1} contacts.\nResume it?").format(
+                    filename, state['counters'].get('current', 0)),
+                MessageBox.TYPE_YESNO)
             return
 
+        self.confirm_import(filepath)
+
+    def resume_callback(self, result, filepath):
+        """Resume the interrupted import, or discard it and start over"""
+        if result:
+            self.start_import_process(True, filepath, 0, True)
+        else:
+            ImportCheckpoint('vcard', filepath).clear()
+            self.confirm_import(filepath)
+
+    def confirm_import(self, filepath):
+        """Ask for confirmation"""
+        filename = basename(filepath)
+
+        # No counting pass: the importer reports progress by bytes read
+        event_count = 0
+
         # Confirm import
         self.session.openWithCallback(
             lambda result: self.start_import_process(
@@ -1118,7 +919,8 @@ class VCardImporter(Screen):
             _("Import contacts from:\n{0}?").format(filename),
             MessageBox.TYPE_YESNO)
 
-    def start_import_process(self, result, filepath, event_count):
+    def start_import_process(self, result, filepath, event_count,
+                             resume=False):
         """Start the actual import process"""
         if not result:
             return
@@ -1131,7 +933,8 @@ class VCardImporter(Screen):
                 ImportProgressScreen,
                 self.birthday_manager,
                 filepath,
-                event_count
+                event_count,
+                resume
             )
             if get_debug():
                 print("[VCardImporter] ImportProgressScreen opened successfully")
@@ -1147,7 +950,7 @@ class VCardImporter(Screen):
         """Direct import without progress screen (fallback)"""
         try:
             # Use the unified file importer
-            imported, skipped, errors = VCardFileImporter.import_file_sync(
+            imported, updated, skipped, errors = VCardFileImporter.import_file_sync(
                 self.birthday_manager,
                 filepath
             )
@@ -1155,6 +958,7 @@ class VCardImporter(Screen):
             message = [
                 _("Import completed!"),
                 _("Imported: {0} contacts").format(imported),
+                _("Updated: {0}").format(updated),
                 _("Skipped: {0} (duplicates)").format(skipped),
                 _("Errors: {0}").format(errors)
             ]
@@ -1214,10 +1018,100 @@ class VCardImporter(Screen):
         self.close()
 
 
+class ContactImportStages:
+    """Normalize, dedup and commit stages of a contact import
+
+    Shared by VCardFileImporterThread (eTimer time budget) and
+    VCardFileImporter.import_file_sync (calling thread). Duplicates are
+    found through the contact index of the birthday manager; new and
+    merged contacts are collected and written once per commit batch.
+    """
+
+    def __init__(self, birthday_manager):
+        self.birthday_manager = birthday_manager
+        self.pending_updates = {}
+
+    def create_pipeline(self, filepath, start_offset=0, on_record=None,
+                        threaded=False):
+        """Pipeline over a vCard or CSV contacts file"""
+        stages = [
+            PipelineStage('normalize', self.normalize_record),
+            PipelineStage('dedup', self.dedup_record, main_loop=True),
+            CommitStage('commit', self.commit_record,
+                        self.flush_pending_updates),
+        ]
+        if is_csv_file(filepath):
+            source = CSVSource(filepath, 'contacts', start_offset=start_offset)
+        else:
+            source = FileSource(filepath, 'vcard', start_offset=start_offset)
+        return ImportPipeline(source, stages, on_record=on_record,
+                              threaded=threaded)
+
+    def flush_pending_updates(self):
+        VCardFileImporter.save_pending_updates(
+            self.birthday_manager, self.pending_updates)
+
+    def normalize_record(self, record):
+        """Cards that could not be parsed are errors"""
+        if not record.data:
+            record.status = 'error'
+            return False
+        return True
+
+    def dedup_record(self, record):
+        """Mark cards already stored (or added earlier in this import)"""
+        contact_data = record.data
+        is_duplicate, reason = DuplicateChecker.contact_exists(
+            self.birthday_manager, contact_data)
+        if is_duplicate:
+            if get_debug():
+                print(
+                    "[ContactImport] Duplicate ({0}): {1}".format(
+                        reason, contact_data.get('FN', 'Unknown')))
+            record.detail = reason
+        return True
+
+    def commit_record(self, record):
+        """Save a new contact or merge a duplicate into the stored one"""
+        contact_data = record.data
+        if record.detail:
+            # Try to update existing contact
+            updated_id = VCardFileImporter.update_existing_contact(
+                self.birthday_manager, contact_data, self.pending_updates)
+
+            if updated_id:
+                record.status = 'updated'
+                if get_debug():
+                    print(
+                        "[ContactImport] Updated contact: {0}".format(
+                            contact_data.get('FN', 'Unknown')))
+            else:
+                record.status = 'skipped'
+            return True
+
+        # New contact - written by the commit stage flush
+        VCardFileImporter.add_new_contact(
+            self.birthday_manager, contact_data, self.pending_updates)
+        record.status = 'imported'
+        return True
+
+
 class VCardFileImporterThread:
-    """Non-threaded importer using timer with cache"""
+    """Non-threaded importer using timer
+
+    Cards run through the import pipeline (read, parse, normalize, dedup,
+    commit). Each timer tick processes as many cards as fit in the time
+    budget (config import_time_budget, ms) and progress is posted once per
+    tick; the screen's ProgressChannel bounds the refresh rate. With
+    import_parse_thread enabled the file is read and parsed in a worker
+    thread feeding a bounded queue; duplicate checks and saving always stay
+    on the main loop.
+    """
+
+    TICK_INTERVAL = 10          # ms between ticks
 
-    def __init__(self, birthday_manager, filepath, total_events, callback):
+    def __init__(self, birthday_manager, filepath, total_events, callback,
+                 time_budget=None, parse_thread=None, resume=False):
         self.birthday_manager = birthday_manager
         self.filepath = filepath
         self.total_events = total_events
@@ -1228,9 +1122,31 @@ class VCardFileImporterThread:
         self.skipped = 0
         self.errors = 0
         self.current = 0
-        self.total_blocks = 0
-        self.vcard_blocks = []
-        self.current_index = 0
+        self.file_size = 0
+        self.bytes_read = 0
+        self.finished = False
+        self.contact_stages = ContactImportStages(birthday_manager)
+        self.time_budget = time_budget or get_import_time_budget()
+        if parse_thread is None:
+            parse_thread = get_import_parse_thread()
+        self.parse_thread = parse_thread
+        self.pipeline = None
+
+        # Checkpoint: resume after the last committed card
+        self.checkpoint = ImportCheckpoint('vcard', filepath)
+        self.start_offset = 0
+        state = self.checkpoint.load() if resume else None
+        if state:
+            self.start_offset = self.bytes_read = state['offset']
+            for name, value in state['counters'].items():
+                setattr(self, name, value)
+            if get_debug():
+                print("[VCardImporterThread] Resuming at byte {0}{1}".format(
+                    self.start_offset,
+                    " (partial commit)" if 'pending_offset' in state else ""))
+        else:
+            self.checkpoint.clear()
+
         self.timer = eTimer()
         try:
             self.timer_conn = self.timer.timeout.connect(
@@ -1238,43 +1154,26 @@ class VCardFileImporterThread:
         except AttributeError:
             self.timer.callback.append(self.process_next_block)
 
-        # Initialize cache
-        VCardFileImporter.init_cache(birthday_manager)
-
-        if get_debug():
-            print("[VCardImporterThread] Initialized with cache")
-
     def start(self):
         """Start import process"""
         if get_debug():
-            print("[VCardImporterThread] Starting import")
+            print(
+                "[VCardImporterThread] Starting import (budget {0} ms, parse thread: {1})".format(
+                    self.time_budget, self.parse_thread))
 
         try:
-            # Read the entire file into memory
-            with open(self.filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-            # Split by VCARD blocks
-            self.vcard_blocks = split(
-                r'BEGIN:VCARD\s*', content, flags=IGNORECASE)
-
-            # Count total blocks
-            self.total_blocks = len([b for b in self.vcard_blocks
-                                    if b.strip() and 'END:VCARD' in b.upper()])
+            self.file_size = getsize(self.filepath)
 
-            if get_debug():
-                print(
-                    "[VCardImporterThread] Total blocks found: {0}, Expected: {1}".format(
-                        self.total_blocks, self.total_events))
-
-            display_total = self.total_events if self.total_events > 0 else self.total_blocks
-
-            if display_total == 0:
+            if self.file_size == 0:
                 self.callback(1.0, 0, 0, 0, 0, 0, 0, True)
                 return False
 
+            # Stream cards one at a time - no full read, no counting pass
+            self.pipeline = self.create_pipeline()
+            self.pipeline.start()
+
             # Start processing
-            self.timer.start(10, True)
+            self.timer.start(self.TICK_INTERVAL, True)
             return True
 
         except Exception as e:
@@ -1282,128 +1181,102 @@ class VCardFileImporterThread:
             self.callback(1.0, 0, 0, 0, 0, 0, 0, True)
             return False
 
+    def create_pipeline(self):
+        """Import pipeline: normalize, dedup and commit stages"""
+        return self.contact_stages.create_pipeline(
+            self.filepath, self.start_offset, self.record_done,
+            self.parse_thread)
+
+    def get_display_total(self):
+        """Counted total if known, otherwise estimated from bytes read"""
+        if self.total_events > 0:
+            return max(self.total_events, self.current)
+        return VCardFileImporter.estimate_total(
+            self.current, self.bytes_read, self.file_size)
+
+    def report_progress(self):
+        """Post progress for the screen"""
+        progress = float(self.bytes_read) / \
+            self.file_size if self.file_size > 0 else 0
+        self.callback(
+            progress,
+            self.current,
+            self.get_display_total(),
+            self.imported,
+            self.updated,
+            self.skipped,
+            self.errors,
+            False)
+
+    def get_counters(self):
+        """Counters stored in the checkpoint"""
+        return {
+            'current': self.current,
+            'imported': self.imported,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+    def commit_checkpoint(self):
+        """Write merged contacts and checkpoint the current position"""
+        self.checkpoint.commit(
+            self.bytes_read, self.get_counters(), self.pipeline.flush)
+
     def process_next_block(self):
-        """Process one contact block with cache"""
+        """Process as many contact blocks as fit in the time budget"""
         if self.cancelled:
-            display_total = self.total_events if self.total_events > 0 else self.total_blocks
+            # Keep the merges done before the cancel, resumable later
+            self.pipeline.cancel()
+            self.commit_checkpoint()
             self.callback(
                 1.0,
                 self.current,
-                display_total,
+                self.get_display_total(),
                 self.imported,
                 self.updated,
                 self.skipped,
                 self.errors,
                 True)
-            VCardFileImporter.clear_cache()
             return
 
-        # Skip empty blocks until you find a valid one
-        while self.current_index < len(self.vcard_blocks):
-            block = self.vcard_blocks[self.current_index]
-            self.current_index += 1
-
-            if not block.strip() or 'END:VCARD' not in block.upper():
-                continue
-
-            self.current += 1
-
-            try:
-                # Process the block
-                contact_data = VCardFileImporter.parse_vcard_block(block)
-
-                if not contact_data:
-                    self.errors += 1
-                else:
-                    # FAST CACHE CHECK
-                    is_duplicate, duplicate_type = VCardFileImporter.is_duplicate_by_cache(
-                        contact_data)
-
-                    if is_duplicate:
-                        # Try to update existing contact
-                        updated_id = VCardFileImporter.update_existing_contact(
-                            self.birthday_manager, contact_data)
-
-                        if updated_id:
-                            self.updated += 1  # (no self.skipped)
-                            if get_debug():
-                                print(
-                                    "[VCardImporterThread] Updated contact: {0}".format(
-                                        contact_data.get(
-                                            'FN', 'Unknown')))
-                        else:
-                            self.skipped += 1
-
-                        if get_debug():
-                            print(
-                                "[VCardImporterThread] Cache duplicate ({0}): {1}".format(
-                                    duplicate_type, contact_data.get(
-                                        'FN', 'Unknown')))
-                    else:
-                        # Check with DuplicateChecker
-                        if VCardFileImporter.contact_exists(
-                                self.birthday_manager, contact_data):
-                            # Try to update
-                            updated_id = VCardFileImporter.update_existing_contact(
-                                self.birthday_manager, contact_data)
-
-                            if updated_id:
-                                self.updated += 1
-                                if get_debug():
-                                    print(
-                                        "[VCardImporterThread] Updated contact after detailed check: {0}".format(
-                                            contact_data.get(
-                                                'FN', 'Unknown')))
-                            else:
-                                self.skipped += 1
-                        else:
-                            # Save new contact
-                            contact_id = self.birthday_manager.save_contact(
-                                contact_data)
-                            if contact_id:
-                                self.imported += 1
-                                # Add to cache
-                                VCardFileImporter.add_to_cache(contact_data)
-                            else:
-                                self.errors += 1
-
-                break  # Exit the while loop after processing a block
-
-            except Exception as e:
-                print(
-                    "[VCardImporterThread] Error processing block: {0}".format(e))
-                self.errors += 1
-                break
-
-        display_total = self.total_events if self.total_events > 0 else self.total_blocks
-        progress = float(self.current) / \
-            display_total if display_total > 0 else 0
-        self.callback(
-            progress,
-            self.current,
-            display_total,
-            self.imported,
-            self.updated,
-            self.skipped,
-            self.errors,
-            False)
+        deadline = time.time() + self.time_budget / 1000.0
+        self.finished = self.pipeline.process(deadline)
 
-        # If there are still blocks, continue
-        if not self.cancelled and self.current < self.total_blocks:
-            self.timer.start(10, True)
+        # If there are still cards, continue
+        if not self.cancelled and not self.finished:
+            self.report_progress()
+            self.timer.start(self.TICK_INTERVAL, True)
         else:
-            # Import done - clear cache
-            display_total = self.total_events if self.total_events > 0 else self.total_blocks
+            # Import done - merged contacts written by the final flush
+            self.report_progress()
+            self.checkpoint.clear()
             self.callback(
                 1.0,
                 self.current,
-                display_total,
+                self.current,
                 self.imported,
                 self.updated,
                 self.skipped,
                 self.errors,
                 True)
-            VCardFileImporter.clear_cache()
+
+    def record_done(self, record):
+        """Count a processed card and checkpoint"""
+        self.current += 1
+        self.bytes_read = record.bytes_read
+        self.file_size = record.file_size
+        if record.status == 'imported':
+            self.imported += 1
+        elif record.status == 'updated':
+            self.updated += 1
+        elif record.status == 'skipped':
+            self.skipped += 1
+        else:
+            self.errors += 1
+
+        if self.checkpoint.record_done():
+            self.commit_checkpoint()
 
 
 class ImportProgressScreen(Screen):
@@ -1432,17 +1305,21 @@ class ImportProgressScreen(Screen):
         </screen>
         """
 
-    def __init__(self, session, birthday_manager, filepath, total_events):
+    def __init__(self, session, birthday_manager, filepath, total_events,
+                 resume=False):
         Screen.__init__(self, session)
         self.birthday_manager = birthday_manager
         self.filepath = filepath
         self.total_events = total_events
+        self.resume = resume
         self.imported = 0
         self.skipped = 0
         self.errors = 0
         self.current = 0
         self.updated = 0
         self.import_thread = None
+        self.importer = None
+        self.channel = None
         self.last_update = time.time()
         self["title"] = Label(_("Importing vCard File"))
         self["filename"] = Label(basename(filepath))
@@ -1518,12 +1395,16 @@ class ImportProgressScreen(Screen):
                 self["key_red"].setText(_("Close"))
                 self.import_completed(imported, updated, skipped, errors)
 
+        # Worker posts into the channel, widgets are updated on the main loop
+        self.channel = ProgressChannel(progress_callback)
         self.importer = VCardFileImporterThread(
             self.birthday_manager,
             self.filepath,
             self.total_events,
-            progress_callback
+            self.channel.report,
+            resume=self.resume
         )
+        self.channel.start()
 
         if not self.importer.start():
             self.session.open(
@@ -1543,10 +1424,6 @@ class ImportProgressScreen(Screen):
                     skipped,
                     errors))
 
-        # Clear normalization cache
-        if hasattr(self.birthday_manager, '_normalized_contacts_cache'):
-            del self.birthday_manager._normalized_contacts_cache
-
         # Update final status
         self["progress"].setValue(100)
         self["status"].setText(_("Completed"))
@@ -1562,7 +1439,8 @@ class ImportProgressScreen(Screen):
                 _("Updated: {0}").format(updated),
                 _("Skipped: {0}").format(skipped),
                 _("Errors: {0}").format(errors),
-                _("Total: {0}").format(self.total_events)
+                _("Total: {0}").format(
+                    imported + updated + skipped + errors)
             ]
 
             self.session.openWithCallback(
@@ -1618,6 +1496,12 @@ class ImportProgressScreen(Screen):
 
     def close(self, result=None):
         """Close screen"""
+        if self.channel:
+            self.channel.stop()
+        if self.importer and not self.importer.finished:
+            # Timer based importer: stops on its next tick
+            self.importer.cancelled = True
+
         # Ensure thread is stopped
         if self.import_thread and self.import_thread.is_alive():
             self.import_thread.cancelled = True
@@ -1638,140 +1522,239 @@ def quick_import_vcard(birthday_manager, filepath):
     return imported, updated, skipped, errors
 
 
+def sort_contacts(contacts, sort_by='name'):
+    """Contacts in export order: name, birthday (month/day), category, none"""
+    if sort_by == 'name':
+        # Sort alphabetically by name
+        return sorted(contacts, key=lambda x: x.get('FN', '').lower())
+    if sort_by == 'birthday':
+        # Sort by birthday month/day
+        def birthday_key(contact):
+            bday = contact.get('BDAY', '')
+            if bday:
+                try:
+                    bday_date = datetime.strptime(bday, "%Y-%m-%d")
+                    # Sort by month and day
+                    return (
+                        bday_date.month,
+                        bday_date.day,
+                        contact.get(
+                            'FN',
+                            '').lower())
+                except BaseException:
+                    return (13, 32, contact.get('FN', '').lower())
+            return (13, 32, contact.get('FN', '').lower())
+        return sorted(contacts, key=birthday_key)
+    if sort_by == 'category':
+        # Sort by category
+        return sorted(
+            contacts, key=lambda x: x.get(
+                'CATEGORIES', '').lower())
+    return contacts
+
+
 def export_contacts_to_vcf(
         birthday_manager,
         output_path="/tmp/calendar.vcf",
-        sort_by='name'):
-    """Export contacts with sorting options"""
+        sort_by='name',
+        job=None,
+        changes_only=None,
+        export_filter=None):
+    """Export contacts with sorting options
+
+    The file is written as .tmp and renamed when complete. With an
+    ExportJob, progress goes to job.step() and a cancel stops the export
+    (ExportCancelled is passed on to the job). changes_only (default:
+    config) writes only the contacts changed since the last export; vCard
+    has no deletion record, removed contacts are just dropped from the
+    manifest. export_filter (default: the export settings) limits the
+    export to birthdays in a date range and to categories.
+    """
+    temp_path = output_path + ".tmp"
     try:
-        contacts = birthday_manager.contacts
+        if export_filter is None:
+            export_filter = ExportFilter.from_config()
+        if export_filter.is_scoped():
+            contacts = birthday_manager.query_contacts(export_filter)
+        else:
+            contacts = birthday_manager.contacts
 
         if not contacts:
             if get_debug():
                 print("[VCardExport] No contacts found")
             return 0
 
-        # Apply sorting
-        if sort_by == 'name':
-            # Sort alphabetically by name
-            contacts = sorted(contacts, key=lambda x: x.get('FN', '').lower())
-        elif sort_by == 'birthday':
-            # Sort by birthday month/day
-            def birthday_key(contact):
-                bday = contact.get('BDAY', '')
-                if bday:
-                    try:
-                        bday_date = datetime.strptime(bday, "%Y-%m-%d")
-                        # Sort by month and day
-                        return (
-                            bday_date.month,
-                            bday_date.day,
-                            contact.get(
-                                'FN',
-                                '').lower())
-                    except BaseException:
-                        return (13, 32, contact.get('FN', '').lower())
-                return (13, 32, contact.get('FN', '').lower())
-            contacts = sorted(contacts, key=birthday_key)
-        elif sort_by == 'category':
-            # Sort by category
-            contacts = sorted(
-                contacts, key=lambda x: x.get(
-                    'CATEGORIES', '').lower())
+        contacts = sort_contacts(contacts, sort_by)
         if get_debug():
             print("[VCardExport] Exporting {0} contacts ({1}) to {2}".format(
                 len(contacts), sort_by, output_path))
 
+        if job is not None:
+            job.set_phase(_("Contacts"), len(contacts))
+        manifest = ExportManifest(
+            "vcard", changes_only, scoped=export_filter.is_scoped())
+
         count = 0
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open(temp_path, 'w', encoding='utf-8') as f:
             for contact in contacts:
+                if job is not None:
+                    job.step()
                 # Skip contacts without name
                 name = contact.get('FN', '').strip()
                 if not name:
                     continue
 
-                f.write("BEGIN:VCARD\n")
-                f.write("VERSION:3.0\n")
+                card = []
+                card.append("BEGIN:VCARD\n")
+                card.append("VERSION:3.0\n")
 
                 # *** ALL THE SAME TAGS AS IMPORT ***
                 # 1. FN - Formatted Name (REQUIRED)
-                f.write("FN:{0}\n".format(name))
+                card.append("FN:{0}\n".format(name))
 
                 # 2. N - Structured Name (for Google compatibility)
                 # Create structured name from FN
                 name_parts = name.split(' ', 1)
                 if len(name_parts) == 2:
                     # Assume "FirstName LastName"
-                    f.write(
+                    card.append(
                         "N:{1};{0};;;\n".format(
                             name_parts[0],
                             name_parts[1]))
                 else:
                     # Single name
-                    f.write("N:{0};;;;\n".format(name))
+                    card.append("N:{0};;;;\n".format(name))
 
                 # 3. BDAY - Birthday (same format as import: YYYY-MM-DD)
                 bday = contact.get('BDAY', '').strip()
                 if bday:
-                    f.write("BDAY:{0}\n".format(bday))
+                    card.append("BDAY:{0}\n".format(bday))
 
                 # 4. TEL - Telephone (use | separator like import)
                 tel = contact.get('TEL', '').strip()
                 if tel:
                     # IMPORTANT: keep | separator format
-                    f.write("TEL:{0}\n".format(tel))
+                    card.append("TEL:{0}\n".format(tel))
 
                 # 5. EMAIL - Email (use | separator like import)
                 email = contact.get('EMAIL', '').strip()
                 if email:
-                    f.write("EMAIL:{0}\n".format(email))
+                    card.append("EMAIL:{0}\n".format(email))
 
                 # 6. ADR - Address
                 adr = contact.get('ADR', '').strip()
                 if adr:
-                    f.write("ADR:{0}\n".format(adr))
+                    card.append("ADR:{0}\n".format(adr))
 
                 # 7. ORG - Organization
                 org = contact.get('ORG', '').strip()
                 if org:
-                    f.write("ORG:{0}\n".format(org))
+                    card.append("ORG:{0}\n".format(org))
 
                 # 8. TITLE - Job Title / Position
                 title = contact.get('TITLE', '').strip()
                 if title:
-                    f.write("TITLE:{0}\n".format(title))
+                    card.append("TITLE:{0}\n".format(title))
 
                 # 9. CATEGORIES - Categories / Tags
                 categories = contact.get('CATEGORIES', '').strip()
                 if categories:
-                    f.write("CATEGORIES:{0}\n".format(categories))
+                    card.append("CATEGORIES:{0}\n".format(categories))
 
                 # 10. NOTE - Notes
                 note = contact.get('NOTE', '').strip()
                 if note:
                     # Replace newlines with \n for vCard compatibility
                     note = note.replace('\n', '\\n')
-                    f.write("NOTE:{0}\n".format(note))
+                    card.append("NOTE:{0}\n".format(note))
 
                 # 11. URL - Website
                 url = contact.get('URL', '').strip()
                 if url:
-                    f.write("URL:{0}\n".format(url))
+                    card.append("URL:{0}\n".format(url))
+
+                card.append("END:VCARD\n\n")
 
-                f.write("END:VCARD\n\n")
-                count += 1
+                # Differential export: skip cards unchanged since the last one
+                uid = contact.get('id') or name + "|" + bday
+                if manifest.wants(uid, card):
+                    f.write("".join(card))
+                    count += 1
+        os.rename(temp_path, output_path)
+        manifest.save()
         if get_debug():
             print(
                 "[VCardExport] Successfully exported {0} contacts".format(count))
         return count
 
+    except ExportCancelled:
+        _remove_partial(temp_path)
+        raise
     except Exception as e:
         print("[VCardExport] Error: {0}".format(str(e)))
         import traceback
         traceback.print_exc()
+        _remove_partial(temp_path)
+        return 0
+
+
+def export_contacts_to_csv(
+        birthday_manager,
+        output_path="/tmp/calendar.csv",
+        sort_by='name',
+        job=None,
+        changes_only=None,
+        export_filter=None,
+        layout=None):
+    """Export contacts to CSV in the configured column layout
+
+    Same options as export_contacts_to_vcf; layout (default: config
+    csv_layout) is 'calendar', 'google' or 'outlook'. Rows are written
+    one at a time to output_path.tmp, renamed when complete.
+    """
+    try:
+        if layout is None:
+            layout = get_csv_layout()
+        if export_filter is None:
+            export_filter = ExportFilter.from_config()
+        if export_filter.is_scoped():
+            contacts = birthday_manager.query_contacts(export_filter)
+        else:
+            contacts = birthday_manager.contacts
+        contacts = [c for c in sort_contacts(contacts, sort_by)
+                    if c.get('FN', '').strip()]
+        if not contacts:
+            if get_debug():
+                print("[CSVExport] No contacts found")
+            return 0
+
+        if job is not None:
+            job.set_phase(_("Contacts"), len(contacts))
+        count = write_csv(
+            output_path, "csv_contacts", CONTACT_LAYOUTS[layout], contacts,
+            contact_to_row, layout, job, changes_only,
+            export_filter.is_scoped(),
+            lambda c: c.get('id') or c.get('FN', '') + "|" + c.get('BDAY', ''))
+        if get_debug():
+            print("[CSVExport] Exported {0} contacts ({1}) to {2}".format(
+                count, layout, output_path))
+        return count
+
+    except ExportCancelled:
+        raise
+    except Exception as e:
+        print("[CSVExport] Error: {0}".format(str(e)))
         return 0
 
 
+def _remove_partial(temp_path):
+    if exists(temp_path):
+        try:
+            os.remove(temp_path)
+        except OSError as e:
+            print("[VCardExport] Error removing {0}: {1}".format(temp_path, e))
+
+
 # Version as static method of VCardFileImporter (alternative)
 @staticmethod
 def cleanup_contacts(birthday_manager):